@@ -0,0 +1,11 @@
+"""
+Run the EDA, hypothesis testing and modeling pipeline; see src/pipeline.py.
+
+Usage:
+    python run_eda.py data/MachineLearningRating_v3.txt [--config pipeline.json] [--jobs 4]
+"""
+import sys
+from src.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main(['run'] + sys.argv[1:]))
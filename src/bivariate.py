@@ -1,29 +1,75 @@
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from utils import save_plot
+from src.utils import pyplot, save_plot, show_plot
+from src.segment_cube import SegmentCube
+from src.correlation import streaming_corr
 
-def correlation_analysis(df, numerical_cols):
+# Aggregations shared by the interactive plots below and by src.report. All but
+# the correlation matrix are queries against one SegmentCube built per analysis.
+
+def correlation_matrix(df, numerical_cols, method='pearson'):
+    """
+    Correlation matrix of the numerical columns, accumulated chunk by chunk.
+
+    `df` may also be a data file path or chunk source (see streaming_corr), so
+    the full float64 block is never materialised.
+    """
+    if isinstance(df, pd.DataFrame):
+        numerical_cols = [col for col in numerical_cols if col in df.columns]
+    return streaming_corr(df, numerical_cols, method=method)
+
+def segment_cube(df, cube=None):
+    """Return `cube`, or build the segment cube from df in one pass."""
+    return cube if cube is not None else SegmentCube.from_data(df)
+
+def top_postalcode_monthly(df, top_n=5, cube=None):
+    """Monthly mean TotalPremium and TotalClaims for the top_n PostalCodes by volume."""
+    cube = segment_cube(df, cube)
+    top_postalcodes = cube.top('PostalCode', top_n)
+    subset = cube.where(PostalCode=top_postalcodes)
+    monthly_trends = pd.concat([
+        subset.mean('premium', ['TransactionMonth', 'PostalCode']).rename('TotalPremium'),
+        subset.mean('claims', ['TransactionMonth', 'PostalCode']).rename('TotalClaims'),
+    ], axis=1).reset_index()
+    return top_postalcodes, monthly_trends
+
+def loss_ratio_table(df, cube=None):
+    """
+    Exposure-weighted loss ratio (total claims / total premium) per Province,
+    ascending; NaN for provinces without premium.
+    """
+    return segment_cube(df, cube).loss_ratio('Province').sort_values()
+
+def premium_pivot(df, cube=None):
+    """Average TotalPremium by Province and CoverType."""
+    return segment_cube(df, cube).mean('premium', ['Province', 'CoverType']).unstack('CoverType')
+
+def make_province_counts(df, top_n=5, cube=None):
+    """Policy counts of the top_n vehicle Makes by Province."""
+    cube = segment_cube(df, cube)
+    counts = cube.where(Make=cube.top('Make', top_n)).rollup(['Province', 'Make'])['claims_n']
+    return counts.unstack('Make', fill_value=0)
+
+def correlation_analysis(df, numerical_cols, method='pearson'):
     """Generate correlation matrix for numerical columns."""
-    numerical_cols = [col for col in numerical_cols if col in df.columns]
+    import seaborn as sns
+    plt = pyplot()
+    if isinstance(df, pd.DataFrame):
+        numerical_cols = [col for col in numerical_cols if col in df.columns]
     if len(numerical_cols) > 1:
-        correlation_matrix = df[numerical_cols].corr()
+        correlation_matrix_ = correlation_matrix(df, numerical_cols, method)
         plt.figure(figsize=(10, 8))
-        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0, fmt='.2f')
-        plt.title('Correlation Matrix of Numerical Features', fontsize=14, pad=20)
-        plt.show
+        sns.heatmap(correlation_matrix_, annot=True, cmap='coolwarm', center=0, fmt='.2f')
+        plt.title(f'{method.title()} Correlation Matrix of Numerical Features', fontsize=14, pad=20)
+        show_plot()
     else:
         print("Warning: Insufficient numerical columns for correlation matrix.")
 
-def scatter_premium_claims_postalcode(df, output_dir='visualizations'):
+def scatter_premium_claims_postalcode(df, output_dir='visualizations', cube=None):
     """Scatter plot of monthly TotalPremium vs TotalClaims by PostalCode."""
+    import seaborn as sns
+    plt = pyplot()
     if all(col in df.columns for col in ['TransactionMonth', 'TotalPremium', 'TotalClaims', 'PostalCode']):
-        top_postalcodes = df['PostalCode'].value_counts().head(5).index
-        df_subset = df[df['PostalCode'].isin(top_postalcodes)]
-        monthly_trends = df_subset.groupby(['TransactionMonth', 'PostalCode']).agg({
-            'TotalPremium': 'mean',
-            'TotalClaims': 'mean'
-        }).reset_index()
+        _, monthly_trends = top_postalcode_monthly(df, cube=cube)
 
         plt.figure(figsize=(12, 8))
         sns.scatterplot(data=monthly_trends, x='TotalPremium', y='TotalClaims', hue='PostalCode', size='TotalClaims', palette='deep', alpha=0.7)
@@ -34,15 +80,11 @@ def scatter_premium_claims_postalcode(df, output_dir='visualizations'):
         plt.tight_layout()
         save_plot('scatter_premium_claims_postalcode.png', output_dir)
 
-def monthly_trends_postalcode(df):
+def monthly_trends_postalcode(df, cube=None):
     """Line plot of monthly TotalPremium and TotalClaims by PostalCode."""
+    plt = pyplot()
     if all(col in df.columns for col in ['TransactionMonth', 'TotalPremium', 'TotalClaims', 'PostalCode']):
-        top_postalcodes = df['PostalCode'].value_counts().head(5).index
-        df_subset = df[df['PostalCode'].isin(top_postalcodes)]
-        monthly_trends = df_subset.groupby(['TransactionMonth', 'PostalCode']).agg({
-            'TotalPremium': 'mean',
-            'TotalClaims': 'mean'
-        }).reset_index()
+        top_postalcodes, monthly_trends = top_postalcode_monthly(df, cube=cube)
 
         plt.figure(figsize=(12, 8))
         for postalcode in top_postalcodes:
@@ -55,16 +97,17 @@ def monthly_trends_postalcode(df):
         plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
         plt.xticks(rotation=45)
         plt.tight_layout()
-        plt.show
+        show_plot()
 
-def loss_ratio_by_province(df, output_dir='visualizations'):
+def loss_ratio_by_province(df, output_dir='visualizations', cube=None):
     """Bar chart of Loss Ratio by Province."""
+    import seaborn as sns
+    plt = pyplot()
     if all(col in df.columns for col in ['TotalPremium', 'TotalClaims', 'Province']):
-        df['LossRatio'] = df['TotalClaims'] / df['TotalPremium']
-        loss_by_province = df.groupby('Province')['LossRatio'].mean().sort_values()
+        loss_by_province = loss_ratio_table(df, cube)
         plt.figure(figsize=(10, 6))
         sns.barplot(x=loss_by_province.index, y=loss_by_province.values, palette='magma')
-        plt.title('Average Loss Ratio by Province', fontsize=14, pad=20)
+        plt.title('Loss Ratio by Province', fontsize=14, pad=20)
         plt.xlabel('Province', fontsize=12)
         plt.ylabel('Loss Ratio', fontsize=12)
         plt.xticks(rotation=45)
@@ -72,10 +115,12 @@ def loss_ratio_by_province(df, output_dir='visualizations'):
         return loss_by_province
     return None
 
-def premium_by_covertype_province(df, output_dir='visualizations'):
+def premium_by_covertype_province(df, output_dir='visualizations', cube=None):
     """Heatmap of TotalPremium by Province and CoverType."""
+    import seaborn as sns
+    plt = pyplot()
     if all(col in df.columns for col in ['TotalPremium', 'Province', 'CoverType']):
-        pivot_premium = df.pivot_table(values='TotalPremium', index='Province', columns='CoverType', aggfunc='mean')
+        pivot_premium = premium_pivot(df, cube)
         plt.figure(figsize=(12, 8))
         sns.heatmap(pivot_premium, annot=True, cmap='YlGnBu', fmt='.0f')
         plt.title('Average TotalPremium by Province and CoverType', fontsize=14, pad=20)
@@ -83,12 +128,12 @@ def premium_by_covertype_province(df, output_dir='visualizations'):
         plt.ylabel('Province', fontsize=12)
         save_plot('premium_province_covertype.png', output_dir)
 
-def make_by_province(df, output_dir='visualizations'):
+def make_by_province(df, output_dir='visualizations', cube=None):
     """Heatmap of top Vehicle Makes by Province."""
+    import seaborn as sns
+    plt = pyplot()
     if all(col in df.columns for col in ['Make', 'Province']):
-        top_makes = df['Make'].value_counts().head(5).index
-        df_make_subset = df[df['Make'].isin(top_makes)]
-        pivot_make = df_make_subset.pivot_table(values='TotalClaims', index='Province', columns='Make', aggfunc='count', fill_value=0)
+        pivot_make = make_province_counts(df, cube=cube)
         plt.figure(figsize=(12, 8))
         sns.heatmap(pivot_make, annot=True, cmap='Blues', fmt='d')
         plt.title('Count of Top Vehicle Makes by Province', fontsize=14, pad=20)
@@ -96,25 +141,28 @@ def make_by_province(df, output_dir='visualizations'):
         plt.ylabel('Province', fontsize=12)
         save_plot('make_province.png', output_dir)
 
-def run_bivariate_analysis(df, numerical_cols, categorical_cols, output_dir='visualizations'):
-    """Run complete bivariate and geographic analysis."""
+def run_bivariate_analysis(df, numerical_cols, categorical_cols, output_dir='visualizations', cube=None,
+                           corr_method='pearson'):
+    """Run complete bivariate and geographic analysis from a single segment cube."""
     print("\nRunning Bivariate and Geographic Analysis...")
     numerical_cols = [col for col in numerical_cols if col in df.columns]
     categorical_cols = [col for col in categorical_cols if col in df.columns]
 
+    cube = segment_cube(df, cube)
+
     # Bivariate/Multivariate
-    correlation_analysis(df, numerical_cols)
-    scatter_premium_claims_postalcode(df, output_dir)
-    monthly_trends_postalcode(df)
+    correlation_analysis(df, numerical_cols, corr_method)
+    scatter_premium_claims_postalcode(df, output_dir, cube)
+    monthly_trends_postalcode(df, cube)
 
     # Geographic Trends
-    loss_by_province = loss_ratio_by_province(df, output_dir)
-    premium_by_covertype_province(df, output_dir)
-    make_by_province(df, output_dir)
+    loss_by_province = loss_ratio_by_province(df, output_dir, cube)
+    premium_by_covertype_province(df, output_dir, cube)
+    make_by_province(df, output_dir, cube)
 
     print("Bivariate and Geographic Analysis Summary:")
     print("Numerical Columns Analyzed:", numerical_cols)
     print("Categorical Columns Analyzed:", categorical_cols)
     if loss_by_province is not None:
         print("\nLoss Ratio by Province:")
-        print(loss_by_province)
\ No newline at end of file
+        print(loss_by_province)
@@ -0,0 +1,142 @@
+import pandas as pd
+import numpy as np
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from src.instrumentation import instrument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Fixed formats of the date columns in MachineLearningRating_v3.txt
+DATE_FORMATS = {
+    'TransactionMonth': '%Y-%m-%d %H:%M:%S',
+    'VehicleIntroDate': '%m/%Y',
+}
+
+REPORT_COLUMNS = ['column', 'kind', 'rows', 'converted', 'failed', 'examples']
+
+
+def _distinct(series):
+    """
+    (codes, distinct values) of a column; -1 marks missing. Categories are used
+    as-is, so a categorical column is never scanned row by row.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), pd.Index(series.cat.categories)
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return codes, pd.Index(uniques)
+
+
+def _spread(parsed, codes, missing):
+    # Index -1 picks the appended missing value
+    return np.append(np.asarray(parsed), missing)[codes]
+
+
+def _failures(uniques, parsed, codes, column, kind):
+    bad = np.flatnonzero(pd.isna(parsed) & ~pd.isna(uniques))
+    failed = int(np.isin(codes, bad).sum()) if len(bad) else 0
+    return {
+        'column': column,
+        'kind': kind,
+        'rows': len(codes),
+        'converted': int((codes >= 0).sum()) - failed,
+        'failed': failed,
+        'examples': [str(value) for value in uniques[bad[:5]]],
+    }
+
+
+def parse_decimal(series):
+    """
+    Parse a column of comma- or dot-decimal strings to float64.
+
+    Each distinct string is parsed once and the result is broadcast back
+    through the factorized codes.
+
+    Returns:
+        tuple: (float64 Series, report dict)
+    """
+    codes, uniques = _distinct(series)
+    text = uniques.astype(str).str.strip().str.replace(',', '.', regex=False)
+    parsed = pd.to_numeric(text, errors='coerce').to_numpy(dtype=np.float64) if len(uniques) \
+        else np.empty(0)
+    values = pd.Series(_spread(parsed, codes, np.nan), index=series.index, name=series.name)
+    return values, _failures(uniques, parsed, codes, series.name, 'numeric')
+
+
+def parse_dates(series, fmt=None):
+    """
+    Parse a column of date strings with a fixed format, parsing each distinct
+    string once. Falls back to format inference only if the format matches no
+    value at all.
+
+    Returns:
+        tuple: (datetime64 Series, report dict)
+    """
+    codes, uniques = _distinct(series)
+    text = uniques.astype(str)
+    parsed = pd.to_datetime(text, format=fmt, errors='coerce')
+    if fmt and len(uniques) and parsed.isna().all():
+        logger.warning(f"No {series.name} value matches {fmt!r}; inferring the format")
+        parsed = pd.to_datetime(text, format='mixed', errors='coerce')
+    parsed = parsed.to_numpy()
+    missing = np.datetime64('NaT').astype(parsed.dtype)
+    values = pd.Series(_spread(parsed, codes, missing), index=series.index, name=series.name)
+    return values, _failures(uniques, parsed, codes, series.name, 'date')
+
+
+def _clean_one(task):
+    kind, series, fmt = task
+    return parse_decimal(series) if kind == 'numeric' else parse_dates(series, fmt)
+
+
+def _needs_parsing(series):
+    return series.dtype == object or isinstance(series.dtype, (pd.CategoricalDtype, pd.StringDtype))
+
+
+@instrument()
+def clean_columns(df, numeric_cols=(), date_cols=None, n_jobs=None, backend='thread', inplace=True):
+    """
+    Convert comma-decimal numeric columns and fixed-format date columns in parallel.
+
+    Args:
+        df (pd.DataFrame): Input frame.
+        numeric_cols (list): Columns to parse as numbers; already numeric columns
+            are left alone.
+        date_cols (list or dict, optional): Date columns, or {column: format}.
+            Formats default to DATE_FORMATS, else inference.
+        n_jobs (int, optional): Workers. Defaults to one per column, capped at
+            os.cpu_count().
+        backend (str): 'thread' (no copies) or 'process' (columns are pickled).
+        inplace (bool): Write the parsed columns into df, otherwise into a copy.
+
+    Returns:
+        tuple: (DataFrame, report) where report has one row per parsed column
+            with REPORT_COLUMNS, including failed-row counts and examples.
+    """
+    date_cols = date_cols or {}
+    if not isinstance(date_cols, dict):
+        date_cols = {col: DATE_FORMATS.get(col) for col in date_cols}
+    tasks = [('numeric', df[col], None) for col in numeric_cols
+             if col in df.columns and _needs_parsing(df[col])]
+    tasks += [('date', df[col], fmt) for col, fmt in date_cols.items()
+              if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col])]
+
+    n_jobs = min(n_jobs or os.cpu_count() or 1, max(len(tasks), 1))
+    if n_jobs == 1:
+        results = [_clean_one(task) for task in tasks]
+    else:
+        pool_cls = ProcessPoolExecutor if backend == 'process' else ThreadPoolExecutor
+        with pool_cls(max_workers=n_jobs) as pool:
+            results = list(pool.map(_clean_one, tasks))
+
+    out = df if inplace else df.copy()
+    reports = []
+    for values, report in results:
+        out[values.name] = values
+        reports.append(report)
+        if report['failed']:
+            logger.warning(f"{report['column']}: {report['failed']} values could not be parsed as "
+                           f"{report['kind']}, e.g. {report['examples']}")
+    return out, pd.DataFrame(reports, columns=REPORT_COLUMNS)
@@ -0,0 +1,136 @@
+"""
+Command line entry point for the data jobs.
+
+Each command imports only the modules it needs, so data-only jobs (profiling,
+trend and risk index updates) start without sklearn, xgboost, shap or the
+plotting libraries.
+
+Usage:
+    python -m src run data/MachineLearningRating_v3.txt --config pipeline.json --jobs 4
+    python -m src profile data/MachineLearningRating_v3.txt --sample random --output profile.json
+    python -m src trends data/new_month.txt --store data/trends.parquet
+    python -m src risk-index data/MachineLearningRating_v3.txt --output models/risk_index.joblib
+    python -m src score --bundle models/pricing.joblib --input policies.txt --output scores.csv
+    python -m src --metrics metrics/stages.prom trends data/new_month.txt --store data/trends.parquet
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _run(args):
+    from src.pipeline import build_eda_pipeline
+    pipeline = build_eda_pipeline(args.path, output_dir=args.output_dir, cache_dir=args.cache_dir,
+                                  hypothesis_groups=args.hypothesis_groups, config=args.config)
+    report = pipeline.run(targets=args.targets, force=args.force or (), n_jobs=args.jobs)
+    print(report[['status', 'seconds']].to_string(float_format=lambda v: f'{v:.2f}'))
+    if args.results_dir:
+        os.makedirs(args.results_dir, exist_ok=True)
+        for name in report.index:
+            if name.startswith('hypothesis_'):
+                pipeline.output(name).to_csv(os.path.join(args.results_dir, f'{name}.csv'), index=False)
+            elif name == 'model':
+                with open(os.path.join(args.results_dir, 'model_metrics.json'), 'w', encoding='utf-8') as fh:
+                    json.dump(pipeline.output(name)['metrics'], fh, indent=2)
+        logger.info(f"Wrote results to {args.results_dir}")
+
+
+def _profile(args):
+    from src.profiling import profile_data, profile_frame
+    profile = profile_data(args.path, columns=args.columns, sample=args.sample, nrows=args.nrows,
+                           fraction=args.fraction, chunksize=args.chunksize, output_path=args.output)
+    if not args.output:
+        print(profile_frame(profile).to_string())
+
+
+def _trends(args):
+    from src.trends import update_trend_store
+    store = update_trend_store(args.path, args.store, dims=args.dims, chunksize=args.chunksize)
+    logger.info(f"Trend store holds {len(store.months)} month(s)")
+
+
+def _risk_index(args):
+    from src.risk_index import build_risk_index
+    build_risk_index(args.path, chunksize=args.chunksize, output_path=args.output)
+
+
+def _score(args):
+    from src.scoring_service import main as scoring_main
+    scoring_main([args.command] + args.extra)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m src', description="Insurance analytics data jobs.")
+    parser.add_argument('--metrics', help="Write stage metrics here on exit (.prom for Prometheus text, "
+                                          "otherwise JSON)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help="Run the load -> clean -> impute -> analyze/model pipeline, "
+                                     "reusing cached stage outputs.")
+    run.add_argument('path')
+    run.add_argument('--output-dir', default='visualizations', help="Chart output folder")
+    run.add_argument('--results-dir', default='results', help="Hypothesis tables and model metrics")
+    run.add_argument('--cache-dir', help="Stage cache (default: .cache/pipeline next to the data)")
+    run.add_argument('--config', help="JSON file of {stage: {param: value}} overrides")
+    run.add_argument('--hypothesis-groups', nargs='+', help="Group columns to test")
+    run.add_argument('--targets', nargs='+', help="Only bring these stages up to date")
+    run.add_argument('--force', nargs='+', help="Re-run these stages even if cached")
+    run.add_argument('--jobs', type=int, help="Worker processes (default: all CPUs)")
+    run.set_defaults(handler=_run)
+
+    profile = sub.add_parser('profile', help="Profile a data file in one pass.")
+    profile.add_argument('path')
+    profile.add_argument('--columns', nargs='+')
+    profile.add_argument('--sample', choices=['head', 'random'])
+    profile.add_argument('--nrows', type=int, default=10_000)
+    profile.add_argument('--fraction', type=float, default=0.01)
+    profile.add_argument('--chunksize', type=int, default=200_000)
+    profile.add_argument('--output', help="Write the profile as JSON instead of printing it")
+    profile.set_defaults(handler=_profile)
+
+    trends = sub.add_parser('trends', help="Create or extend the monthly KPI trend store.")
+    trends.add_argument('path')
+    trends.add_argument('--store', required=True)
+    trends.add_argument('--dims', nargs='+', help="Segment dimensions of a new store")
+    trends.add_argument('--chunksize', type=int, default=200_000)
+    trends.set_defaults(handler=_trends)
+
+    risk = sub.add_parser('risk-index', help="Fit the PostalCode risk index.")
+    risk.add_argument('path')
+    risk.add_argument('--output', required=True)
+    risk.add_argument('--chunksize', type=int, default=200_000)
+    risk.set_defaults(handler=_risk_index)
+
+    # Scoring keeps its own options (see src.scoring_service); they are passed on as given
+    for name, help_text in (('score', "Score a policy file with a pricing bundle."),
+                            ('serve', "Run the HTTP scoring server.")):
+        sub.add_parser(name, help=help_text, add_help=False).set_defaults(handler=_score)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.handler is not _score:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.extra = extra
+    try:
+        args.handler(args)
+    finally:
+        if args.metrics:
+            from src import instrumentation
+            if args.metrics.endswith('.prom'):
+                instrumentation.export_prometheus(args.metrics)
+            else:
+                instrumentation.export_json(args.metrics)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
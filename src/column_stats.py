@@ -0,0 +1,235 @@
+import pandas as pd
+import numpy as np
+from src.instrumentation import instrument
+
+# Numeric columns are summarised by a fixed-size fine histogram whose range grows
+# by merging bin pairs, so memory and cost depend on FINE_BINS, not on rows.
+# Display histograms, binned KDEs, quantiles and box statistics are all derived
+# from it; category counts are merged by addition.
+FINE_BINS = 4096
+
+
+def to_float_array(series):
+    if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+        series = pd.to_numeric(series.astype(object), errors='coerce')
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class NumericSketch:
+    """Count, extremes, running mean/M2 and a range-doubling fine histogram."""
+
+    def __init__(self, fine_bins=FINE_BINS):
+        if fine_bins % 2:
+            raise ValueError("fine_bins must be even")
+        self.fine_bins = fine_bins
+        self.n = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.n_at_min = 0
+        self.lo = None
+        self.width = None
+        self.counts = np.zeros(fine_bins, dtype=np.int64)
+
+    @property
+    def hi(self):
+        return self.lo + self.fine_bins * self.width
+
+    def _grow(self, vmin, vmax):
+        half = self.fine_bins // 2
+        while vmin < self.lo or vmax > self.hi:
+            extend_right = vmax > self.hi
+            merged = self.counts.reshape(half, 2).sum(axis=1)
+            self.width *= 2
+            if extend_right:
+                self.counts = np.concatenate([merged, np.zeros(half, dtype=np.int64)])
+            else:
+                self.lo -= half * self.width
+                self.counts = np.concatenate([np.zeros(half, dtype=np.int64), merged])
+
+    def update(self, values):
+        valid = values[~np.isnan(values)]
+        self.missing += len(values) - len(valid)
+        if not len(valid):
+            return
+        vmin, vmax = float(valid.min()), float(valid.max())
+        if self.lo is None:
+            span = vmax - vmin
+            self.lo = vmin
+            self.width = span / self.fine_bins if span > 0 else max(abs(vmin), 1.0) / self.fine_bins
+        else:
+            self._grow(vmin, vmax)
+        idx = np.clip(((valid - self.lo) / self.width).astype(np.int64), 0, self.fine_bins - 1)
+        self.counts += np.bincount(idx, minlength=self.fine_bins)
+
+        # Chan et al. pairwise merge of the running mean / M2
+        n_b = len(valid)
+        mean_b = float(valid.mean())
+        m2_b = float(((valid - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+        # Exact mass at the minimum, e.g. the zeros of TotalClaims
+        n_at_min = int((valid == vmin).sum())
+        if vmin < self.min:
+            self.n_at_min = n_at_min
+        elif vmin == self.min:
+            self.n_at_min += n_at_min
+        self.min = min(self.min, vmin)
+        self.max = max(self.max, vmax)
+
+    def _cumulative(self):
+        return np.concatenate([[0], np.cumsum(self.counts)])
+
+    def quantiles(self, qs):
+        """Approximate quantiles, linear within fine bins and clipped to [min, max]."""
+        targets = np.asarray(qs, dtype=np.float64) * self.n
+        edges = self.lo + np.arange(self.fine_bins + 1) * self.width
+        values = np.clip(np.interp(targets, self._cumulative(), edges), self.min, self.max)
+        return np.where(targets <= self.n_at_min, self.min, values)
+
+    def mid_ranks(self, values):
+        """
+        Approximate mid-ranks of values within everything seen so far, scaled to
+        (0, 1): linear within fine bins, exact for the point mass at the minimum.
+        """
+        edges = self.lo + np.arange(self.fine_bins + 1) * self.width
+        cum = np.interp(values, edges, self._cumulative())
+        ranks = np.where(values <= self.min, 0.5 * self.n_at_min, np.maximum(cum, self.n_at_min + 0.5))
+        return np.where(np.isnan(values), np.nan, ranks / self.n)
+
+    def histogram(self, bins=30):
+        """Counts over `bins` equal-width bins spanning [min, max], like np.histogram."""
+        if self.min == self.max:
+            edges = np.linspace(self.min - 0.5, self.max + 0.5, bins + 1)
+        else:
+            edges = np.linspace(self.min, self.max, bins + 1)
+        fine_edges = self.lo + np.arange(self.fine_bins + 1) * self.width
+        cum = np.round(np.interp(edges, fine_edges, self._cumulative()))
+        cum[0], cum[-1] = 0, self.n
+        return np.diff(cum).astype(np.int64), edges
+
+    def kde(self, scale=1.0, max_points=512):
+        """
+        Gaussian KDE (Scott's bandwidth) of the fine histogram, evaluated on the
+        fine bin centres within [min, max] and multiplied by `scale`.
+        """
+        std = np.sqrt(self.m2 / self.n) if self.n else 0.0
+        bandwidth = std * self.n ** (-0.2)
+        if bandwidth <= 0:
+            return None, None
+        sigma = bandwidth / self.width
+        half = int(min(np.ceil(4 * sigma), self.fine_bins))
+        offsets = np.arange(-half, half + 1)
+        kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+        kernel /= kernel.sum()
+        # The kernel can be longer than the histogram (few or concentrated values),
+        # where mode='same' would return the longer length: centre the full convolution
+        density = np.convolve(self.counts, kernel)[half:half + self.fine_bins] / (self.n * self.width)
+        centres = self.lo + (np.arange(self.fine_bins) + 0.5) * self.width
+        inside = (centres >= self.min) & (centres <= self.max)
+        step = max(1, int(inside.sum()) // max_points)
+        return centres[inside][::step], density[inside][::step] * scale
+
+    def box(self, label=None):
+        """Box-plot statistics in the format of matplotlib's Axes.bxp."""
+        q1, med, q3 = self.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        fence_lo, fence_hi = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        nonzero = np.flatnonzero(self.counts)
+        left = self.lo + nonzero * self.width
+        centres = np.clip(left + 0.5 * self.width, self.min, self.max)
+        whislo = self.min if self.min >= fence_lo else max(left[left + self.width >= fence_lo].min(), fence_lo)
+        whishi = self.max if self.max <= fence_hi else min((left + self.width)[left <= fence_hi].max(), fence_hi)
+        fliers = centres[(centres < whislo) | (centres > whishi)]
+        extremes = [v for v in (self.min, self.max) if v < whislo or v > whishi]
+        return {'med': med, 'q1': q1, 'q3': q3, 'whislo': min(whislo, q1), 'whishi': max(whishi, q3),
+                'fliers': np.unique(np.concatenate([fliers, extremes])), 'label': label}
+
+
+def _numeric_summary(sketch, col, bins, kde, quantiles):
+    summary = {'kind': 'numeric', 'count': sketch.n, 'missing': sketch.missing}
+    if not sketch.n:
+        return summary
+    counts, edges = sketch.histogram(bins)
+    histogram = {'counts': counts, 'edges': edges, 'kde_x': None, 'kde': None}
+    if kde:
+        # Scale the density to the display bins' frequency axis
+        histogram['kde_x'], histogram['kde'] = sketch.kde(scale=sketch.n * (edges[1] - edges[0]))
+    summary.update({
+        'mean': sketch.mean,
+        'std': np.sqrt(sketch.m2 / (sketch.n - 1)) if sketch.n > 1 else np.nan,
+        'min': sketch.min,
+        'max': sketch.max,
+        'quantiles': dict(zip(quantiles, sketch.quantiles(quantiles))),
+        'histogram': histogram,
+        'box': sketch.box(label=col),
+    })
+    return summary
+
+
+class ColumnStatsAggregator:
+    """
+    One-pass plotting statistics for numerical and categorical columns.
+
+    Usage:
+        agg = ColumnStatsAggregator(['TotalPremium'], ['Province'])
+        for chunk in iter_data(path, columns=['TotalPremium', 'Province']):
+            agg.update(chunk)
+        stats = agg.result()
+    """
+
+    def __init__(self, numerical_cols, categorical_cols, fine_bins=FINE_BINS):
+        self.numerical_cols = list(numerical_cols)
+        self.categorical_cols = list(categorical_cols)
+        self.sketches = {col: NumericSketch(fine_bins) for col in self.numerical_cols}
+        self.category_counts = {col: None for col in self.categorical_cols}
+        self.category_missing = {col: 0 for col in self.categorical_cols}
+
+    def update(self, chunk):
+        """Fold one chunk into the running statistics."""
+        for col in self.numerical_cols:
+            if col in chunk.columns:
+                self.sketches[col].update(to_float_array(chunk[col]))
+        for col in self.categorical_cols:
+            if col in chunk.columns:
+                counts = chunk[col].value_counts(sort=False)
+                previous = self.category_counts[col]
+                self.category_counts[col] = counts if previous is None else previous.add(counts, fill_value=0)
+                self.category_missing[col] += int(chunk[col].isna().sum())
+        return self
+
+    def result(self, bins=30, kde=True, quantiles=(0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)):
+        """
+        Return {column: summary} for every column seen so far.
+
+        Numeric summaries hold count, missing, mean, std, min, max, quantiles,
+        'histogram' ({'counts', 'edges', 'kde_x', 'kde'}) and 'box' (Axes.bxp
+        stats). Categorical summaries hold 'counts' (a Series) and 'missing'.
+        """
+        stats = {col: _numeric_summary(sketch, col, bins, kde, quantiles)
+                 for col, sketch in self.sketches.items()}
+        for col, counts in self.category_counts.items():
+            if counts is not None:
+                counts = counts.astype(np.int64)
+            stats[col] = {'kind': 'categorical', 'counts': counts, 'missing': self.category_missing[col]}
+        return stats
+
+
+@instrument()
+def summarize_columns(data, numerical_cols, categorical_cols, bins=30, kde=True, fine_bins=FINE_BINS):
+    """
+    Compute plotting statistics from a DataFrame or an iterable of chunks.
+    """
+    if isinstance(data, pd.DataFrame):
+        numerical_cols = [col for col in numerical_cols if col in data.columns]
+        categorical_cols = [col for col in categorical_cols if col in data.columns]
+        data = [data]
+    aggregator = ColumnStatsAggregator(numerical_cols, categorical_cols, fine_bins)
+    for chunk in data:
+        aggregator.update(chunk)
+    return aggregator.result(bins=bins, kde=kde)
@@ -0,0 +1,143 @@
+import pandas as pd
+import numpy as np
+from src.column_stats import NumericSketch, to_float_array
+from src.instrumentation import instrument
+
+DEFAULT_CHUNKSIZE = 200_000
+
+
+def _matrix(chunk, columns):
+    return np.column_stack([to_float_array(chunk[col]) if col in chunk.columns else np.full(len(chunk), np.nan)
+                            for col in columns])
+
+
+class CorrelationAccumulator:
+    """
+    Streaming pairwise-complete covariance and Pearson correlation.
+
+    Every pair (i, j) keeps its own count, means and co-moments over the rows
+    where both columns are present, like DataFrame.corr(). Each chunk is
+    centred on its own means before the cross products are taken, and chunks
+    are combined with the Chan et al. pairwise update, so large offsets (e.g.
+    SumInsured) do not cancel catastrophically. State is O(k^2) in the number
+    of columns.
+
+    Usage:
+        acc = CorrelationAccumulator(['TotalPremium', 'TotalClaims'])
+        for chunk in iter_data(path, columns=[...]):
+            acc.update(chunk)
+        corr = acc.correlation()
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))     # mean[i, j]: mean of column i over rows where j is present
+        self.m2 = np.zeros((k, k))       # m2[i, j]: sum of squared deviations of i, same rows
+        self.comoment = np.zeros((k, k))
+
+    def update(self, chunk):
+        """Fold one chunk (a DataFrame or a 2-D float array in column order) into the statistics."""
+        X = _matrix(chunk, self.columns) if isinstance(chunk, pd.DataFrame) else np.asarray(chunk, dtype=np.float64)
+        present = ~np.isnan(X)
+        if not present.any():
+            return self
+        M = present.astype(np.float64)
+        with np.errstate(invalid='ignore'):
+            shift = np.where(present.any(axis=0), np.nanmean(np.where(present, X, np.nan), axis=0), 0.0)
+        Xc = np.where(present, X - shift, 0.0)
+
+        n_b = M.T @ M
+        safe_n = np.where(n_b > 0, n_b, 1.0)
+        sums = Xc.T @ M                    # [i, j]: sum of centred x_i over rows with i and j
+        mean_b = sums / safe_n
+        m2_b = (Xc * Xc).T @ M - sums * mean_b
+        comoment_b = Xc.T @ Xc - sums * sums.T / safe_n
+        self._merge(n_b, mean_b + shift[:, None], m2_b, comoment_b)
+        return self
+
+    def _merge(self, n_b, mean_b, m2_b, comoment_b):
+        n = self.n + n_b
+        safe_n = np.where(n > 0, n, 1.0)
+        delta = mean_b - self.mean
+        weight = self.n * n_b / safe_n
+        self.comoment += comoment_b + delta * delta.T * weight
+        self.m2 += m2_b + delta * delta * weight
+        self.mean += delta * n_b / safe_n
+        self.n = n
+
+    def merge(self, other):
+        """Combine with another accumulator over the same columns, e.g. from a worker."""
+        self._merge(other.n, other.mean, other.m2, other.comoment)
+        return self
+
+    def covariance(self, ddof=1):
+        """Pairwise-complete covariance matrix."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = np.where(self.n > ddof, self.comoment / (self.n - ddof), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Pairwise-complete Pearson correlation matrix."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        corr = np.where(self.n > 1, np.clip(corr, -1.0, 1.0), np.nan)
+        corr[np.diag_indices_from(corr)] = np.where(np.diag(self.m2) > 0, 1.0, np.nan)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def _chunk_source(data, columns, chunksize):
+    """Return a function yielding fresh chunks of data on each call."""
+    if isinstance(data, pd.DataFrame):
+        return lambda: (data.iloc[start:start + chunksize] for start in range(0, len(data), chunksize))
+    if isinstance(data, str):
+        from src.data_loader import iter_data
+        return lambda: iter_data(data, columns=columns, chunksize=chunksize)
+    if callable(data):
+        return data
+    return lambda: iter(data)
+
+
+@instrument()
+def streaming_corr(data, columns, method='pearson', chunksize=DEFAULT_CHUNKSIZE, fine_bins=4096):
+    """
+    Correlation matrix of `columns` computed chunk by chunk in bounded memory.
+
+    Args:
+        data: DataFrame (scanned in row slices), data file path (read with
+            iter_data), iterable of chunks, or a callable returning a fresh
+            chunk iterator.
+        columns (list): Numeric columns.
+        method (str): 'pearson', or 'spearman' on approximate mid-ranks. Spearman
+            scans the data twice, so `data` must not be a one-shot iterator.
+        chunksize (int): Rows per slice for DataFrame and file input.
+        fine_bins (int): Histogram resolution of the Spearman rank sketches.
+
+    Returns:
+        pd.DataFrame: Correlation matrix indexed and labelled by columns.
+    """
+    columns = list(columns)
+    chunks = _chunk_source(data, columns, chunksize)
+    accumulator = CorrelationAccumulator(columns)
+    if method == 'pearson':
+        for chunk in chunks():
+            accumulator.update(chunk)
+        return accumulator.correlation()
+    if method != 'spearman':
+        raise ValueError(f"Unknown correlation method: {method}")
+    if not isinstance(data, (pd.DataFrame, str)) and not callable(data) and iter(data) is data:
+        raise ValueError("Spearman needs re-iterable data: a DataFrame, path, list or callable")
+
+    # Pass 1: per-column distribution sketches; pass 2: Pearson on their mid-ranks
+    sketches = [NumericSketch(fine_bins) for _ in columns]
+    for chunk in chunks():
+        X = _matrix(chunk, columns)
+        for sketch, values in zip(sketches, X.T):
+            sketch.update(values)
+    for chunk in chunks():
+        X = _matrix(chunk, columns)
+        ranks = np.column_stack([sketch.mid_ranks(values) if sketch.n else values
+                                 for sketch, values in zip(sketches, X.T)])
+        accumulator.update(ranks)
+    return accumulator.correlation()
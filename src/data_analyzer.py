@@ -1,11 +1,27 @@
 import pandas as pd
 import numpy as np
 import logging
+from src.data_loader import iter_data
+from src.profiling import profile_data, profile_frame
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def get_data_profile(data, **kwargs) -> dict:
+    """
+    Summary statistics, missingness, negative counts, distinct counts, top values
+    and quantiles for every column in one pass over a file, DataFrame or chunks.
+    
+    Args:
+        data: Data file path, DataFrame or iterable of chunks.
+        **kwargs: Options for profile_data (sample='head'|'random', output_path, ...).
+        
+    Returns:
+        dict: JSON-serialisable profile; see profile_frame for a tabular view.
+    """
+    return profile_data(data, **kwargs)
+
 def get_summary_statistics(df: pd.DataFrame) -> pd.DataFrame:
     """
     Compute summary statistics for the DataFrame.
@@ -62,25 +78,23 @@ def detect_missing_values(df: pd.DataFrame) -> tuple:
         logger.error(f"Error detecting missing values: {str(e)}")
         raise
 
-def sample_data (file_path,nrows):
-
+def sample_data(file_path: str, nrows: int = 5) -> pd.DataFrame:
     """
-    Detect missing values and their percentages.
+    Read the first rows of the data file with the declared schema.
     
     Args:
-        df (pd.DataFrame): Input DataFrame.
+        file_path (str): Path to the pipe-delimited data file.
+        nrows (int): Number of rows to read.
         
     Returns:
-        tuple: (missing_counts, missing_percentages)
+        pd.DataFrame: The first nrows rows.
     """
     try:
-        df_sample = pd.read_csv(file_path, nrows=5)
+        df_sample = next(iter_data(file_path, chunksize=max(nrows, 1), nrows=nrows))
         print(df_sample.head())
         print("Columns:", df_sample.columns.tolist())
-        logger.info("sample data")
-        return sample_data
+        logger.info(f"Sampled {len(df_sample)} rows from {file_path}")
+        return df_sample
     except Exception as e:
-        logger.error(f"Error sample data: {str(e)}")
-        print("Error:", e)
-    
-
+        logger.error(f"Error sampling data: {str(e)}")
+        raise
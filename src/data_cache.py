@@ -0,0 +1,140 @@
+import pandas as pd
+import os
+import re
+import glob
+import json
+import hashlib
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout or the loader's typing rules change so that
+# caches written by an older version are rebuilt instead of reused.
+CACHE_VERSION = 1
+CACHE_DIRNAME = '.cache'
+
+
+def parquet_available() -> bool:
+    """Return True if pyarrow is installed and the Parquet cache can be used."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def dvc_md5(file_path: str) -> str:
+    """
+    Read the content md5 recorded in the DVC pointer file next to file_path.
+
+    Args:
+        file_path (str): Path to the DVC-tracked data file.
+
+    Returns:
+        str: The md5 from '<file_path>.dvc', or None if there is no pointer file.
+    """
+    dvc_file = f"{file_path}.dvc"
+    if not os.path.exists(dvc_file):
+        return None
+    with open(dvc_file, encoding='utf-8') as fh:
+        match = re.search(r'^\s*-?\s*md5:\s*([0-9a-f]{32})', fh.read(), re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def source_fingerprint(file_path: str) -> str:
+    """
+    Identify the content of file_path without hashing 500 MB of text.
+
+    Uses the DVC md5 when the file is tracked, otherwise its size and mtime.
+    """
+    md5 = dvc_md5(file_path)
+    if md5:
+        return md5
+    stat = os.stat(file_path)
+    return hashlib.md5(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+
+
+def options_hash(options: dict) -> str:
+    """Stable short hash of the loader options that shape the cached frame."""
+    payload = json.dumps({'version': CACHE_VERSION, **options}, sort_keys=True, default=str)
+    return hashlib.md5(payload.encode()).hexdigest()[:8]
+
+
+def cache_path(file_path: str, options: dict, cache_dir: str = None) -> str:
+    """
+    Build the cache file path for file_path under the given options.
+
+    Args:
+        file_path (str): Path to the source data file.
+        options (dict): Loader options (dtype map, cleaning flags) baked into the cache.
+        cache_dir (str, optional): Directory for cache files. Defaults to '.cache'
+            next to the source file.
+
+    Returns:
+        str: Path of the Parquet cache file.
+    """
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIRNAME)
+    stem = os.path.basename(file_path)
+    return os.path.join(cache_dir, f"{stem}-{source_fingerprint(file_path)[:12]}-{options_hash(options)}.parquet")
+
+
+def _has_dtype(series: pd.Series, dtype) -> bool:
+    declared = pd.api.types.pandas_dtype(dtype)
+    if isinstance(declared, pd.CategoricalDtype):
+        return isinstance(series.dtype, pd.CategoricalDtype)
+    return series.dtype == declared
+
+
+def read_cache(path: str, columns: list = None, dtypes: dict = None) -> pd.DataFrame:
+    """
+    Read the projected columns from a Parquet cache file, memory-mapping it.
+
+    Args:
+        path (str): Cache file path.
+        columns (list, optional): Columns to read. Defaults to all columns.
+        dtypes (dict, optional): Declared dtypes to restore. Parquet reads object
+            string columns back as str, and all-missing categoricals as object.
+
+    Returns:
+        pd.DataFrame: Cached frame, or None on a cache miss.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path, columns=columns, memory_map=True)
+        for col, dtype in (dtypes or {}).items():
+            if col in df.columns and not _has_dtype(df[col], dtype):
+                df[col] = df[col].astype(dtype)
+        logger.info(f"Read {len(df)} rows from cache {path}")
+        return df
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cache {path}: {e}")
+        return None
+
+
+def write_cache(df: pd.DataFrame, path: str) -> None:
+    """
+    Write df to a Parquet cache file atomically and drop caches built from an
+    older version of the same source file.
+
+    Args:
+        df (pd.DataFrame): Typed frame to cache.
+        path (str): Cache file path from cache_path.
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        logger.info(f"Wrote cache {path}")
+    except Exception as e:
+        logger.warning(f"Could not write cache {path}: {e}")
+        return
+
+    stem, fingerprint, _ = os.path.basename(path)[:-len('.parquet')].rsplit('-', 2)
+    for stale in glob.glob(os.path.join(os.path.dirname(path), f"{glob.escape(stem)}-*.parquet")):
+        if os.path.basename(stale)[:-len('.parquet')].rsplit('-', 2)[1] != fingerprint:
+            os.remove(stale)
+            logger.info(f"Removed stale cache {stale}")
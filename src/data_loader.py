@@ -1,20 +1,202 @@
 import pandas as pd
+import numpy as np
 import os
 import logging
+from pandas.api.types import CategoricalDtype
+from src.data_cache import cache_path, read_cache, write_cache, parquet_available
+from src.instrumentation import instrument
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def load_data(file_path: str) -> pd.DataFrame:
+# Declared schema for MachineLearningRating_v3.txt. Low-cardinality strings are
+# read as categories and descriptive numerics are downcast; the monetary columns
+# stay float64 so portfolio-level sums keep their precision. CapitalOutstanding
+# carries comma decimals and is left as a string for clean_numerical_columns.
+DTYPES = {
+    'UnderwrittenCoverID': 'int32',
+    'PolicyID': 'int32',
+    'TransactionMonth': 'category',
+    'IsVATRegistered': 'boolean',
+    'Citizenship': 'category',
+    'LegalType': 'category',
+    'Title': 'category',
+    'Language': 'category',
+    'Bank': 'category',
+    'AccountType': 'category',
+    'MaritalStatus': 'category',
+    'Gender': 'category',
+    'Country': 'category',
+    'Province': 'category',
+    'PostalCode': 'category',
+    'MainCrestaZone': 'category',
+    'SubCrestaZone': 'category',
+    'ItemType': 'category',
+    'mmcode': 'float32',
+    'VehicleType': 'category',
+    'RegistrationYear': 'int16',
+    'make': 'category',
+    'Make': 'category',
+    'Model': 'category',
+    'Cylinders': 'float32',
+    'cubiccapacity': 'float32',
+    'kilowatts': 'float32',
+    'bodytype': 'category',
+    'NumberOfDoors': 'float32',
+    'VehicleIntroDate': 'category',
+    'CustomValueEstimate': 'float32',
+    'AlarmImmobiliser': 'category',
+    'TrackingDevice': 'category',
+    'CapitalOutstanding': 'object',
+    'NewVehicle': 'category',
+    'WrittenOff': 'category',
+    'Rebuilt': 'category',
+    'Converted': 'category',
+    'CrossBorder': 'category',
+    'NumberOfVehiclesInFleet': 'float32',
+    'SumInsured': 'float64',
+    'TermFrequency': 'category',
+    'CalculatedPremiumPerTerm': 'float64',
+    'ExcessSelected': 'category',
+    'CoverCategory': 'category',
+    'CoverType': 'category',
+    'CoverGroup': 'category',
+    'Section': 'category',
+    'Product': 'category',
+    'StatutoryClass': 'category',
+    'StatutoryRiskType': 'category',
+    'TotalPremium': 'float64',
+    'TotalClaims': 'float64',
+}
+
+DEFAULT_CHUNKSIZE = 200_000
+
+
+def _read_header(file_path: str) -> list:
+    """Return the column names of the pipe-delimited file without reading any rows."""
+    return pd.read_csv(file_path, delimiter='|', encoding='utf-8', nrows=0).columns.tolist()
+
+
+def _resolve_schema(file_path: str, columns: list = None, dtypes: dict = None) -> tuple:
     """
-    Load CSV data from the specified file path.
-    
+    Match the requested projection and dtype map against the file header.
+
     Args:
         file_path (str): Path to the CSV file.
-        
+        columns (list, optional): Columns to read. Defaults to all columns.
+        dtypes (dict, optional): Overrides merged on top of DTYPES.
+
+    Returns:
+        tuple: (usecols, dtype map restricted to usecols)
+
+    Raises:
+        KeyError: If a requested column is not in the file.
+    """
+    header = _read_header(file_path)
+    if columns is None:
+        usecols = header
+    else:
+        missing = [col for col in columns if col not in header]
+        if missing:
+            raise KeyError(f"Columns not found in {file_path}: {missing}")
+        usecols = [col for col in header if col in columns]
+
+    schema = {**DTYPES, **(dtypes or {})}
+    return usecols, {col: schema[col] for col in usecols if col in schema}
+
+
+def _downcast(chunk: pd.DataFrame, dtype_map: dict) -> pd.DataFrame:
+    """Downcast float64 columns the schema does not declare to float32."""
+    for col in chunk.columns:
+        if col not in dtype_map and chunk[col].dtype == np.float64:
+            chunk[col] = chunk[col].astype(np.float32)
+    return chunk
+
+
+def _concat_chunks(chunks: list) -> pd.DataFrame:
+    """
+    Concatenate chunks, unifying category vocabularies so categorical columns
+    are not silently upcast to object.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+
+    cat_cols = [col for col in chunks[0].columns if isinstance(chunks[0][col].dtype, CategoricalDtype)]
+    for col in cat_cols:
+        categories = chunks[0][col].cat.categories
+        for chunk in chunks[1:]:
+            categories = categories.union(chunk[col].cat.categories)
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def iter_data(file_path: str, columns: list = None, chunksize: int = DEFAULT_CHUNKSIZE,
+              dtypes: dict = None, nrows: int = None):
+    """
+    Stream the pipe-delimited file in typed chunks.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        columns (list, optional): Column projection. Defaults to all columns.
+        chunksize (int): Rows per chunk.
+        dtypes (dict, optional): Dtype overrides merged on top of DTYPES.
+        nrows (int, optional): Stop after this many data rows.
+
+    Yields:
+        pd.DataFrame: Typed chunk of at most chunksize rows.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    usecols, dtype_map = _resolve_schema(file_path, columns, dtypes)
+    reader = pd.read_csv(file_path, delimiter='|', encoding='utf-8', usecols=usecols,
+                         dtype=dtype_map, chunksize=chunksize, nrows=nrows)
+    with reader:
+        for chunk in reader:
+            yield _downcast(chunk, dtype_map)
+
+
+def _read_frame(file_path: str, columns: list = None, chunksize: int = None,
+                dtypes: dict = None) -> pd.DataFrame:
+    """Parse the text file into a typed frame, in one read or in assembled chunks."""
+    if chunksize:
+        chunks = list(iter_data(file_path, columns=columns, chunksize=chunksize, dtypes=dtypes))
+        return _concat_chunks(chunks) if chunks else pd.DataFrame()
+    usecols, dtype_map = _resolve_schema(file_path, columns, dtypes)
+    df = pd.read_csv(file_path, delimiter='|', encoding='utf-8', usecols=usecols,
+                     dtype=dtype_map, low_memory=False)
+    return _downcast(df, dtype_map)
+
+
+@instrument()
+def load_data(file_path: str, columns: list = None, chunksize: int = None,
+              dtypes: dict = None, verbose: bool = True, cache: bool = True,
+              cache_dir: str = None) -> pd.DataFrame:
+    """
+    Load CSV data from the specified file path using the declared schema.
+
+    The first load writes a typed Parquet copy keyed by the file's DVC md5 and the
+    dtype map; later loads read only the projected columns from that copy and
+    rebuild it when the DVC hash changes.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        columns (list, optional): Column projection. Defaults to all columns.
+        chunksize (int, optional): Read in chunks of this many rows and assemble
+            them, which bounds the parser's peak memory. Defaults to a single read.
+        dtypes (dict, optional): Dtype overrides merged on top of DTYPES.
+        verbose (bool): Print the loaded columns and dtypes.
+        cache (bool): Use the Parquet cache when pyarrow is installed.
+        cache_dir (str, optional): Cache directory. Defaults to '.cache' next to
+            the data file.
+
     Returns:
         pd.DataFrame: Loaded DataFrame.
-        
+
     Raises:
         FileNotFoundError: If the file does not exist.
         pd.errors.EmptyDataError: If the file is empty.
@@ -22,18 +204,32 @@ def load_data(file_path: str) -> pd.DataFrame:
     try:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
-        
-        df = pd.read_csv(file_path, delimiter='|', encoding='utf-8', low_memory=False)
-        logger.info(f"Successfully loaded data from {file_path} with {len(df)} rows")
-        
+
+        if cache and parquet_available():
+            schema = {**DTYPES, **(dtypes or {})}
+            path = cache_path(file_path, {'dtypes': schema}, cache_dir)
+            usecols = _resolve_schema(file_path, columns, dtypes)[0] if columns is not None else None
+            df = read_cache(path, usecols, schema)
+            if df is None:
+                df = _read_frame(file_path, chunksize=chunksize, dtypes=dtypes)
+                if not df.empty:
+                    write_cache(df, path)
+                if usecols is not None:
+                    df = df[usecols]
+        else:
+            df = _read_frame(file_path, columns=columns, chunksize=chunksize, dtypes=dtypes)
+        logger.info(f"Successfully loaded data from {file_path} with {len(df)} rows "
+                    f"({df.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
+
         if df.empty:
             raise pd.errors.EmptyDataError("The CSV file is empty")
-        
-        print("Available Columns:")
-        print(df.columns.tolist())
-        print("\nData Types:")
-        print(df.dtypes)
+
+        if verbose:
+            print("Available Columns:")
+            print(df.columns.tolist())
+            print("\nData Types:")
+            print(df.dtypes)
         return df
     except Exception as e:
         logger.error(f"Error loading data: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -1,5 +1,8 @@
 import pandas as pd
 import logging
+from src.cleaning import clean_columns
+from src.imputation import GroupImputer
+from src.instrumentation import instrument
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -16,7 +19,7 @@ def convert_timestamp(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: DataFrame with 'TransactionMonth' as datetime and new 'Hour' column.
     """
     try:
-        df['TransactionMonth'] = pd.to_datetime(df['TransactionMonth'], errors='coerce')
+        df, _ = clean_columns(df, date_cols=['TransactionMonth'])
         #df['Hour'] = df['TransactionMonth'].dt.hour
         logger.info("Converted TransactionMonth to datetime and extracted Hour.")
         return df
@@ -26,6 +29,7 @@ def convert_timestamp(df: pd.DataFrame) -> pd.DataFrame:
 
 
 
+@instrument()
 def impute_missing_values(df: pd.DataFrame, columns: list) -> pd.DataFrame:
     """
     Impute missing values in specified columns with median.
@@ -38,11 +42,11 @@ def impute_missing_values(df: pd.DataFrame, columns: list) -> pd.DataFrame:
         pd.DataFrame: DataFrame with imputed values.
     """
     try:
-        for col in columns:
-            if df[col].isna().sum() > 0:
-                median_val = df[col].median()
-                df[col].fillna(median_val, inplace=True)
-                logger.info(f"Imputed {df[col].isna().sum()} missing values in {col} with median: {median_val}")
+        missing = df[columns].isna().sum()
+        imputer = GroupImputer('median', columns=columns).fit(df)
+        imputer.transform(df)
+        for col in missing[missing > 0].index:
+            logger.info(f"Imputed {missing[col]} missing values in {col} with median: {imputer.fill_values_.get(col)}")
         return df
     except Exception as e:
         logger.error(f"Error imputing missing values: {str(e)}")
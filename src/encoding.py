@@ -0,0 +1,186 @@
+import pandas as pd
+import numpy as np
+import scipy.sparse as sp
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+
+
+class CategoricalEncoder:
+    """
+    Fitted encoder that turns a mixed-type policy frame into a numeric matrix with a
+    frozen column layout.
+
+    Numeric and boolean columns pass through. Categorical columns with at most
+    `max_onehot_levels` kept levels are one-hot encoded into scipy-sparse blocks;
+    wider columns (PostalCode, Model, ...) get `high_cardinality` encoding instead,
+    either 'frequency' (share of training rows) or 'target' (smoothed target mean).
+    Levels seen fewer than `min_frequency` times, and levels unseen at fit time, fall
+    into a per-column rare bucket, so transform always yields the same columns.
+
+    Target means learned by fit are for new rows. fit_transform encodes the
+    training rows themselves with out-of-fold means, each row from the other
+    `n_folds` - 1 folds, so a row's own target never leaks into its feature.
+
+    Args:
+        max_onehot_levels (int): Widest column that is one-hot encoded.
+        min_frequency (int): Minimum training count for a level to keep its own column.
+        high_cardinality (str): 'frequency' or 'target' encoding for wide columns.
+        smoothing (float): Prior weight for target encoding.
+        rare_label (str): Name of the rare-level bucket.
+        fill_value (float): Replacement for missing numeric values.
+        n_folds (int): Folds for the out-of-fold target means of fit_transform.
+        random_state (int): Seed of the fold assignment.
+    """
+
+    def __init__(self, max_onehot_levels=30, min_frequency=10, high_cardinality='frequency',
+                 smoothing=20.0, rare_label='__rare__', fill_value=0.0, n_folds=5, random_state=42):
+        if high_cardinality not in ('frequency', 'target'):
+            raise ValueError(f"Unknown high-cardinality encoding: {high_cardinality}")
+        self.max_onehot_levels = max_onehot_levels
+        self.min_frequency = min_frequency
+        self.high_cardinality = high_cardinality
+        self.smoothing = smoothing
+        self.rare_label = rare_label
+        self.fill_value = fill_value
+        self.n_folds = n_folds
+        self.random_state = random_state
+
+    @staticmethod
+    def _levels(s):
+        return s.astype(object).where(s.notna(), 'missing').astype(str)
+
+    def fit(self, X, y=None):
+        """
+        Learn the column plan and per-column vocabularies from X.
+
+        Args:
+            X (pd.DataFrame): Training features.
+            y (array-like, optional): Training target, required for target encoding.
+
+        Returns:
+            CategoricalEncoder: self
+        """
+        if self.high_cardinality == 'target' and y is None:
+            raise ValueError("Target encoding requires y")
+        self.numeric_cols_ = [col for col in X.columns if is_numeric_dtype(X[col]) or is_bool_dtype(X[col])]
+        self.onehot_ = {}
+        self.mapped_ = {}
+        if y is not None:
+            y = np.asarray(y, dtype=np.float64)
+            prior = np.nanmean(y)
+
+        for col in X.columns:
+            if col in self.numeric_cols_:
+                continue
+            levels = self._levels(X[col])
+            counts = levels.value_counts()
+            kept = counts[counts >= self.min_frequency]
+            if len(kept) <= self.max_onehot_levels:
+                self.onehot_[col] = pd.Index(kept.index)
+            elif self.high_cardinality == 'frequency':
+                self.mapped_[col] = ((counts / len(levels)).to_dict(), 0.0)
+            else:
+                target = pd.Series(y, index=X.index).groupby(levels.values).agg(['sum', 'count'])
+                smoothed = (target['sum'] + self.smoothing * prior) / (target['count'] + self.smoothing)
+                self.mapped_[col] = (smoothed.to_dict(), prior)
+
+        self.encoded_cols_ = [col for col in X.columns if col in self.onehot_ or col in self.mapped_]
+        self.feature_names_ = list(self.numeric_cols_)
+        for col in self.encoded_cols_:
+            if col in self.onehot_:
+                self.feature_names_ += [f"{col}_{level}" for level in self.onehot_[col]]
+                self.feature_names_.append(f"{col}_{self.rare_label}")
+            else:
+                self.feature_names_.append(col)
+        return self
+
+    def get_feature_names_out(self):
+        return np.asarray(self.feature_names_, dtype=object)
+
+    def transform(self, X, sparse=True):
+        """
+        Encode X with the fitted plan.
+
+        Args:
+            X (pd.DataFrame): Features with the training columns.
+            sparse (bool): Return a scipy CSR matrix; otherwise a float32 DataFrame
+                with the frozen feature names.
+
+        Returns:
+            scipy.sparse.csr_matrix or pd.DataFrame: Encoded features.
+        """
+        return self._encode(X, sparse)
+
+    def _encode(self, X, sparse, mapped_values=None):
+        # mapped_values: {column: float32 array} overriding the fitted mapping
+        missing = [col for col in self.numeric_cols_ + self.encoded_cols_ if col not in X.columns]
+        if missing:
+            raise KeyError(f"Columns missing at transform time: {missing}")
+        n = len(X)
+        blocks = []
+
+        if self.numeric_cols_:
+            numeric = X[self.numeric_cols_].to_numpy(dtype=np.float32, na_value=np.nan)
+            if not numeric.flags.writeable:
+                # A single float32 block comes back as a read-only view under copy-on-write
+                numeric = numeric.copy()
+            numeric[np.isnan(numeric)] = self.fill_value
+            blocks.append(sp.csr_matrix(numeric))
+
+        rows = np.arange(n)
+        for col in self.encoded_cols_:
+            if mapped_values is not None and col in mapped_values:
+                blocks.append(sp.csr_matrix(mapped_values[col].reshape(-1, 1)))
+                continue
+            levels = self._levels(X[col])
+            if col in self.onehot_:
+                vocab = self.onehot_[col]
+                codes = vocab.get_indexer(levels)
+                # -1: rare at fit time or never seen, both go to the rare bucket
+                codes[codes < 0] = len(vocab)
+                blocks.append(sp.csr_matrix((np.ones(n, dtype=np.float32), (rows, codes)),
+                                            shape=(n, len(vocab) + 1)))
+            else:
+                mapping, default = self.mapped_[col]
+                values = levels.map(mapping).fillna(default).to_numpy(dtype=np.float32)
+                blocks.append(sp.csr_matrix(values.reshape(-1, 1)))
+
+        matrix = sp.hstack(blocks, format='csr', dtype=np.float32) if blocks else sp.csr_matrix((n, 0), dtype=np.float32)
+        if sparse:
+            return matrix
+        return pd.DataFrame(matrix.toarray(), columns=self.feature_names_, index=X.index)
+
+    def _out_of_fold_means(self, X, y):
+        """Smoothed target means per row of X from the folds that do not contain the row."""
+        y = np.asarray(y, dtype=np.float64)
+        valid = ~np.isnan(y)
+        y = np.where(valid, y, 0.0)
+        k = self.n_folds
+        fold = np.random.default_rng(self.random_state).permutation(len(X)) % k
+        # Per-fold prior from the other folds
+        fold_sum = np.bincount(fold, weights=y, minlength=k)
+        fold_count = np.bincount(fold, weights=valid, minlength=k)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prior = (fold_sum.sum() - fold_sum) / (fold_count.sum() - fold_count)
+        prior = np.where(np.isfinite(prior), prior, np.nanmean(np.where(valid, y, np.nan)))[fold]
+
+        means = {}
+        for col in self.mapped_:
+            codes, uniques = pd.factorize(self._levels(X[col]))
+            cell = codes * k + fold
+            size = len(uniques) * k
+            level_fold_sum = np.bincount(cell, weights=y, minlength=size).reshape(-1, k)
+            level_fold_count = np.bincount(cell, weights=valid, minlength=size).reshape(-1, k)
+            other_sum = level_fold_sum.sum(axis=1)[codes] - level_fold_sum[codes, fold]
+            other_count = level_fold_count.sum(axis=1)[codes] - level_fold_count[codes, fold]
+            means[col] = ((other_sum + self.smoothing * prior) / (other_count + self.smoothing)).astype(np.float32)
+        return means
+
+    def fit_transform(self, X, y=None, sparse=True):
+        """
+        Fit on X and encode it. Target-encoded columns of X get out-of-fold means
+        (see the class docstring); every other column is encoded as transform would.
+        """
+        self.fit(X, y)
+        if self.high_cardinality != 'target' or not self.mapped_ or self.n_folds < 2:
+            return self._encode(X, sparse)
+        return self._encode(X, sparse, mapped_values=self._out_of_fold_means(X, y))
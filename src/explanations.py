@@ -0,0 +1,219 @@
+import pandas as pd
+import numpy as np
+import os
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Worker-side explainer, built once per process by _init_worker
+_WORKER_EXPLAINER = {}
+
+
+def _allocate(counts, n):
+    """
+    Split n rows over strata of the given sizes (largest first): one row per
+    stratum, the rest proportionally by largest remainder, never more than a
+    stratum holds. Rows clipped off full strata go to the others.
+    """
+    n = min(n, int(counts.sum()))
+    if len(counts) >= n:
+        return (np.arange(len(counts)) < n).astype(np.int64)
+    sizes = np.ones(len(counts), dtype=np.int64)
+    remaining = n - len(counts)
+    while remaining > 0:
+        room = counts - sizes
+        weights = np.where(room > 0, counts, 0)
+        quota = remaining * weights / weights.sum()
+        extra = np.floor(quota).astype(np.int64)
+        extra[np.argsort(extra - quota, kind='stable')[:remaining - extra.sum()]] += 1
+        extra = np.minimum(extra, room)
+        sizes += extra
+        remaining -= extra.sum()
+    return sizes
+
+
+def stratified_sample(X, y=None, n=2000, n_strata=10, random_state=42):
+    """
+    Draw up to n rows of X, stratified on y so rare outcomes (claims) are kept.
+
+    Classes are used as strata for discrete y, quantile bins for continuous y;
+    without y the sample is uniform.
+
+    Returns:
+        pd.DataFrame: Sampled rows, index preserved.
+    """
+    if len(X) <= n:
+        return X
+    if y is None:
+        return X.sample(n=n, random_state=random_state)
+    y = pd.Series(np.asarray(y), index=X.index)
+    if y.nunique() <= n_strata:
+        strata = y
+    else:
+        strata = pd.qcut(y.rank(method='first'), n_strata, labels=False)
+    counts = strata.value_counts()
+    sizes = _allocate(counts.to_numpy(), n)
+    rng = np.random.default_rng(random_state)
+    codes = strata.to_numpy()
+    picks = [rng.choice(np.flatnonzero(codes == level), size, replace=False)
+             for level, size in zip(counts.index, sizes) if size]
+    return X.iloc[np.sort(np.concatenate(picks))]
+
+
+def data_hash(X):
+    """Content hash of a feature frame (values, index and column names)."""
+    digest = hashlib.md5(pd.util.hash_pandas_object(X, index=True).to_numpy().tobytes())
+    digest.update('|'.join(map(str, X.columns)).encode())
+    return digest.hexdigest()
+
+
+def model_hash(model):
+    """Content hash of a fitted model."""
+    import joblib
+    return joblib.hash(model)
+
+
+def as_float32(X):
+    """Numeric float32 copy of a feature frame; unparseable values become 0."""
+    if (X.dtypes == np.float32).all():
+        return X
+    return X.apply(pd.to_numeric, errors='coerce').fillna(0).astype('float32')
+
+
+def _is_tree_model(model):
+    module = type(model).__module__
+    return hasattr(model, 'estimators_') or hasattr(model, 'tree_') or module.startswith(('xgboost', 'lightgbm'))
+
+
+def make_explainer(model, background):
+    """
+    Path-dependent TreeExplainer for tree ensembles (needs no background and is
+    far cheaper), a background-data Explainer otherwise.
+    """
+    import shap
+    if _is_tree_model(model):
+        return shap.TreeExplainer(model)
+    return shap.Explainer(model, background)
+
+
+def _init_worker(model, background):
+    _WORKER_EXPLAINER['explainer'] = make_explainer(model, background)
+
+
+def _explain_chunk(X):
+    values = _WORKER_EXPLAINER['explainer'](X, check_additivity=False).values
+    # Classifiers yield one slice per class; keep the positive class
+    return values[..., 1] if values.ndim == 3 else values
+
+
+class ShapExplanationService:
+    """
+    Sampled, parallel and cached SHAP explanations for a fitted model.
+
+    Background and explanation rows are stratified samples of the training data.
+    SHAP values are computed in row chunks across a process pool and stored under
+    cache_dir keyed by the model hash and the explained data hash, so reports and
+    the scoring path reuse them instead of recomputing. Only the sampled rows are
+    converted to float32, never the full training frame.
+
+    Args:
+        model: Fitted model.
+        X (pd.DataFrame): Numeric feature frame the model was trained on.
+        y (array-like, optional): Target used for stratification.
+        sample_size (int): Rows to explain.
+        background_size (int): Rows in the background sample.
+        n_jobs (int): Worker processes for SHAP computation.
+        chunk_size (int): Rows per worker task.
+        cache_dir (str): Directory for cached SHAP values.
+        random_state (int): Sampling seed.
+    """
+
+    def __init__(self, model, X, y=None, sample_size=2000, background_size=200, n_jobs=1,
+                 chunk_size=250, cache_dir=os.path.join('models', 'shap'), random_state=42):
+        self.model = model
+        self.columns = X.columns
+        self.sample_size = sample_size
+        self.background_size = background_size
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.cache_dir = cache_dir
+        self.random_state = random_state
+        self.model_hash = model_hash(model)
+        # Sample first so only the sampled rows are coerced
+        self.sample = as_float32(stratified_sample(X, y, sample_size, random_state=random_state))
+        self.background = as_float32(stratified_sample(X, y, background_size, random_state=random_state + 1))
+        self._explainer = None
+
+    def _compute(self, X):
+        chunks = [X.iloc[i:i + self.chunk_size] for i in range(0, len(X), self.chunk_size)]
+        if self.n_jobs == 1 or len(chunks) == 1:
+            if self._explainer is None:
+                self._explainer = make_explainer(self.model, self.background)
+            _WORKER_EXPLAINER['explainer'] = self._explainer
+            parts = [_explain_chunk(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker,
+                                     initargs=(self.model, self.background)) as pool:
+                parts = list(pool.map(_explain_chunk, chunks))
+        return pd.DataFrame(np.vstack(parts), index=X.index, columns=X.columns)
+
+    def shap_values(self, X=None, cache=True):
+        """
+        SHAP values for X (default: the stratified explanation sample), read from
+        the cache when this model and data were explained before.
+
+        Args:
+            X (pd.DataFrame, optional): Numeric float32 rows to explain.
+            cache (bool): Read and write the on-disk cache. Off for one-off batches
+                that would otherwise leave one file each behind.
+
+        Returns:
+            pd.DataFrame: SHAP values, same index and columns as X.
+        """
+        if X is None:
+            X = self.sample
+        if not cache:
+            return self._compute(X)
+        path = os.path.join(self.cache_dir, f"{self.model_hash[:16]}-{data_hash(X)[:16]}.parquet")
+        if os.path.exists(path):
+            logger.info(f"Loaded cached SHAP values from {path}")
+            return pd.read_parquet(path)
+        values = self._compute(X)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            values.to_parquet(path)
+            logger.info(f"Cached SHAP values for {len(X)} rows in {path}")
+        except Exception as e:
+            logger.warning(f"Could not cache SHAP values: {e}")
+        return values
+
+    def global_importance(self):
+        """Mean absolute SHAP value per feature over the explanation sample."""
+        return self.shap_values().abs().mean().sort_values(ascending=False)
+
+    def explain_policies(self, X, top_n=5):
+        """
+        Per-policy explanations for the scoring path: the top_n features by
+        absolute contribution for each row of X. Scoring batches are rarely seen
+        twice, so they bypass the disk cache.
+
+        Returns:
+            pd.DataFrame: Long table of (row, feature, shap_value), largest first.
+        """
+        X = as_float32(X[self.columns])
+        values = self.shap_values(X, cache=False)
+        long = values.stack().rename('shap_value').reset_index()
+        long.columns = ['row', 'feature', 'shap_value']
+        long['abs_value'] = long['shap_value'].abs()
+        top = long.sort_values(['row', 'abs_value'], ascending=[True, False]).groupby('row', sort=False).head(top_n)
+        return top.drop(columns='abs_value').reset_index(drop=True)
+
+    def summary_plot(self, max_display=10):
+        """Draw the SHAP summary plot for the explanation sample."""
+        import shap
+        values = self.shap_values()
+        shap.summary_plot(values.to_numpy(), self.sample.loc[values.index], max_display=max_display)
@@ -1,25 +1,27 @@
 import pandas as pd
 import numpy as np
-from scipy.stats import chi2_contingency, ttest_ind
+from scipy.stats import chi2_contingency, ttest_ind, chi2 as chi2_dist, norm, t as t_dist
+from src.segment_metrics import aggregate_segments, combine_segment_stats, compute_segment_stats
+from src.instrumentation import instrument
 
 # Metric calculation functions
 def claim_frequency(df, group_col):
     """
     Calculate claim frequency for each group.
     """
-    return df.groupby(group_col)['TotalClaims'].apply(lambda x: (x > 0).mean())
+    return aggregate_segments(df, group_col)['claim_frequency'].rename('TotalClaims')
 
 def claim_severity(df, group_col):
     """
     Calculate claim severity for each group.
     """
-    return df[df['TotalClaims'] > 0].groupby(group_col)['TotalClaims'].mean()
+    return aggregate_segments(df, group_col)['claim_severity'].dropna().rename('TotalClaims')
 
 def margin(df, group_col):
     """
     Calculate margin (TotalPremium - TotalClaims) for each group.
     """
-    return df.groupby(group_col).apply(lambda x: (x['TotalPremium'] - x['TotalClaims']).mean())
+    return aggregate_segments(df, group_col)['margin'].rename(None)
 
 # Statistical test functions
 def chi2_test(df, group_col, outcome_col):
@@ -37,6 +39,136 @@ def t_test(group_a, group_b):
     """
     return ttest_ind(group_a, group_b, equal_var=False)
 
+# Batch testing from per-group sufficient statistics
+# metric -> (count column, sum column, M2 column) in segment statistics
+_MEAN_METRICS = {
+    'claim_severity': ('n_claims', 'severity_sum', 'severity_m2'),
+    'margin': ('margin_n', 'margin_sum', 'margin_m2'),
+}
+
+def adjust_pvalues(p_values, method='fdr_bh'):
+    """
+    Adjust p-values for multiple testing ('fdr_bh', 'holm', 'bonferroni' or None).
+    NaN p-values are left out of the family and stay NaN.
+    """
+    p = np.asarray(p_values, dtype=float)
+    adjusted = np.full_like(p, np.nan)
+    valid = ~np.isnan(p)
+    m = valid.sum()
+    if method is None or m == 0:
+        adjusted[valid] = p[valid]
+        return adjusted
+    pv = p[valid]
+    order = np.argsort(pv)
+    ranked = pv[order]
+    if method == 'bonferroni':
+        out = np.minimum(pv * m, 1.0)
+    elif method == 'holm':
+        stepped = np.maximum.accumulate(ranked * (m - np.arange(m)))
+        out = np.empty(m)
+        out[order] = np.minimum(stepped, 1.0)
+    elif method == 'fdr_bh':
+        stepped = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+        out = np.empty(m)
+        out[order] = np.minimum(stepped, 1.0)
+    else:
+        raise ValueError(f"Unknown p-value adjustment method: {method}")
+    adjusted[valid] = out
+    return adjusted
+
+def _pair_indices(k, mode):
+    if mode == 'pairwise':
+        return np.triu_indices(k, 1)
+    if mode == 'one_vs_rest':
+        return np.arange(k), np.full(k, -1)
+    raise ValueError(f"Unknown comparison mode: {mode}")
+
+def _proportion_tests(n_a, k_a, n_b, k_b):
+    """Pooled two-proportion z-test and the equivalent 2x2 chi-squared test (no continuity correction)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_a, p_b = k_a / n_a, k_b / n_b
+        pooled = (k_a + k_b) / (n_a + n_b)
+        z = (p_a - p_b) / np.sqrt(pooled * (1 - pooled) * (1 / n_a + 1 / n_b))
+    p_z = 2 * norm.sf(np.abs(z))
+    return p_a, p_b, {'z': (z, p_z), 'chi2': (z ** 2, chi2_dist.sf(z ** 2, 1))}
+
+def _mean_tests(n_a, s_a, m2_a, n_b, s_b, m2_b):
+    """Welch t-test and large-sample z-test for a difference in means, from counts, sums and M2."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_a, mean_b = s_a / n_a, s_b / n_b
+        var_a, var_b = m2_a / (n_a - 1), m2_b / (n_b - 1)
+        se_a, se_b = var_a / n_a, var_b / n_b
+        stat = (mean_a - mean_b) / np.sqrt(se_a + se_b)
+        dof = (se_a + se_b) ** 2 / (se_a ** 2 / (n_a - 1) + se_b ** 2 / (n_b - 1))
+    small = (n_a < 2) | (n_b < 2)
+    stat = np.where(small, np.nan, stat)
+    p_t = 2 * t_dist.sf(np.abs(stat), dof)
+    p_z = 2 * norm.sf(np.abs(stat))
+    return mean_a, mean_b, {'welch_t': (stat, p_t), 'z': (stat, p_z)}
+
+def _rest_m2(n_a, s_a, m2_a, n, s, m2):
+    """M2 of the portfolio minus side a: the Chan et al. merge solved for the other part."""
+    n_r, s_r = n - n_a, s - s_a
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = np.where((n_a > 0) & (n_r > 0), s_a / n_a - s_r / n_r, 0.0)
+        between = np.where(n > 0, delta ** 2 * n_a * n_r / n, 0.0)
+    return np.maximum(m2 - m2_a - between, 0)
+
+@instrument()
+def batch_segment_tests(df, group_col, metrics=('claim_frequency', 'claim_severity', 'margin'),
+                        mode='pairwise', p_adjust='fdr_bh', alpha=0.05, stats=None):
+    """
+    Test every pair of groups (or each group vs the rest) on claim frequency,
+    severity and margin from one groupby of sufficient statistics.
+
+    claim_frequency gets chi-squared and z tests; claim_severity and margin get
+    Welch t and z tests. p-values are adjusted within each (metric, test) family.
+    Pass precomputed `stats` from segment_metrics.compute_segment_stats to skip
+    the scan of df.
+
+    Returns: tidy DataFrame with one row per (metric, test, group_a, group_b);
+    group labels are strings.
+    """
+    if stats is None:
+        stats = compute_segment_stats(df, group_col)
+    # Labels are text on both sides, since side b can be 'rest'
+    groups = stats.index.astype(str).to_numpy(dtype=object)
+    idx_a, idx_b = _pair_indices(len(groups), mode)
+    totals = combine_segment_stats(stats).iloc[0]
+
+    def sides(col):
+        # index -1 on side b stands for 'rest': the portfolio total minus side a
+        values = stats[col].to_numpy(dtype=float)
+        a = values[idx_a]
+        return a, np.where(idx_b < 0, totals[col] - a, values[np.maximum(idx_b, 0)])
+
+    label_b = np.where(idx_b < 0, 'rest', groups[np.maximum(idx_b, 0)]).astype(object)
+    frames = []
+    for metric in metrics:
+        if metric == 'claim_frequency':
+            (n_a, n_b), (k_a, k_b) = sides('n'), sides('n_claims')
+            value_a, value_b, results = _proportion_tests(n_a, k_a, n_b, k_b)
+        elif metric in _MEAN_METRICS:
+            n_col, s_col, m2_col = _MEAN_METRICS[metric]
+            (n_a, n_b), (s_a, s_b), (m2_a, m2_b) = sides(n_col), sides(s_col), sides(m2_col)
+            if mode == 'one_vs_rest':
+                m2_b = _rest_m2(n_a, s_a, m2_a, totals[n_col], totals[s_col], totals[m2_col])
+            value_a, value_b, results = _mean_tests(n_a, s_a, m2_a, n_b, s_b, m2_b)
+        else:
+            raise ValueError(f"Unknown metric: {metric}")
+        for test, (statistic, p_value) in results.items():
+            p_adjusted = adjust_pvalues(p_value, p_adjust)
+            frames.append(pd.DataFrame({
+                'metric': metric, 'test': test,
+                'group_a': groups[idx_a], 'group_b': label_b,
+                'n_a': n_a, 'n_b': n_b, 'value_a': value_a, 'value_b': value_b,
+                'statistic': statistic, 'p_value': p_value,
+                'p_adjusted': p_adjusted, 'reject': p_adjusted < alpha,
+            }))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
 def plot_group_metric(metric_series, title, ylabel):
     import matplotlib.pyplot as plt
     metric_series.plot(kind='bar', figsize=(10, 5))
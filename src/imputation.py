@@ -0,0 +1,181 @@
+import pandas as pd
+import numpy as np
+import os
+import logging
+from pandas.api.types import CategoricalDtype, is_numeric_dtype, is_bool_dtype
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _is_numeric(series):
+    return is_numeric_dtype(series.dtype) and not is_bool_dtype(series.dtype)
+
+
+def _group_codes(df, by):
+    """(group code per row, index of the groups); -1 where a key is missing."""
+    grouper = df.groupby(by, observed=True, sort=True)
+    return grouper.ngroup().to_numpy(), grouper.size().index
+
+
+def _modes(series, group_codes=None, n_groups=1):
+    """
+    Most frequent value per group from factorized codes, in O(rows): ties go to
+    the smallest value, like Series.mode(). Categorical codes are used as-is.
+    """
+    if isinstance(series.dtype, CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series, sort=True, use_na_sentinel=True)
+    k = len(uniques)
+    if group_codes is None:
+        group_codes = np.zeros(len(codes), dtype=np.int64)
+    valid = (codes >= 0) & (group_codes >= 0)
+    keys = group_codes[valid].astype(np.int64) * k + codes[valid]
+    if n_groups * k <= 50_000_000:
+        counts = np.bincount(keys, minlength=n_groups * k).reshape(n_groups, k) if k else np.zeros((n_groups, 0))
+        best = counts.argmax(axis=1) if k else np.zeros(n_groups, dtype=np.int64)
+        support = counts.max(axis=1) if k else np.zeros(n_groups, dtype=np.int64)
+    else:
+        found, counts = np.unique(keys, return_counts=True)
+        groups, value_codes = found // k, found % k
+        order = np.lexsort((value_codes, -counts, groups))
+        first = order[np.r_[True, groups[order][1:] != groups[order][:-1]]]
+        best = np.zeros(n_groups, dtype=np.int64)
+        support = np.zeros(n_groups, dtype=np.int64)
+        best[groups[first]], support[groups[first]] = value_codes[first], counts[first]
+    modes = np.asarray(uniques, dtype=object)[best] if k else np.full(n_groups, None, dtype=object)
+    return modes, support
+
+
+class GroupImputer:
+    """
+    Fill statistics learned in one pass and applied in place, optionally per segment.
+
+    Numeric columns get their mean or median, categorical and string columns
+    their most frequent value. With `by` (e.g. 'Province' or ['Province',
+    'VehicleType']) the statistics are computed per segment in a single grouped
+    aggregation, and segments with fewer than `min_group_size` observed values
+    fall back to the global statistic. Fitted statistics are plain frames, so the
+    imputer can be saved and replayed on scoring batches or chunks.
+
+    Args:
+        strategy (str): 'mean' or 'median' for numeric columns.
+        by (str or list, optional): Segment columns to condition on.
+        columns (list, optional): Columns to impute. Defaults to every column
+            except `by`.
+        min_group_size (int): Minimum non-missing values for a segment statistic.
+        categorical_fill (str): Fill for categorical columns with no observed value.
+    """
+
+    def __init__(self, strategy='median', by=None, columns=None, min_group_size=30, categorical_fill='missing'):
+        if strategy not in ('mean', 'median'):
+            raise ValueError(f"Unknown imputation strategy: {strategy}")
+        self.strategy = strategy
+        self.by = [by] if isinstance(by, str) else list(by or [])
+        self.columns = columns
+        self.min_group_size = min_group_size
+        self.categorical_fill = categorical_fill
+
+    def fit(self, df):
+        """
+        Learn global and per-segment fill values.
+
+        Returns:
+            GroupImputer: self
+        """
+        columns = [col for col in (self.columns or df.columns) if col in df.columns and col not in self.by]
+        numeric = [col for col in columns if _is_numeric(df[col])]
+        categorical = [col for col in columns if col not in numeric and not is_bool_dtype(df[col].dtype)]
+
+        numeric_stats = df[numeric].agg(self.strategy) if numeric else pd.Series(dtype=np.float64)
+        self.fill_values_ = numeric_stats.dropna().to_dict()
+        self.numeric_columns_ = numeric
+        self.categorical_columns_ = categorical
+
+        if self.by:
+            group_codes, groups = _group_codes(df, self.by)
+            grouped = df[numeric].groupby([df[col] for col in self.by], observed=True, sort=True)
+            stats = grouped.agg(self.strategy).reindex(groups) if numeric else pd.DataFrame(index=groups)
+            support = grouped.count().reindex(groups) if numeric else pd.DataFrame(index=groups)
+            stats = stats.where(support >= self.min_group_size)
+        for col in categorical:
+            modes, counts = _modes(df[col])
+            self.fill_values_[col] = modes[0] if counts[0] else self.categorical_fill
+            if self.by:
+                modes, counts = _modes(df[col], group_codes, len(groups))
+                stats[col] = pd.Series(np.where(counts >= self.min_group_size, modes, None), index=groups,
+                                       dtype=object)
+        self.group_fill_values_ = stats.dropna(axis=1, how='all') if self.by else None
+        logger.info(f"Learned fill values for {len(numeric)} numeric and {len(categorical)} categorical columns"
+                    + (f" per {' x '.join(self.by)} ({len(groups)} segments)" if self.by else ""))
+        return self
+
+    def _fills(self, df, col, mask):
+        """Fill values for the masked rows of col: segment statistic, else global."""
+        value = self.fill_values_.get(col)
+        if self.group_fill_values_ is None or col not in self.group_fill_values_.columns:
+            return value
+        keys = df.loc[mask, self.by]
+        index = pd.MultiIndex.from_frame(keys) if len(self.by) > 1 else pd.Index(keys.iloc[:, 0])
+        fills = self.group_fill_values_[col].reindex(index).to_numpy()
+        if value is not None:
+            fills = np.where(pd.isna(fills), value, fills)
+        return fills
+
+    def transform(self, df, inplace=True):
+        """
+        Fill missing values column by column, touching only the missing rows.
+
+        Args:
+            df (pd.DataFrame): Frame with the fitted columns (and `by` columns).
+            inplace (bool): Modify df; otherwise work on a copy.
+
+        Returns:
+            pd.DataFrame: The imputed frame.
+        """
+        if not inplace:
+            df = df.copy()
+        for col in self.numeric_columns_ + self.categorical_columns_:
+            if col not in df.columns:
+                continue
+            mask = df[col].isna().to_numpy()
+            if not mask.any():
+                continue
+            fills = self._fills(df, col, mask)
+            if fills is None:
+                continue
+            if isinstance(df[col].dtype, CategoricalDtype):
+                new = pd.Index(np.atleast_1d(fills)).dropna().unique().difference(df[col].cat.categories)
+                if len(new):
+                    df[col] = df[col].cat.add_categories(new)
+            if np.isscalar(fills):
+                df[col] = df[col].fillna(fills)
+            else:
+                df.loc[mask, col] = fills
+        return df
+
+    def fit_transform(self, df, inplace=True):
+        return self.fit(df).transform(df, inplace=inplace)
+
+    def transform_chunks(self, chunks):
+        """Lazily impute an iterable of chunks in place."""
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+    def save(self, path):
+        """Serialize the fitted statistics with joblib."""
+        import joblib
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        joblib.dump(self, path, compress=3)
+        logger.info(f"Saved imputer to {path}")
+
+    @classmethod
+    def load(cls, path):
+        """Load an imputer saved with save()."""
+        import joblib
+        imputer = joblib.load(path)
+        if not isinstance(imputer, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}")
+        return imputer
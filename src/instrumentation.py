@@ -0,0 +1,295 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import functools
+import contextlib
+import tracemalloc
+from collections import deque
+from datetime import datetime, timezone
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Optional capture per stage: None, 'cprofile' or 'tracemalloc'. Read from the
+# environment so a batch run can be profiled without code changes.
+PROFILE_ENV = 'PIPELINE_PROFILE'
+PROFILE_DIR_ENV = 'PIPELINE_PROFILE_DIR'
+MAX_RECORDS = 10_000
+
+_records = deque(maxlen=MAX_RECORDS)
+# Running per-stage totals, kept apart from the bounded record log so that
+# exported counters never decrease
+_totals = {}
+_lock = threading.Lock()
+_local = threading.local()
+_profile = {'mode': os.environ.get(PROFILE_ENV) or None,
+            'output_dir': os.environ.get(PROFILE_DIR_ENV, 'profiles'),
+            # True while tracemalloc runs because a stage started it
+            'started_tracemalloc': False}
+
+
+def set_profile_mode(mode=None, output_dir=None):
+    """
+    Enable an extra capture for every stage: 'cprofile' writes one .prof file
+    per top-level stage call to output_dir, 'tracemalloc' adds the peak traced Python
+    allocation to each record. None disables both, and stops tracemalloc if a
+    stage started it; tracing started by the caller is left running.
+    """
+    if mode not in (None, 'cprofile', 'tracemalloc'):
+        raise ValueError(f"Unknown profile mode: {mode}")
+    _profile['mode'] = mode
+    if mode != 'tracemalloc' and _profile['started_tracemalloc']:
+        tracemalloc.stop()
+        _profile['started_tracemalloc'] = False
+    if output_dir:
+        _profile['output_dir'] = output_dir
+
+
+def _peak_rss_bytes():
+    """Process RSS high-water mark, or None where it cannot be read."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    except ImportError:
+        return None
+
+
+def _rows(obj):
+    """Row count of a frame, array or sparse matrix, or of the first one in a tuple."""
+    if isinstance(obj, (tuple, list)):
+        return next((_rows(item) for item in obj if hasattr(item, 'shape')), None)
+    shape = getattr(obj, 'shape', None)
+    return int(shape[0]) if shape else None
+
+
+def _nbytes(obj):
+    """
+    Shallow memory of a frame/array/sparse matrix (summed over a tuple). Object
+    columns count their pointers only; deep sizing would cost a full scan.
+    """
+    if isinstance(obj, (tuple, list)):
+        sizes = [_nbytes(item) for item in obj]
+        sizes = [size for size in sizes if size is not None]
+        return sum(sizes) if sizes else None
+    if hasattr(obj, 'memory_usage'):
+        usage = obj.memory_usage(index=True, deep=False)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if hasattr(obj, 'indptr'):
+        return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+    nbytes = getattr(obj, 'nbytes', None)
+    return int(nbytes) if nbytes is not None else None
+
+
+def _first_frame(args, kwargs):
+    for value in list(args) + list(kwargs.values()):
+        if hasattr(value, 'shape') and not isinstance(value, type):
+            return value
+    return None
+
+
+@contextlib.contextmanager
+def stage(name, data=None, level=logging.INFO):
+    """
+    Measure a block as a named pipeline stage.
+
+    Records wall and CPU time, the process peak RSS at the end of the stage,
+    its growth during the stage, and rows/memory of `data` (input) and of
+    whatever is assigned to record['output']. Nested stages are recorded too,
+    with their parent's name.
+
+    Top-level stages are logged at `level`; pass logging.DEBUG for per-batch
+    stages on hot paths, which are then logged at INFO only while a profile
+    mode is set. Nested stages are always logged at DEBUG. Records are kept
+    either way.
+
+    Usage:
+        with stage('score_batch', df) as record:
+            record['output'] = pipeline.transform(df)
+    """
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    mode = _profile['mode']
+    record = {'stage': name, 'parent': stack[-1] if stack else None,
+              'rows_in': _rows(data), 'bytes_in': _nbytes(data), 'output': None}
+    profiler = None
+    if mode == 'tracemalloc':
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _profile['started_tracemalloc'] = True
+        if not stack:
+            tracemalloc.reset_peak()
+    elif mode == 'cprofile' and not stack:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    stack.append(name)
+    rss_before = _peak_rss_bytes()
+    started = datetime.now(timezone.utc)
+    wall, cpu = time.perf_counter(), time.process_time()
+    error = None
+    try:
+        yield record
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        stack.pop()
+        output = record.pop('output')
+        rss_after = _peak_rss_bytes()
+        record.update({
+            'started_at': started.isoformat(timespec='milliseconds'),
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            'peak_rss_bytes': rss_after,
+            'peak_rss_growth_bytes': rss_after - rss_before if rss_after is not None else None,
+            'rows_out': _rows(output),
+            'bytes_out': _nbytes(output),
+            'error': error,
+        })
+        if mode == 'tracemalloc':
+            record['traced_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(_profile['output_dir'], exist_ok=True)
+            path = os.path.join(_profile['output_dir'], f"{name}-{started.strftime('%Y%m%dT%H%M%S%f')}.prof")
+            profiler.dump_stats(path)
+            record['profile_path'] = path
+        _record(record)
+        if record['parent'] is not None:
+            level = logging.DEBUG
+        elif mode is not None:
+            level = max(level, logging.INFO)
+        logger.log(level, f"Stage {name}: {wall:.2f}s wall, {cpu:.2f}s cpu, "
+                          f"rows {record['rows_in']} -> {record['rows_out']}"
+                   + (f", peak RSS {rss_after / 1e6:.0f} MB" if rss_after is not None else ""))
+
+
+def instrument(name=None, level=logging.INFO):
+    """
+    Decorator recording each call of a function as a stage (see stage()). Rows
+    and memory are taken from the first frame/array argument and from the
+    return value; `level` is the log level of top-level calls.
+    """
+    def decorator(func):
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name, _first_frame(args, kwargs), level=level) as record:
+                result = func(*args, **kwargs)
+                record['output'] = result
+                return result
+        return wrapper
+    return decorator
+
+
+def _record(record):
+    with _lock:
+        _records.append(record)
+        total = _totals.setdefault(record['stage'], {
+            'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows_in': 0, 'rows_out': 0,
+            'max_bytes_out': 0, 'max_peak_rss_bytes': 0, 'errors': 0,
+        })
+        total['calls'] += 1
+        total['wall_seconds'] += record['wall_seconds']
+        total['cpu_seconds'] += record['cpu_seconds']
+        total['rows_in'] += record['rows_in'] or 0
+        total['rows_out'] += record['rows_out'] or 0
+        total['max_bytes_out'] = max(total['max_bytes_out'], record['bytes_out'] or 0)
+        total['max_peak_rss_bytes'] = max(total['max_peak_rss_bytes'], record['peak_rss_bytes'] or 0)
+        total['errors'] += record['error'] is not None
+
+
+def records(stage_name=None):
+    """The last MAX_RECORDS stage calls, oldest first, optionally for one stage."""
+    with _lock:
+        rows = list(_records)
+    return [row for row in rows if stage_name is None or row['stage'] == stage_name]
+
+
+def reset():
+    """Drop all recorded stage calls and totals."""
+    with _lock:
+        _records.clear()
+        _totals.clear()
+
+
+def summary():
+    """
+    Per-stage totals over every call since the last reset().
+
+    Returns:
+        dict: {stage: {'calls', 'wall_seconds', 'cpu_seconds', 'rows_in', 'rows_out',
+            'max_bytes_out', 'max_peak_rss_bytes', 'errors'}}
+    """
+    with _lock:
+        return {name: dict(total) for name, total in _totals.items()}
+
+
+def export_json(path=None):
+    """
+    Stage records and per-stage totals as JSON; written to path when given.
+
+    Returns:
+        str: The JSON document.
+    """
+    document = json.dumps({'summary': summary(), 'records': records()}, indent=2, default=str)
+    if path:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(document)
+        logger.info(f"Wrote stage metrics to {path}")
+    return document
+
+
+_PROMETHEUS_METRICS = [
+    ('calls', 'pipeline_stage_calls_total', 'counter', "Completed calls of the stage"),
+    ('wall_seconds', 'pipeline_stage_wall_seconds_total', 'counter', "Wall-clock time spent in the stage"),
+    ('cpu_seconds', 'pipeline_stage_cpu_seconds_total', 'counter', "Process CPU time spent in the stage"),
+    ('rows_in', 'pipeline_stage_rows_in_total', 'counter', "Input rows processed by the stage"),
+    ('rows_out', 'pipeline_stage_rows_out_total', 'counter', "Output rows produced by the stage"),
+    ('errors', 'pipeline_stage_errors_total', 'counter', "Calls of the stage that raised"),
+    ('max_bytes_out', 'pipeline_stage_output_bytes', 'gauge', "Largest output frame of the stage"),
+    ('max_peak_rss_bytes', 'pipeline_stage_peak_rss_bytes', 'gauge', "Process peak RSS after the stage"),
+]
+
+
+def export_prometheus(path=None):
+    """
+    Per-stage totals in the Prometheus text exposition format, e.g. for the
+    node-exporter textfile collector; written to path when given.
+
+    Returns:
+        str: The exposition text.
+    """
+    totals = summary()
+    lines = []
+    for key, metric, kind, help_text in _PROMETHEUS_METRICS:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        for stage_name, total in sorted(totals.items()):
+            label = stage_name.replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'{metric}{{stage="{label}"}} {float(total[key])!r}')
+    text = '\n'.join(lines) + '\n'
+    if path:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            fh.write(text)
+        os.replace(tmp_path, path)
+        logger.info(f"Wrote stage metrics to {path}")
+    return text
@@ -1,105 +1,151 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from xgboost import XGBRegressor, XGBClassifier
-from sklearn.metrics import mean_squared_error, r2_score, accuracy_score, precision_score, recall_score, f1_score
-import shap
-
-
-def handle_missing(df, strategy='mean'):
-    df = df.copy()
-    for col in df.select_dtypes(include=[np.number]).columns:
-        if df[col].isnull().sum() > 0:
-            if strategy == 'mean':
-                df[col] = df[col].fillna(df[col].mean())
-            elif strategy == 'median':
-                df[col] = df[col].fillna(df[col].median())
-    for col in df.select_dtypes(include=['object']).columns:
-        if df[col].isnull().sum() > 0:
-            mode = df[col].mode()
-            if not mode.empty:
-                df[col] = df[col].fillna(mode[0])
-            else:
-                df[col] = df[col].fillna('missing')
-    return df
-
-def encode_categoricals(df):
+import scipy.sparse as sp
+# sklearn, xgboost and shap are imported inside the functions that use them:
+# together they cost seconds of startup that data-only callers should not pay
+from src.encoding import CategoricalEncoder
+from src.imputation import GroupImputer
+# feature_engineering lives with the pipeline that applies it; re-exported here
+from src.preprocessing import PreprocessingPipeline, feature_engineering
+from src.explanations import ShapExplanationService
+from src.instrumentation import instrument
+
+
+@instrument()
+def handle_missing(df, strategy='mean', by=None):
+    # Numeric columns get the mean/median, string and categorical columns the
+    # mode, optionally per segment `by`; see GroupImputer
+    return GroupImputer(strategy, by=by).fit_transform(df, inplace=False)
+
+def encode_categoricals(df, risk_index=None):
+    # A fitted PostalRiskIndex replaces the PostalCode dummies with one dense column
+    if risk_index is not None and risk_index.postal_col in df.columns:
+        df = df.drop(columns=[risk_index.postal_col]).assign(**{risk_index.feature_name: risk_index.transform(df)})
     return pd.get_dummies(df, drop_first=True)
 
-def feature_engineering(df):
-    df = df.copy()
-    # Example: vehicle age
-    if 'RegistrationYear' in df.columns and 'TransactionMonth' in df.columns:
-        df['TransactionYear'] = pd.to_datetime(df['TransactionMonth']).dt.year
-        df['VehicleAge'] = df['TransactionYear'] - df['RegistrationYear']
-    return df
-
-def prepare_data(df, target, drop_cols=None, test_size=0.2, random_state=42, regression=True):
-    df = handle_missing(df)
-    df = feature_engineering(df)
-
-    if drop_cols:
-        safe_drop_cols = [col for col in drop_cols if col != target]
-        if safe_drop_cols:
-            df = df.drop(columns=safe_drop_cols)
-    X = df.drop(columns=[target])
-    y = df[target]
-    X = encode_categoricals(X)
-
-    X = X.fillna(0)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+@instrument()
+def prepare_data(df, target, drop_cols=None, test_size=0.2, random_state=42, regression=True,
+                 encoder=None, sparse=False, return_encoder=False, return_pipeline=False, impute_by=None,
+                 risk_index=None):
+    from sklearn.model_selection import train_test_split
+    train_df, test_df = train_test_split(df, test_size=test_size, random_state=random_state)
+
+    # Imputation statistics and the encoding vocabulary are learned from the
+    # training split only and replayed on the test split; the fitted pipeline can
+    # be saved and reused to score new policies.
+    pipeline = PreprocessingPipeline(target, drop_cols=drop_cols, encoder=encoder, impute_by=impute_by,
+                                     risk_index=risk_index)
+    X_train = pipeline.fit_transform(train_df, sparse=sparse)
+    X_test = pipeline.transform(test_df, sparse=sparse)
+    y_train, y_test = train_df[target], test_df[target]
+    if return_pipeline:
+        return X_train, X_test, y_train, y_test, pipeline
+    if return_encoder:
+        return X_train, X_test, y_train, y_test, pipeline.encoder
     return X_train, X_test, y_train, y_test
 
 
+@instrument()
 def train_linear_regression(X_train, y_train):
+    from sklearn.linear_model import LinearRegression
     model = LinearRegression()
     model.fit(X_train, y_train)
     return model
 
-def train_random_forest(X_train, y_train, regression=True, random_state=42):
+@instrument()
+def train_random_forest(X_train, y_train, regression=True, random_state=42, n_jobs=None):
+    from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
     if regression:
-        model = RandomForestRegressor(random_state=random_state)
+        model = RandomForestRegressor(random_state=random_state, n_jobs=n_jobs)
     else:
-        model = RandomForestClassifier(random_state=random_state)
+        model = RandomForestClassifier(random_state=random_state, n_jobs=n_jobs)
     model.fit(X_train, y_train)
     return model
 
-def filter_flat_numeric_columns(df):
-    import numpy as np
-    import pandas as pd
-    def is_flat_numeric_col(s):
-        if not isinstance(s, pd.Series):
-            return False
-        for v in s:
-            if isinstance(v, (list, tuple, np.ndarray, pd.DataFrame, pd.Series)) and not pd.isna(v):
-                return False
-        return True
-    flat_cols = [col for col in df.columns if is_flat_numeric_col(df[col])]
-    df = df[flat_cols]
-    df = df.apply(pd.to_numeric, errors='coerce')
-    df = df.select_dtypes(include=[np.number]).astype('float64')
-    return df
-
+# Types inferred for object columns that pd.to_numeric can coerce cell-wise
+_COERCIBLE_INFERRED = {'string', 'floating', 'integer', 'mixed-integer-float', 'decimal',
+                       'boolean', 'empty', 'mixed-integer', 'bytes'}
+
+def numeric_column_plan(df):
+    """
+    Decide from dtypes how each column becomes a float32 feature.
+
+    Numeric and bool columns are kept as-is, categoricals are mapped through their
+    (few) categories, other columns are coerced with pd.to_numeric. Only object
+    columns that pandas infers as 'mixed' are scanned for nested values (lists,
+    arrays, frames), and those columns are dropped. The plan can be reused on
+    test and scoring frames via filter_flat_numeric_columns(df, plan=...).
+    """
+    plan = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+            plan[col] = 'keep'
+        elif isinstance(s.dtype, pd.CategoricalDtype):
+            plan[col] = 'category'
+        elif s.dtype != object or pd.api.types.infer_dtype(s, skipna=True) in _COERCIBLE_INFERRED:
+            plan[col] = 'coerce'
+        elif s.map(lambda v: isinstance(v, (list, tuple, np.ndarray, pd.DataFrame, pd.Series))).any():
+            continue
+        else:
+            plan[col] = 'coerce'
+    return plan
+
+def filter_flat_numeric_columns(df, plan=None):
+    """
+    Return df as a float32 feature frame, following `plan` (built from df when
+    omitted). Plan columns absent from df are filled with NaN, extra columns are
+    dropped, and a frame that is already float32 in plan order is returned without
+    a copy. Sparse matrices pass through as float32.
+    """
+    if sp.issparse(df):
+        return df.astype(np.float32, copy=False)
+    plan = numeric_column_plan(df) if plan is None else plan
+    if list(df.columns) == list(plan) and all(
+            action == 'keep' and df[col].dtype == np.float32 for col, action in plan.items()):
+        return df
+
+    arrays = {}
+    for col, action in plan.items():
+        if col not in df.columns:
+            arrays[col] = np.full(len(df), np.nan, dtype=np.float32)
+            continue
+        s = df[col]
+        if action == 'category':
+            lookup = pd.to_numeric(pd.Series(s.cat.categories), errors='coerce').to_numpy(dtype=np.float32)
+            codes = s.cat.codes.to_numpy()
+            arrays[col] = np.where(codes >= 0, lookup[codes] if len(lookup) else np.nan, np.nan).astype(np.float32)
+        else:
+            if action == 'coerce':
+                s = pd.to_numeric(s, errors='coerce')
+            arrays[col] = s.to_numpy(dtype=np.float32, na_value=np.nan)
+    return pd.DataFrame(arrays, index=df.index)
+
+@instrument()
 def train_xgboost(X_train, y_train, regression=True, random_state=42):
     from xgboost import XGBRegressor, XGBClassifier
-    X_train = filter_flat_numeric_columns(X_train)
+    plan = None if sp.issparse(X_train) else numeric_column_plan(X_train)
+    X_train = filter_flat_numeric_columns(X_train, plan)
     if regression:
         model = XGBRegressor(random_state=random_state, verbosity=0)
     else:
         model = XGBClassifier(random_state=random_state, use_label_encoder=False, verbosity=0)
     model.fit(X_train, y_train)
+    # Reuse at predict time: filter_flat_numeric_columns(X_test, model.numeric_plan_)
+    model.numeric_plan_ = plan
     return model
 
 # Model Evaluation
 
 def regression_metrics(y_true, y_pred):
-    rmse = mean_squared_error(y_true, y_pred, squared=False)
+    from sklearn.metrics import mean_squared_error, r2_score
+    # mean_squared_error(squared=False) was removed in scikit-learn 1.6
+    rmse = float(np.sqrt(mean_squared_error(y_true, y_pred)))
     r2 = r2_score(y_true, y_pred)
     return {'RMSE': rmse, 'R2': r2}
 
 def classification_metrics(y_true, y_pred):
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
     acc = accuracy_score(y_true, y_pred)
     prec = precision_score(y_true, y_pred)
     rec = recall_score(y_true, y_pred)
@@ -115,11 +161,10 @@ def get_feature_importance(model, X_train):
     else:
         return None
 
-def shap_summary_plot(model, X_train, max_display=10):
-    # Coerce any lingering object columns to numeric
-    X_numeric = X_train.apply(pd.to_numeric, errors="coerce").fillna(0).astype("float32")
-
-    explainer = shap.Explainer(model, X_numeric)
-    # Disable expensive additivity check that can fail due to numeric coercion
-    shap_values = explainer(X_numeric, check_additivity=False)
-    shap.summary_plot(shap_values, X_numeric, max_display=max_display)
\ No newline at end of file
+@instrument()
+def shap_summary_plot(model, X_train, max_display=10, y_train=None, sample_size=2000, n_jobs=1):
+    # Explains a stratified sample with a TreeExplainer where possible; SHAP values
+    # are cached by model and data hash, so repeated plots do not recompute them.
+    service = ShapExplanationService(model, X_train, y_train, sample_size=sample_size, n_jobs=n_jobs)
+    service.summary_plot(max_display=max_display)
+    return service
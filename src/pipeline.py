@@ -0,0 +1,432 @@
+import pandas as pd
+import os
+import json
+import time
+import glob
+import ast
+import hashlib
+import inspect
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from src.data_cache import CACHE_DIRNAME, source_fingerprint, parquet_available
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bump when the stage output layout changes so old stage caches are not reused.
+# Code changes do not need a bump: stage keys hash the source of every src
+# module a stage reaches (see code_fingerprint).
+PIPELINE_VERSION = 1
+# Package whose modules are followed when fingerprinting stage code (this one)
+CODE_PACKAGE = __name__.split('.')[0]
+
+# Column choices of notebook/EDA.ipynb and notebook/Hypothesis_Testing.ipynb
+NUMERICAL_COLS = ['TotalPremium', 'TotalClaims', 'SumInsured', 'CustomValueEstimate']
+CATEGORICAL_COLS = ['Province', 'VehicleType', 'Gender', 'CoverType', 'PostalCode', 'make']
+HYPOTHESIS_GROUPS = ['Province', 'PostalCode', 'Gender']
+# Pairwise tests over ~900 postal codes would be ~400k pairs; test each against the rest
+HYPOTHESIS_MODES = {'PostalCode': 'one_vs_rest'}
+# Same drop list as notebook/modeling.ipynb
+MODEL_DROP_COLS = ['UnderwrittenCoverID', 'PolicyID', 'TransactionMonth', 'TotalPremium',
+                   'CalculatedPremiumPerTerm']
+
+
+# Stage functions. They run in worker processes, so they live at module level;
+# each receives its upstream outputs positionally and its params as keywords.
+
+def load_stage(path, columns=None):
+    from src.data_loader import load_data
+    return load_data(path, columns=columns, verbose=False)
+
+
+def clean_stage(df, numeric_cols=('CapitalOutstanding',), max_missing=0.7):
+    """Drop columns missing in more than max_missing of rows and parse numeric text columns."""
+    from src.utils import clean_numerical_columns
+    missing = df.isna().mean()
+    dropped = list(missing.index[missing > max_missing])
+    if dropped:
+        logger.info(f"Dropping columns with >{max_missing:.0%} missing values: {dropped}")
+        df = df.drop(columns=dropped)
+    return clean_numerical_columns(df, [col for col in numeric_cols if col in df.columns])
+
+
+def impute_stage(df, columns=None):
+    """Median-impute columns (default: every numeric column with missing values)."""
+    from src.data_transformer import impute_missing_values
+    if columns is None:
+        numeric = df.select_dtypes('number')
+        columns = list(numeric.columns[numeric.isna().any()])
+    columns = [col for col in columns if col in df.columns]
+    return impute_missing_values(df, columns) if columns else df
+
+
+def univariate_stage(df, numerical_cols=NUMERICAL_COLS, categorical_cols=CATEGORICAL_COLS,
+                     output_dir='visualizations', fmt='png'):
+    from src.report import build_univariate_charts, render_report
+    numerical_cols = [col for col in numerical_cols if col in df.columns]
+    categorical_cols = [col for col in categorical_cols if col in df.columns]
+    charts = build_univariate_charts(df, numerical_cols, categorical_cols)
+    return render_report(charts, os.path.join(output_dir, 'univariate'), fmt=fmt, n_jobs=1)
+
+
+def bivariate_stage(df, numerical_cols=NUMERICAL_COLS, output_dir='visualizations', fmt='png'):
+    from src.report import build_bivariate_charts, render_report
+    charts = build_bivariate_charts(df, [col for col in numerical_cols if col in df.columns])
+    return render_report(charts, os.path.join(output_dir, 'bivariate'), fmt=fmt, n_jobs=1)
+
+
+def hypothesis_stage(df, group_col, metrics=('claim_frequency', 'claim_severity', 'margin'), mode='pairwise',
+                     p_adjust='fdr_bh', alpha=0.05):
+    from src.hypothesis_util import batch_segment_tests
+    return batch_segment_tests(df, group_col, metrics=list(metrics), mode=mode, p_adjust=p_adjust, alpha=alpha)
+
+
+def model_stage(df, target='TotalClaims', drop_cols=MODEL_DROP_COLS, model='xgboost', claims_only=True,
+                test_size=0.2, random_state=42):
+    """
+    Fit one model as in notebook/modeling.ipynb (claim severity on claim rows by
+    default) and score it on the held-out split.
+
+    Returns:
+        dict: {'model', 'pipeline', 'metrics'}
+    """
+    from src import modeling_util
+    if claims_only:
+        df = df[df['TotalClaims'] > 0]
+    X_train, X_test, y_train, y_test, pipeline = modeling_util.prepare_data(
+        df, target, drop_cols=list(drop_cols), test_size=test_size, random_state=random_state,
+        return_pipeline=True)
+    if model == 'xgboost':
+        fitted = modeling_util.train_xgboost(X_train, y_train, random_state=random_state)
+        X_test = modeling_util.filter_flat_numeric_columns(X_test, fitted.numeric_plan_)
+    elif model == 'random_forest':
+        fitted = modeling_util.train_random_forest(X_train, y_train, random_state=random_state)
+    elif model == 'linear':
+        fitted = modeling_util.train_linear_regression(X_train, y_train)
+    else:
+        raise ValueError(f"Unknown model: {model}")
+    metrics = modeling_util.regression_metrics(y_test, fitted.predict(X_test))
+    logger.info(f"{model} on {len(X_train)} training rows: {metrics}")
+    return {'model': fitted, 'pipeline': pipeline, 'metrics': metrics}
+
+
+class Stage:
+    """
+    One node of a Pipeline.
+
+    Args:
+        name (str): Unique stage name.
+        func (callable): Module-level function called as func(*input_outputs, **params).
+        inputs (tuple): Names of the upstream stages whose outputs are passed in.
+        params (dict): Keyword arguments; part of the cache key, so must be JSON-serialisable.
+        files (tuple): Names of params holding input file paths; the files'
+            fingerprints (DVC md5, else size and mtime) are part of the cache key.
+        code_deps (tuple): Extra modules whose source is part of the cache key,
+            for code func reaches other than through imports in src.
+    """
+
+    def __init__(self, name, func, inputs=(), params=None, files=(), code_deps=()):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.params = dict(params or {})
+        self.files = tuple(files)
+        self.code_deps = tuple(code_deps)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={list(self.inputs)})"
+
+
+def _imported_modules(source, package=CODE_PACKAGE):
+    """
+    Names of the package's modules imported anywhere in source, including inside
+    functions. `from src.x import y` yields src.x and src.x.y; _module_file
+    drops the names that are not modules.
+    """
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.add(node.module)
+            names.update(f"{node.module}.{alias.name}" for alias in node.names)
+    return {name for name in names if name == package or name.startswith(f"{package}.")}
+
+
+def _module_file(name):
+    """Source file of a package module, found without importing anything; None for attributes."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    path = os.path.join(root, *name.split('.')[1:])
+    for candidate in (f"{path}.py", os.path.join(path, '__init__.py')):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def code_fingerprint(func, code_deps=(), _memo=None):
+    """
+    Hash of func's source and of every package module it reaches through
+    imports (followed transitively, function-local imports included), so
+    editing e.g. hypothesis_util invalidates the stages that call it.
+
+    Returns:
+        str: md5 hex digest.
+    """
+    memo = {} if _memo is None else _memo
+    digest = hashlib.md5(inspect.getsource(func).encode())
+    todo = sorted(_imported_modules(inspect.getsource(func)) | set(code_deps))
+    seen = set()
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        if name not in memo:
+            path = _module_file(name)
+            if path is None:
+                memo[name] = (None, set())
+            else:
+                with open(path, 'rb') as fh:
+                    source = fh.read()
+                memo[name] = (hashlib.md5(source).hexdigest(), _imported_modules(source))
+        todo.extend(sorted(memo[name][1] - seen))
+    for name in sorted(seen):
+        digest.update(f"{name}:{memo[name][0]}".encode())
+    return digest.hexdigest()
+
+
+def _write_output(value, path):
+    tmp_path = f"{path}.tmp"
+    if path.endswith('.parquet'):
+        value.to_parquet(tmp_path)
+    else:
+        import joblib
+        joblib.dump(value, tmp_path, compress=3)
+    os.replace(tmp_path, path)
+
+
+def _read_output(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, memory_map=True)
+    import joblib
+    return joblib.load(path)
+
+
+def _execute(task):
+    """
+    Run one stage: read its inputs from the stage cache, call it and cache the output.
+
+    Runs in a worker process; only paths, the function reference and params are pickled.
+    """
+    started = time.perf_counter()
+    inputs = [_read_output(path) for path in task['input_paths']]
+    output = task['func'](*inputs, **task['params'])
+    path = task['output_base'] + ('.parquet' if isinstance(output, pd.DataFrame) and task['parquet'] else '.joblib')
+    _write_output(output, path)
+    return {'stage': task['name'], 'path': path, 'seconds': time.perf_counter() - started,
+            'rows': len(output) if isinstance(output, pd.DataFrame) else None}
+
+
+class Pipeline:
+    """
+    DAG of stages whose outputs are cached on disk.
+
+    A stage's cache key hashes its parameters and their defaults, its code
+    (the stage function and every src module it reaches, see
+    code_fingerprint), the fingerprints of its input files and the keys of its
+    upstream stages, so a change anywhere invalidates exactly the stage and its
+    descendants. Changes outside src, e.g. a library upgrade, are not seen:
+    re-run with force, or bump PIPELINE_VERSION to drop every cached output.
+    run()
+    executes only stages without a cached output that a requested target needs,
+    and runs stages whose inputs are ready in parallel worker processes; a
+    stage whose output is cached is never recomputed, and its ancestors are not
+    touched at all.
+
+    Usage:
+        pipeline = build_eda_pipeline('data/MachineLearningRating_v3.txt')
+        pipeline.run(n_jobs=4)
+        pipeline.output('hypothesis_Province')
+    """
+
+    def __init__(self, stages=(), cache_dir=os.path.join(CACHE_DIRNAME, 'pipeline')):
+        self.stages = {}
+        self.cache_dir = cache_dir
+        for stage in stages:
+            self.add(stage)
+
+    def add(self, stage):
+        """Add a stage after its inputs; returns self."""
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        missing = [name for name in stage.inputs if name not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {stage.name} depends on unknown stages: {missing}")
+        self.stages[stage.name] = stage
+        return self
+
+    def configure(self, overrides):
+        """Merge {stage: {param: value}} overrides into the stage params; returns self."""
+        for name, params in (overrides or {}).items():
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage in configuration: {name}")
+            self.stages[name].params.update(params)
+        return self
+
+    def keys(self):
+        """Cache key of every stage, in insertion (topological) order."""
+        keys, memo = {}, {}
+        for name, stage in self.stages.items():
+            payload = json.dumps({
+                'version': PIPELINE_VERSION,
+                'func': f"{stage.func.__module__}.{stage.func.__qualname__}",
+                'code': code_fingerprint(stage.func, stage.code_deps, _memo=memo),
+                'params': stage.params,
+                'defaults': {param: value.default for param, value in inspect.signature(stage.func).parameters.items()
+                             if value.default is not inspect.Parameter.empty},
+                'files': [source_fingerprint(stage.params[param]) for param in stage.files],
+                'inputs': [keys[upstream] for upstream in stage.inputs],
+            }, sort_keys=True, default=str)
+            keys[name] = hashlib.md5(payload.encode()).hexdigest()[:12]
+        return keys
+
+    def _cached_path(self, name, key):
+        base = os.path.join(self.cache_dir, f"{name}-{key}")
+        return next((base + ext for ext in ('.parquet', '.joblib') if os.path.exists(base + ext)), None)
+
+    def status(self):
+        """
+        Returns:
+            pd.DataFrame: Per stage: cache key, whether it is cached and its cache path.
+        """
+        rows = []
+        for name, key in self.keys().items():
+            path = self._cached_path(name, key)
+            rows.append({'stage': name, 'key': key, 'cached': path is not None, 'path': path})
+        return pd.DataFrame(rows).set_index('stage')
+
+    def output(self, name):
+        """Load the cached output of a stage under the current parameters."""
+        key = self.keys()[name]
+        path = self._cached_path(name, key)
+        if path is None:
+            raise KeyError(f"Stage {name} has no cached output for key {key}; run it first")
+        return _read_output(path)
+
+    def _plan(self, targets, force):
+        keys = self.keys()
+        paths = {name: None if name in force else self._cached_path(name, key) for name, key in keys.items()}
+        required = set(targets) | force
+        for name in reversed(list(self.stages)):
+            if name in required and paths[name] is None:
+                required.update(self.stages[name].inputs)
+        todo = [name for name in self.stages if name in required and paths[name] is None]
+        return keys, paths, todo
+
+    def run(self, targets=None, force=(), n_jobs=None):
+        """
+        Bring the targets' cached outputs up to date.
+
+        Args:
+            targets (list, optional): Stages to produce. Defaults to the sinks of the DAG.
+            force (iterable): Stages to re-run even if cached. Their cache keys do
+                not change, so their descendants are not re-run on that account.
+            n_jobs (int, optional): Worker processes. Defaults to os.cpu_count();
+                1 runs every stage in this process.
+
+        Returns:
+            pd.DataFrame: Per stage of the plan: 'ran' or 'cached', seconds and cache path.
+        """
+        if targets is None:
+            upstream = {name for stage in self.stages.values() for name in stage.inputs}
+            targets = [name for name in self.stages if name not in upstream]
+        unknown = [name for name in list(targets) + list(force) if name not in self.stages]
+        if unknown:
+            raise KeyError(f"Unknown stages: {unknown}")
+        keys, paths, todo = self._plan(targets, set(force))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        logger.info(f"Pipeline plan: {len(todo)} stage(s) to run {todo}, "
+                    f"{sum(path is not None for path in paths.values())} cached")
+
+        def task(name):
+            stage = self.stages[name]
+            return {'name': name, 'func': stage.func, 'params': stage.params,
+                    'input_paths': [paths[upstream] for upstream in stage.inputs],
+                    'output_base': os.path.join(self.cache_dir, f"{name}-{keys[name]}"),
+                    'parquet': parquet_available()}
+
+        results = {}
+
+        def finish(result):
+            paths[result['stage']] = result['path']
+            results[result['stage']] = {'status': 'ran', 'seconds': result['seconds'], 'rows': result['rows'],
+                                        'path': result['path']}
+            logger.info(f"Stage {result['stage']} done in {result['seconds']:.2f}s")
+            self._remove_stale(result['stage'], keys[result['stage']])
+
+        pending = list(todo)
+        n_jobs = min(n_jobs or os.cpu_count() or 1, max(len(todo), 1))
+        if n_jobs == 1:
+            for name in pending:
+                finish(_execute(task(name)))
+        else:
+            running = {}
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                while pending or running:
+                    ready = [name for name in pending
+                             if all(paths[upstream] is not None for upstream in self.stages[name].inputs)]
+                    for name in ready:
+                        pending.remove(name)
+                        running[pool.submit(_execute, task(name))] = name
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        running.pop(future)
+                        finish(future.result())
+
+        plan = [name for name in self.stages if name in results or (name in targets and paths[name])]
+        report = pd.DataFrame([results.get(name, {'status': 'cached', 'seconds': 0.0, 'rows': None,
+                                                  'path': paths[name]}) for name in plan], index=plan)
+        report.index.name = 'stage'
+        return report
+
+    def _remove_stale(self, name, key):
+        for stale in glob.glob(os.path.join(self.cache_dir, f"{glob.escape(name)}-*")):
+            stem = os.path.basename(stale).split('.', 1)[0]
+            if stem.rsplit('-', 1)[1] != key:
+                os.remove(stale)
+
+
+def build_eda_pipeline(data_path, output_dir='visualizations', cache_dir=None, hypothesis_groups=None,
+                       config=None):
+    """
+    The notebook flow as a pipeline: load -> clean -> impute, then univariate
+    and bivariate charts, one batch of segment hypothesis tests per group column
+    and a claim severity model, all independent of each other.
+
+    Args:
+        data_path (str): Pipe-delimited policy file.
+        output_dir (str): Chart output folder (univariate/ and bivariate/ below it).
+        cache_dir (str, optional): Stage cache. Defaults to '.cache/pipeline' next to the data file.
+        hypothesis_groups (list, optional): Group columns to test. Defaults to HYPOTHESIS_GROUPS.
+        config (dict or str, optional): {stage: {param: value}} overrides, or a JSON file of them.
+
+    Returns:
+        Pipeline: The configured pipeline.
+    """
+    if isinstance(config, str):
+        with open(config, encoding='utf-8') as fh:
+            config = json.load(fh)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(data_path)), CACHE_DIRNAME, 'pipeline')
+    pipeline = Pipeline([
+        Stage('load', load_stage, params={'path': data_path}, files=('path',)),
+        Stage('clean', clean_stage, ['load']),
+        Stage('impute', impute_stage, ['clean']),
+        Stage('univariate', univariate_stage, ['impute'], {'output_dir': output_dir}),
+        Stage('bivariate', bivariate_stage, ['impute'], {'output_dir': output_dir}),
+    ], cache_dir=cache_dir)
+    for group_col in hypothesis_groups or HYPOTHESIS_GROUPS:
+        pipeline.add(Stage(f'hypothesis_{group_col}', hypothesis_stage, ['impute'],
+                           {'group_col': group_col, 'mode': HYPOTHESIS_MODES.get(group_col, 'pairwise')}))
+    pipeline.add(Stage('model', model_stage, ['impute']))
+    return pipeline.configure(config)
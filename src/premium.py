@@ -0,0 +1,168 @@
+import pandas as pd
+import numpy as np
+import os
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PREMIUM_FIELDS = ('claim_probability', 'expected_severity', 'risk_premium', 'premium')
+
+
+def gross_premium(risk_premium, expense_loading=0.15, profit_margin=0.05, fixed_expense=0.0):
+    """
+    Load a risk premium (P(claim) * E[severity]) for expenses and profit.
+
+    Args:
+        risk_premium (np.ndarray): Expected claims cost per policy.
+        expense_loading (float): Proportional expense loading.
+        profit_margin (float): Proportional profit loading.
+        fixed_expense (float): Flat per-policy expense.
+
+    Returns:
+        np.ndarray: Gross premium per policy.
+    """
+    return risk_premium * (1.0 + expense_loading + profit_margin) + fixed_expense
+
+
+def _feature_format(pipeline, model):
+    # Models fitted on sparse input take the CSR matrix. Models fitted on dense
+    # frames take a float32 array (XGBoost reads CSR gaps as missing, not zero),
+    # wrapped in a frame only when names are used: scikit-learn validates
+    # feature_names_in_, and a numeric plan keyed differently aligns by name.
+    plan = getattr(model, 'numeric_plan_', None)
+    if plan is not None:
+        return 'array' if list(plan) == list(pipeline.feature_names_) else 'frame'
+    return 'frame' if hasattr(model, 'feature_names_in_') else 'csr'
+
+
+def _features(pipeline, model, policies):
+    if pipeline is None:
+        return policies
+    X = pipeline.transform(policies, sparse=True)
+    feature_format = _feature_format(pipeline, model)
+    if feature_format == 'csr':
+        return X
+    X = X.toarray()
+    if feature_format == 'array':
+        return X
+    X = pd.DataFrame(X, columns=pipeline.feature_names_, index=policies.index, copy=False)
+    plan = getattr(model, 'numeric_plan_', None)
+    if plan is not None:
+        from src.modeling_util import filter_flat_numeric_columns
+        X = filter_flat_numeric_columns(X, plan)
+    return X
+
+
+class PremiumEngine:
+    """
+    Prices policies from a claim-frequency classifier and a severity regressor.
+
+    Rows are processed in slices of `chunksize` and results are written into
+    preallocated NumPy arrays, so pricing the full book keeps only one slice of
+    encoded features alive at a time.
+
+    Args:
+        frequency_model: Fitted classifier with predict_proba.
+        severity_model: Fitted regressor of claim amount given a claim.
+        frequency_pipeline (PreprocessingPipeline, optional): Pipeline for the
+            frequency model; None if inputs are already encoded.
+        severity_pipeline (PreprocessingPipeline, optional): Pipeline for the
+            severity model; None if inputs are already encoded.
+        expense_loading (float): Proportional expense loading.
+        profit_margin (float): Proportional profit loading.
+        fixed_expense (float): Flat per-policy expense.
+        chunksize (int): Rows per scoring slice.
+    """
+
+    def __init__(self, frequency_model, severity_model, frequency_pipeline=None, severity_pipeline=None,
+                 expense_loading=0.15, profit_margin=0.05, fixed_expense=0.0, chunksize=200_000):
+        self.frequency_model = frequency_model
+        self.severity_model = severity_model
+        self.frequency_pipeline = frequency_pipeline
+        self.severity_pipeline = severity_pipeline
+        self.expense_loading = expense_loading
+        self.profit_margin = profit_margin
+        self.fixed_expense = fixed_expense
+        self.chunksize = chunksize
+
+    def _shares_features(self):
+        # Both models read the same encoded slice unless a numeric plan reshapes the frame
+        feature_format = _feature_format(self.frequency_pipeline, self.frequency_model)
+        if feature_format != _feature_format(self.severity_pipeline, self.severity_model):
+            return False
+        return feature_format != 'frame' or (getattr(self.frequency_model, 'numeric_plan_', None) is None
+                                             and getattr(self.severity_model, 'numeric_plan_', None) is None)
+
+    def _price_slice(self, policies, out, start):
+        stop = start + policies.shape[0]
+        X_freq = _features(self.frequency_pipeline, self.frequency_model, policies)
+        out['claim_probability'][start:stop] = self.frequency_model.predict_proba(X_freq)[:, 1]
+        if self.severity_pipeline is self.frequency_pipeline and (
+                self.severity_pipeline is None or self._shares_features()):
+            X_sev = X_freq
+        else:
+            X_sev = _features(self.severity_pipeline, self.severity_model, policies)
+        out['expected_severity'][start:stop] = self.severity_model.predict(X_sev)
+
+    def price(self, policies, chunksize=None):
+        """
+        Price a batch of policies.
+
+        Args:
+            policies (pd.DataFrame or matrix): Raw policies (with pipelines) or
+                encoded features (without).
+            chunksize (int, optional): Rows per scoring slice. Defaults to self.chunksize.
+
+        Returns:
+            dict: float64 arrays for claim_probability, expected_severity,
+                risk_premium and premium.
+        """
+        n = policies.shape[0]
+        out = {field: np.empty(n, dtype=np.float64) for field in PREMIUM_FIELDS}
+        chunksize = chunksize or self.chunksize
+        for start in range(0, n, chunksize):
+            stop = min(start + chunksize, n)
+            part = policies.iloc[start:stop] if isinstance(policies, pd.DataFrame) else policies[start:stop]
+            self._price_slice(part, out, start)
+        np.maximum(out['expected_severity'], 0.0, out=out['expected_severity'])
+        np.multiply(out['claim_probability'], out['expected_severity'], out=out['risk_premium'])
+        out['premium'][:] = gross_premium(out['risk_premium'], self.expense_loading,
+                                          self.profit_margin, self.fixed_expense)
+        return out
+
+    def price_chunks(self, chunks, chunksize=None):
+        """Lazily price an iterable of policy chunks, yielding (chunk, prices)."""
+        for chunk in chunks:
+            yield chunk, self.price(chunk, chunksize)
+
+    def price_file(self, file_path, output_path, id_col='PolicyID', chunksize=None):
+        """
+        Reprice every policy in a pipe-delimited file and write the prices as CSV.
+
+        Args:
+            file_path (str): Policy file in the MachineLearningRating layout.
+            output_path (str): Output CSV path.
+            id_col (str): Identifier column copied to the output when present.
+            chunksize (int, optional): Rows read and scored at a time. Defaults to self.chunksize.
+
+        Returns:
+            int: Number of policies priced.
+        """
+        from src.data_loader import iter_data
+        chunksize = chunksize or self.chunksize
+        try:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            total = 0
+            chunks = iter_data(file_path, chunksize=chunksize)
+            for i, (chunk, prices) in enumerate(self.price_chunks(chunks, chunksize)):
+                columns = {id_col: chunk[id_col].to_numpy()} if id_col in chunk.columns else {}
+                pd.DataFrame({**columns, **prices}).to_csv(output_path, mode='w' if i == 0 else 'a',
+                                                          header=(i == 0), index=False)
+                total += len(chunk)
+            logger.info(f"Priced {total} policies from {file_path} into {output_path}")
+            return total
+        except Exception as e:
+            logger.error(f"Error pricing {file_path}: {str(e)}")
+            raise
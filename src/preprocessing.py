@@ -0,0 +1,189 @@
+import pandas as pd
+import numpy as np
+import os
+import logging
+from src.cleaning import parse_dates, DATE_FORMATS
+from src.encoding import CategoricalEncoder
+from src.imputation import GroupImputer
+from src.risk_index import PostalRiskIndex
+from src.instrumentation import instrument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Raw columns feature_engineering derives from; read even when listed in drop_cols
+DERIVED_INPUTS = ('RegistrationYear', 'TransactionMonth')
+
+
+@instrument()
+def feature_engineering(df, copy=True):
+    if copy:
+        df = df.copy()
+    # Example: vehicle age
+    if 'RegistrationYear' in df.columns and 'TransactionMonth' in df.columns:
+        month = df['TransactionMonth']
+        if not pd.api.types.is_datetime64_any_dtype(month):
+            month, _ = parse_dates(month, DATE_FORMATS['TransactionMonth'])
+        df['TransactionYear'] = month.dt.year
+        df['VehicleAge'] = df['TransactionYear'] - df['RegistrationYear']
+    return df
+
+
+class PreprocessingPipeline:
+    """
+    Fitted feature pipeline: imputation, derived features and categorical encoding,
+    learned once from training policies and replayed on any later batch.
+
+    Fitting learns the numeric fill values (mean or median) and categorical modes
+    of the raw input columns in one pass, optionally per segment (see
+    GroupImputer), then a CategoricalEncoder over the imputed inputs plus the
+    feature_engineering columns derived from them.
+    transform only applies them, so scoring a batch costs a few vectorized
+    operations on that batch rather than re-preparing the full history.
+
+    Args:
+        target (str): Target column, excluded from the features.
+        drop_cols (list, optional): Columns dropped before encoding.
+        strategy (str): 'mean' or 'median' fill for numeric columns.
+        encoder (CategoricalEncoder, optional): Unfitted encoder to use.
+        impute_by (str or list, optional): Segment columns for the fill values,
+            e.g. 'Province'; kept as features unless listed in drop_cols.
+        risk_index (bool or PostalRiskIndex, optional): Replace PostalCode with
+            the dense credibility risk index; True fits one on the training rows.
+    """
+
+    def __init__(self, target, drop_cols=None, strategy='mean', encoder=None, impute_by=None,
+                 risk_index=None):
+        if strategy not in ('mean', 'median'):
+            raise ValueError(f"Unknown imputation strategy: {strategy}")
+        self.target = target
+        self.drop_cols = [col for col in (drop_cols or []) if col != target]
+        self.strategy = strategy
+        self.encoder = encoder or CategoricalEncoder()
+        self.impute_by = impute_by
+        self.risk_index = risk_index
+
+    def _features(self, df):
+        # df is the imputer's copy, so the derived columns can be added in place
+        X = feature_engineering(df, copy=False)
+        risk_index = getattr(self, 'risk_index_', None)
+        if risk_index is not None and risk_index.postal_col in X.columns:
+            X = risk_index.add_feature(X)
+        return X
+
+    def _drop(self, X):
+        return X.drop(columns=[col for col in [self.target] + self.drop_cols if col in X.columns])
+
+    @property
+    def fill_values_(self):
+        return self.imputer_.fill_values_
+
+    def _fit_inputs(self, df, y):
+        """Fit the risk index and imputer; return the imputed feature frame and y."""
+        y = df[self.target] if y is None else y
+        by = [self.impute_by] if isinstance(self.impute_by, str) else list(self.impute_by or [])
+        if self.risk_index is True:
+            self.risk_index_ = PostalRiskIndex().fit(df)
+        else:
+            self.risk_index_ = self.risk_index or None
+        lookup = [self.risk_index_.province_col, self.risk_index_.postal_col] if self.risk_index_ is not None else []
+        self.input_columns_ = [col for col in df.columns if col != self.target
+                               and (col not in self.drop_cols or col in DERIVED_INPUTS or col in by + lookup)]
+        # Impute the raw inputs first, then derive features from the filled values
+        self.imputer_ = GroupImputer(self.strategy, by=by, columns=self.input_columns_).fit(df)
+        X = self._features(self.imputer_.transform(df, inplace=False))
+        return self._drop(X), y
+
+    def _fitted(self, n_rows):
+        self.feature_names_ = list(self.encoder.feature_names_)
+        logger.info(f"Fitted preprocessing pipeline on {n_rows} rows -> {len(self.feature_names_)} features")
+
+    @instrument()
+    def fit(self, df, y=None):
+        """
+        Learn imputation statistics and the encoding from training policies.
+
+        Args:
+            df (pd.DataFrame): Training frame, including the target unless y is given.
+            y (array-like, optional): Target values; defaults to df[target].
+
+        Returns:
+            PreprocessingPipeline: self
+        """
+        X, y = self._fit_inputs(df, y)
+        self.encoder.fit(X, y)
+        self._fitted(len(df))
+        return self
+
+    # Called once per scoring batch: record it, but keep it out of the INFO log
+    @instrument(level=logging.DEBUG)
+    def transform(self, df, sparse=False):
+        """
+        Apply the fitted imputation, derived features and encoding to a batch.
+
+        Args:
+            df (pd.DataFrame): Policies with the training input columns.
+            sparse (bool): Return a scipy CSR matrix instead of a float32 DataFrame.
+
+        Returns:
+            pd.DataFrame or scipy.sparse.csr_matrix: Model-ready features.
+        """
+        X = self._features(self.imputer_.transform(df, inplace=False))
+        return self.encoder.transform(self._drop(X), sparse=sparse)
+
+    @instrument()
+    def fit_transform(self, df, y=None, sparse=False):
+        """
+        Fit on training policies and encode them. Target-encoded columns get
+        out-of-fold means (see CategoricalEncoder.fit_transform), so the training
+        features do not contain each row's own target.
+        """
+        X, y = self._fit_inputs(df, y)
+        encoded = self.encoder.fit_transform(X, y, sparse=sparse)
+        self._fitted(len(df))
+        return encoded
+
+    def transform_chunks(self, chunks, sparse=False):
+        """Lazily transform an iterable of policy chunks."""
+        for chunk in chunks:
+            yield self.transform(chunk, sparse=sparse)
+
+    def transform_file(self, file_path, chunksize=100_000, sparse=False):
+        """
+        Stream a pipe-delimited policy file through the pipeline, reading only the
+        input columns.
+
+        Yields:
+            tuple: (raw chunk, transformed features)
+        """
+        from src.data_loader import iter_data, _read_header
+        header = _read_header(file_path)
+        columns = [col for col in self.input_columns_ if col in header]
+        for chunk in iter_data(file_path, columns=columns, chunksize=chunksize):
+            yield chunk, self.transform(chunk, sparse=sparse)
+
+    def save(self, path):
+        """
+        Serialize the fitted pipeline with joblib.
+
+        Args:
+            path (str): Output file, e.g. 'models/preprocessing.joblib'.
+        """
+        import joblib
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            joblib.dump(self, path, compress=3)
+            logger.info(f"Saved preprocessing pipeline to {path}")
+        except Exception as e:
+            logger.error(f"Error saving preprocessing pipeline: {str(e)}")
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Load a pipeline saved with save()."""
+        import joblib
+        pipeline = joblib.load(path)
+        if not isinstance(pipeline, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}")
+        return pipeline
@@ -0,0 +1,310 @@
+import pandas as pd
+import numpy as np
+import io
+import os
+import json
+import logging
+from datetime import datetime, timezone
+from src.column_stats import NumericSketch, FINE_BINS
+from src.instrumentation import instrument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class HyperLogLog:
+    """
+    Cardinality sketch over 64-bit pandas hashes with 2**precision registers
+    (about 1.04 / sqrt(2**precision) relative error; 0.8% at precision 14).
+    Sketches merge by taking the register-wise maximum.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        """Add uint64 hashes of the (non-null) values."""
+        if not len(hashes):
+            return self
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes << np.uint64(p)
+        # Exact bit length via two 32-bit halves (exactly representable as float64)
+        high, low = rest >> np.uint64(32), rest & np.uint64(0xFFFFFFFF)
+        bit_length = np.where(high > 0, 32 + np.frexp(high.astype(np.float64))[1],
+                              np.frexp(low.astype(np.float64))[1])
+        rank = np.minimum(64 - bit_length + 1, 64 - p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return raw
+
+
+def _hash_values(series):
+    """uint64 hashes of the non-null values; categories are hashed once, not per row."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        category_hashes = pd.util.hash_array(series.cat.categories.to_numpy())
+        return category_hashes[codes[codes >= 0]]
+    values = series.dropna().to_numpy()
+    try:
+        return pd.util.hash_array(values)
+    except TypeError:
+        return pd.util.hash_array(values.astype(str))
+
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+
+
+class _ColumnProfile:
+    def __init__(self, numeric, top_k, precision, fine_bins):
+        self.numeric = numeric
+        self.dtype = None
+        self.count = 0
+        self.missing = 0
+        self.negatives = 0
+        self.zeros = 0
+        self.hll = HyperLogLog(precision)
+        self.sketch = NumericSketch(fine_bins) if numeric else None
+        # Misra-Gries summary for top-k: at most `capacity` counters, each a lower
+        # bound on its value's count and at most `top_error` below it
+        self.capacity = max(1000, 50 * top_k)
+        self.counts = None
+        self.top_error = 0
+        self.top_exact = True
+
+    def update(self, series):
+        self.dtype = self.dtype or str(series.dtype)
+        missing = int(series.isna().sum())
+        self.count += len(series) - missing
+        self.missing += missing
+        self.hll.add_hashes(_hash_values(series))
+        if self.numeric:
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            self.sketch.update(values)
+            self.negatives += int(np.count_nonzero(values < 0))
+            self.zeros += int(np.count_nonzero(values == 0))
+        counts = series.value_counts(sort=False)
+        counts = counts[counts > 0]
+        self.counts = counts if self.counts is None else self.counts.add(counts, fill_value=0)
+        if len(self.counts) > self.capacity:
+            # Mergeable Misra-Gries step: subtract the (capacity + 1)-th largest count
+            # from every counter and drop those that reach zero. Any value seen more
+            # than rows / (capacity + 1) times keeps a counter.
+            cut = self.counts.nlargest(self.capacity + 1).iloc[-1]
+            self.counts = self.counts[self.counts > cut] - cut
+            self.top_error += int(cut)
+            self.top_exact = False
+
+    def result(self, rows, top_k, quantiles):
+        distinct = self.hll.estimate()
+        if self.top_exact and self.counts is not None:
+            distinct = len(self.counts)
+        top = self.counts.nlargest(top_k) if self.counts is not None else pd.Series(dtype=np.int64)
+        profile = {
+            'dtype': self.dtype,
+            'count': self.count,
+            'missing': self.missing,
+            'missing_pct': 100.0 * self.missing / rows if rows else 0.0,
+            'distinct': int(round(distinct)),
+            'distinct_exact': self.top_exact,
+            'top_values': [[str(value), int(count)] for value, count in top.items()],
+            'top_values_exact': self.top_exact,
+            # Approximate counts are lower bounds; the true count is at most this much higher
+            'top_values_max_error': self.top_error,
+        }
+        if self.numeric and self.sketch.n:
+            sketch = self.sketch
+            profile.update({
+                'mean': sketch.mean,
+                'std': float(np.sqrt(sketch.m2 / (sketch.n - 1))) if sketch.n > 1 else None,
+                'min': sketch.min,
+                'max': sketch.max,
+                'negatives': self.negatives,
+                'zeros': self.zeros,
+                'quantiles': {str(q): float(v) for q, v in zip(quantiles, sketch.quantiles(quantiles))},
+            })
+        return profile
+
+
+class DataProfiler:
+    """
+    One-pass data-quality profile: per-column counts, missingness, negative and
+    zero counts, mean/std/min/max, approximate quantiles, HyperLogLog distinct
+    counts and top-k values. Memory is bounded per column, independent of rows.
+
+    Top-k values come from a Misra-Gries summary. They are exact while a column
+    has at most max(1000, 50 * top_k) distinct values. Beyond that each count
+    is a lower bound, at most top_values_max_error below the true count.
+
+    Usage:
+        profiler = DataProfiler()
+        for chunk in iter_data(path):
+            profiler.update(chunk)
+        profile = profiler.result()
+    """
+
+    def __init__(self, top_k=10, precision=14, quantiles=DEFAULT_QUANTILES, fine_bins=FINE_BINS):
+        self.top_k = top_k
+        self.precision = precision
+        self.quantiles = tuple(quantiles)
+        self.fine_bins = fine_bins
+        self.rows = 0
+        self.columns = {}
+
+    def update(self, chunk):
+        """Fold one chunk into the profile."""
+        self.rows += len(chunk)
+        for col in chunk.columns:
+            if col not in self.columns:
+                self.columns[col] = _ColumnProfile(_is_numeric(chunk[col]), self.top_k, self.precision,
+                                                   self.fine_bins)
+            self.columns[col].update(chunk[col])
+        return self
+
+    def result(self):
+        """Return the profile as a JSON-serialisable dict."""
+        return {
+            'rows': self.rows,
+            'columns': {col: column.result(self.rows, self.top_k, self.quantiles)
+                        for col, column in self.columns.items()},
+        }
+
+
+def _sample_file_lines(file_path, columns, fraction, rng, block_size=64 << 20):
+    """
+    Bernoulli-sample raw lines of the pipe-delimited file block by block and parse
+    only the kept lines, so a 1% sample costs a byte scan plus 1% of the parse.
+    The file has no quoted fields, so every newline ends a record.
+    """
+    from src.data_loader import _resolve_schema, _downcast
+    usecols, dtype_map = _resolve_schema(file_path, columns)
+    with open(file_path, 'rb') as fh:
+        header = fh.readline()
+        tail = b''
+        while True:
+            block = fh.read(block_size)
+            lines = (tail + block).split(b'\n')
+            tail = lines.pop() if block else b''
+            lines = [line for line in lines if line.strip()] if not block else lines
+            keep = np.flatnonzero(rng.random(len(lines)) < fraction)
+            if len(keep):
+                payload = header + b'\n'.join([lines[i] for i in keep]) + b'\n'
+                chunk = pd.read_csv(io.BytesIO(payload), delimiter='|', encoding='utf-8', usecols=usecols,
+                                    dtype=dtype_map)
+                yield _downcast(chunk, dtype_map)
+            if not block:
+                return
+
+
+def _sampled_chunks(data, columns, sample, nrows, fraction, chunksize, random_state):
+    """Chunks of data under the requested sampling mode."""
+    rng = np.random.default_rng(random_state)
+    if isinstance(data, str):
+        from src.data_loader import iter_data
+        if sample == 'head':
+            return iter_data(data, columns=columns, chunksize=min(chunksize, nrows), nrows=nrows)
+        if sample == 'random':
+            return _sample_file_lines(data, columns, fraction, rng)
+        return iter_data(data, columns=columns, chunksize=chunksize)
+    if isinstance(data, pd.DataFrame):
+        frame = data[columns] if columns else data
+        if sample == 'head':
+            frame = frame.head(nrows)
+        elif sample == 'random':
+            frame = frame.sample(frac=fraction, random_state=random_state)
+        return (frame.iloc[start:start + chunksize] for start in range(0, len(frame), chunksize))
+
+    def chunks():
+        remaining = nrows
+        for chunk in data:
+            chunk = chunk[columns] if columns else chunk
+            if sample == 'random':
+                chunk = chunk[rng.random(len(chunk)) < fraction]
+            elif sample == 'head':
+                chunk = chunk.iloc[:remaining]
+                remaining -= len(chunk)
+            yield chunk
+            if sample == 'head' and remaining <= 0:
+                return
+    return chunks()
+
+
+@instrument()
+def profile_data(data, columns=None, sample=None, nrows=10_000, fraction=0.01, chunksize=200_000,
+                 top_k=10, random_state=42, output_path=None):
+    """
+    Profile a data file, DataFrame or iterable of chunks in a single pass.
+
+    Args:
+        data: Pipe-delimited data file path, DataFrame or iterable of chunks.
+        columns (list, optional): Columns to profile. Defaults to all.
+        sample (str, optional): None for the full data, 'head' for the first
+            nrows rows, 'random' for a Bernoulli sample of `fraction` of rows.
+        nrows (int): Rows in 'head' mode.
+        fraction (float): Sampling rate in 'random' mode.
+        chunksize (int): Rows per chunk.
+        top_k (int): Number of most frequent values reported per column.
+        random_state (int): Seed for 'random' mode.
+        output_path (str, optional): Write the profile as JSON to this path.
+
+    Returns:
+        dict: {'source', 'profiled_at', 'sample', 'rows', 'columns': {column: {...}}}
+    """
+    if sample not in (None, 'head', 'random'):
+        raise ValueError(f"Unknown sample mode: {sample}")
+    try:
+        profiler = DataProfiler(top_k=top_k)
+        for chunk in _sampled_chunks(data, columns, sample, nrows, fraction, chunksize, random_state):
+            profiler.update(chunk)
+        profile = {
+            'source': data if isinstance(data, str) else type(data).__name__,
+            'profiled_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'sample': {'mode': sample or 'full', 'nrows': nrows if sample == 'head' else None,
+                       'fraction': fraction if sample == 'random' else None},
+            **profiler.result(),
+        }
+        logger.info(f"Profiled {profile['rows']} rows x {len(profile['columns'])} columns")
+        if output_path:
+            save_profile(profile, output_path)
+        return profile
+    except Exception as e:
+        logger.error(f"Error profiling data: {str(e)}")
+        raise
+
+
+def _to_builtin(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Not JSON serialisable: {type(value).__name__}")
+
+
+def save_profile(profile, path):
+    """Write a profile dict as indented JSON."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(profile, fh, indent=2, default=_to_builtin)
+    logger.info(f"Wrote data profile to {path}")
+
+
+def profile_frame(profile):
+    """Flatten a profile's columns into a DataFrame, one row per column, for display."""
+    rows = {col: {key: value for key, value in stats.items() if key not in ('top_values', 'quantiles')}
+            for col, stats in profile['columns'].items()}
+    return pd.DataFrame.from_dict(rows, orient='index')
@@ -0,0 +1,257 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import html
+import pickle
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from src.instrumentation import instrument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = '.report_manifest.json'
+INDEX_FILE = 'index.html'
+
+
+def chart(name, kind, data, title, **options):
+    """
+    Describe one chart: a renderer kind plus the small, pre-aggregated data it draws.
+    """
+    return {'name': name, 'kind': kind, 'data': data, 'title': title, 'options': options}
+
+
+# Chart builders: reduce the frame to compact aggregates in the parent process
+
+def build_univariate_charts(df, numerical_cols, categorical_cols, bins=30, stats=None):
+    """
+    Histogram (with binned KDE) and box-plot summaries per numerical column, counts
+    per categorical column. `df` may be an iterable of chunks; `stats` from
+    summarize_columns skips the statistics pass.
+    """
+    from src.column_stats import summarize_columns
+    if stats is None:
+        stats = summarize_columns(df, numerical_cols, categorical_cols, bins=bins)
+    charts = []
+    for col in numerical_cols:
+        summary = stats.get(col, {})
+        if not summary.get('count'):
+            continue
+        charts.append(chart(f'histogram_{col}', 'histogram', summary['histogram'],
+                            f'Distribution of {col}', xlabel=col))
+        charts.append(chart(f'boxplot_{col}', 'box', summary['box'], f'Box Plot of {col} (Outlier Detection)',
+                            ylabel=col))
+    for col in categorical_cols:
+        counts = stats.get(col, {}).get('counts')
+        if counts is None:
+            continue
+        charts.append(chart(f'countplot_{col}', 'bar', counts, f'Frequency of {col}',
+                            xlabel=col, ylabel='Count', palette='viridis'))
+    return charts
+
+
+def build_bivariate_charts(df, numerical_cols, cube=None):
+    """Aggregates behind the bivariate and geographic plots in src.bivariate."""
+    from src import bivariate
+    cube = bivariate.segment_cube(df, cube)
+    charts = []
+    numerical_cols = [col for col in numerical_cols if col in df.columns]
+    if len(numerical_cols) > 1:
+        charts.append(chart('correlation_matrix', 'heatmap', bivariate.correlation_matrix(df, numerical_cols),
+                            'Correlation Matrix of Numerical Features', cmap='coolwarm', center=0, fmt='.2f'))
+    if all(col in df.columns for col in ['TransactionMonth', 'TotalPremium', 'TotalClaims', 'PostalCode']):
+        _, monthly = bivariate.top_postalcode_monthly(df, cube=cube)
+        charts.append(chart('scatter_premium_claims_postalcode', 'scatter', monthly,
+                            'Monthly Avg TotalPremium vs TotalClaims by PostalCode',
+                            x='TotalPremium', y='TotalClaims', hue='PostalCode',
+                            xlabel='Average Total Premium (Rand)', ylabel='Average Total Claims (Rand)'))
+        charts.append(chart('monthly_trends_postalcode', 'lines', monthly,
+                            'Monthly Trends in TotalPremium and TotalClaims by PostalCode',
+                            x='TransactionMonth', group='PostalCode', xlabel='Transaction Month',
+                            ylabel='Amount (Rand)'))
+    if all(col in df.columns for col in ['TotalPremium', 'TotalClaims', 'Province']):
+        charts.append(chart('loss_ratio_province', 'bar', bivariate.loss_ratio_table(df, cube),
+                            'Loss Ratio by Province', xlabel='Province', ylabel='Loss Ratio',
+                            palette='magma'))
+    if all(col in df.columns for col in ['TotalPremium', 'Province', 'CoverType']):
+        charts.append(chart('premium_province_covertype', 'heatmap', bivariate.premium_pivot(df, cube),
+                            'Average TotalPremium by Province and CoverType', cmap='YlGnBu', fmt='.0f',
+                            xlabel='Cover Type', ylabel='Province'))
+    if all(col in df.columns for col in ['Make', 'Province', 'TotalClaims']):
+        charts.append(chart('make_province', 'heatmap', bivariate.make_province_counts(df, cube=cube),
+                            'Count of Top Vehicle Makes by Province', cmap='Blues', fmt='d',
+                            xlabel='Vehicle Make', ylabel='Province'))
+    return charts
+
+
+# Renderers: draw onto a given Axes, in the parent process or in render workers
+
+def _render_histogram(ax, data, options):
+    from src.univariate import draw_histogram
+    draw_histogram(ax, data)
+    ax.set_ylabel(options.get('ylabel', 'Frequency'), fontsize=12)
+
+
+def _render_box(ax, data, options):
+    from src.univariate import draw_box
+    draw_box(ax, data)
+
+
+def _render_bar(ax, data, options):
+    from src.univariate import draw_counts
+    draw_counts(ax, data, palette=options.get('palette'))
+
+
+def _render_heatmap(ax, data, options):
+    import seaborn as sns
+    sns.heatmap(data, annot=True, cmap=options.get('cmap'), center=options.get('center'),
+                fmt=options.get('fmt', '.2f'), ax=ax)
+
+
+def _render_scatter(ax, data, options):
+    import seaborn as sns
+    sns.scatterplot(data=data, x=options['x'], y=options['y'], hue=data[options['hue']].astype(str),
+                    size=options['y'], palette='deep', alpha=0.7, ax=ax)
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+
+
+def _render_lines(ax, data, options):
+    for group, subset in data.groupby(options['group'], observed=True):
+        ax.plot(subset[options['x']], subset['TotalPremium'], label=f'{group} Premium')
+        ax.plot(subset[options['x']], subset['TotalClaims'], linestyle='--', label=f'{group} Claims')
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.tick_params(axis='x', rotation=45)
+
+
+RENDERERS = {
+    'histogram': _render_histogram,
+    'box': _render_box,
+    'bar': _render_bar,
+    'heatmap': _render_heatmap,
+    'scatter': _render_scatter,
+    'lines': _render_lines,
+}
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_chart(spec, output_dir, fmt='png'):
+    """
+    Render one chart spec to output_dir/<name>.<fmt>.
+
+    Draws on a standalone matplotlib Figure rather than pyplot, so it neither
+    switches the caller's backend nor registers figures that need closing.
+    """
+    import seaborn as sns
+    from matplotlib.figure import Figure
+    from src.utils import PLOT_STYLE, PLOT_FIGSIZE
+
+    options = spec['options']
+    with sns.axes_style(PLOT_STYLE):
+        fig = Figure(figsize=options.get('figsize', PLOT_FIGSIZE))
+        ax = fig.subplots()
+    RENDERERS[spec['kind']](ax, spec['data'], options)
+    ax.set_title(spec['title'], fontsize=14, pad=20)
+    if 'xlabel' in options:
+        ax.set_xlabel(options['xlabel'], fontsize=12)
+    if 'ylabel' in options and spec['kind'] != 'histogram':
+        ax.set_ylabel(options['ylabel'], fontsize=12)
+    fig.tight_layout()
+    filename = f"{spec['name']}.{fmt}"
+    os.makedirs(output_dir, exist_ok=True)
+    fig.savefig(os.path.join(output_dir, filename), bbox_inches='tight')
+    return filename
+
+
+def spec_hash(spec, fmt='png'):
+    """Hash of a chart's kind, title, options and aggregated data."""
+    digest = hashlib.md5(pickle.dumps((spec['kind'], spec['title'], spec['options'], fmt)))
+
+    def feed(value):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+            digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+        elif isinstance(value, np.ndarray):
+            digest.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, dict):
+            for key in sorted(value):
+                digest.update(str(key).encode())
+                feed(value[key])
+        else:
+            digest.update(repr(value).encode())
+
+    feed(spec['data'])
+    return digest.hexdigest()
+
+
+def write_index(entries, output_dir, title='EDA Report'):
+    """Write an index.html listing the rendered charts."""
+    figures = '\n'.join(
+        f'<figure><img src="{html.escape(entry["file"])}" alt="{html.escape(entry["title"])}">'
+        f'<figcaption>{html.escape(entry["title"])}</figcaption></figure>'
+        for entry in entries)
+    page = (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            '<style>body{font-family:sans-serif}figure{display:inline-block;margin:1em;max-width:45%}'
+            'img{max-width:100%}</style></head>\n'
+            f'<body><h1>{html.escape(title)}</h1>\n{figures}\n</body></html>\n')
+    path = os.path.join(output_dir, INDEX_FILE)
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(page)
+    return path
+
+
+@instrument()
+def render_report(charts, output_dir='visualizations', fmt='png', n_jobs=None, force=False):
+    """
+    Render chart specs headlessly, in parallel, skipping charts whose input is unchanged.
+
+    Args:
+        charts (list): Specs from chart() / build_*_charts.
+        output_dir (str): Output folder for images and index.html.
+        fmt (str): 'png' or 'svg'.
+        n_jobs (int, optional): Worker processes. Defaults to os.cpu_count().
+        force (bool): Re-render every chart.
+
+    Returns:
+        dict: {'rendered': [...], 'skipped': [...], 'index': path}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, encoding='utf-8') as fh:
+            manifest = json.load(fh)
+
+    hashes = {spec['name']: spec_hash(spec, fmt) for spec in charts}
+    todo = [spec for spec in charts
+            if force or manifest.get(spec['name']) != hashes[spec['name']]
+            or not os.path.exists(os.path.join(output_dir, f"{spec['name']}.{fmt}"))]
+    skipped = [spec['name'] for spec in charts if spec not in todo]
+
+    n_jobs = min(n_jobs or os.cpu_count() or 1, max(len(todo), 1))
+    if n_jobs == 1:
+        rendered = [render_chart(spec, output_dir, fmt) for spec in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as pool:
+            rendered = list(pool.map(render_chart, todo, [output_dir] * len(todo), [fmt] * len(todo)))
+
+    manifest.update({spec['name']: hashes[spec['name']] for spec in todo})
+    with open(manifest_path, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    index = write_index([{'file': f"{spec['name']}.{fmt}", 'title': spec['title']} for spec in charts], output_dir)
+    logger.info(f"Rendered {len(rendered)} charts, skipped {len(skipped)} unchanged, index at {index}")
+    return {'rendered': rendered, 'skipped': skipped, 'index': index}
+
+
+def run_eda_report(df, numerical_cols, categorical_cols, output_dir='visualizations', fmt='png',
+                   n_jobs=None, force=False, stats=None, cube=None):
+    """Build the univariate and bivariate chart specs from df and render them."""
+    charts = build_univariate_charts(df, numerical_cols, categorical_cols, stats=stats)
+    charts += build_bivariate_charts(df, numerical_cols, cube)
+    return render_report(charts, output_dir=output_dir, fmt=fmt, n_jobs=n_jobs, force=force)
@@ -0,0 +1,209 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+
+# Upper bound on the number of float64 cells in one resample matrix (~64 MB), which
+# sets how many resamples a batch holds for a given sample size.
+MAX_BATCH_CELLS = 8_000_000
+
+# Worker-side copy of the test data, set once per process by _init_worker so that
+# the arrays are not re-pickled for every batch.
+_WORKER_DATA = {}
+
+
+def metric_values(df, metric, premium_col='TotalPremium', claims_col='TotalClaims'):
+    """
+    Reduce a policy frame to the compact float64 array a metric is a mean of.
+
+    'claim_frequency' -> claim indicator, 'claim_severity' -> positive claims only,
+    'margin' -> premium minus claims.
+    """
+    claims = df[claims_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    if metric == 'claim_frequency':
+        return (claims > 0).astype(np.float64)
+    if metric == 'claim_severity':
+        return claims[claims > 0]
+    if metric == 'margin':
+        margin = df[premium_col].to_numpy(dtype=np.float64, na_value=np.nan) - claims
+        return margin[~np.isnan(margin)]
+    raise ValueError(f"Unknown metric: {metric}")
+
+
+def group_arrays(df, group_col, group_a, group_b, metric):
+    """Extract the metric arrays for two groups of group_col."""
+    return (metric_values(df[df[group_col] == group_a], metric),
+            metric_values(df[df[group_col] == group_b], metric))
+
+
+def _init_worker(data):
+    _WORKER_DATA.clear()
+    _WORKER_DATA.update(data)
+
+
+def _permutation_batch(seed, size):
+    """Mean differences for `size` random relabelings of the pooled sample."""
+    pooled, n_a = _WORKER_DATA['pooled'], _WORKER_DATA['n_a']
+    rng = np.random.default_rng(seed)
+    mask = np.zeros((size, len(pooled)))
+    mask[:, :n_a] = 1.0
+    mask = rng.permuted(mask, axis=1)
+    sum_a = mask @ pooled
+    n_b = len(pooled) - n_a
+    return sum_a / n_a - (pooled.sum() - sum_a) / n_b
+
+
+def _bootstrap_batch(seed, size):
+    """Mean differences for `size` bootstrap resamples of each group."""
+    a, b = _WORKER_DATA['a'], _WORKER_DATA['b']
+    rng = np.random.default_rng(seed)
+    mean_a = a[rng.integers(0, len(a), (size, len(a)))].mean(axis=1)
+    mean_b = b[rng.integers(0, len(b), (size, len(b)))].mean(axis=1)
+    return mean_a - mean_b
+
+
+def _decided(exceed, done, alpha, z=3.0):
+    """True once a normal-approximation interval for the p-value excludes alpha."""
+    p_hat = (exceed + 1) / (done + 1)
+    half_width = z * np.sqrt(p_hat * (1 - p_hat) / (done + 1))
+    return p_hat + half_width < alpha or p_hat - half_width > alpha
+
+
+def _run_batches(batch_fn, data, n_resamples, batch_size, n_jobs, random_state, consume):
+    """
+    Run resample batches in seed order, serially or across a process pool, and
+    feed each batch to `consume` until it returns True or the budget is spent.
+
+    Every batch draws from its own child of SeedSequence(random_state), and batches
+    are consumed in order, so results do not depend on n_jobs. n_jobs of None or
+    -1 means one worker per CPU.
+    """
+    n_jobs = (os.cpu_count() or 1) if n_jobs in (None, -1) else n_jobs
+    if n_jobs < 1:
+        raise ValueError(f"n_jobs must be a positive integer, None or -1, got {n_jobs}")
+    sizes = [batch_size] * (n_resamples // batch_size)
+    if n_resamples % batch_size:
+        sizes.append(n_resamples % batch_size)
+    seeds = np.random.SeedSequence(random_state).spawn(len(sizes))
+    n_jobs = min(n_jobs, len(sizes))
+
+    if n_jobs <= 1:
+        _init_worker(data)
+        for seed, size in zip(seeds, sizes):
+            if consume(batch_fn(seed, size)):
+                return True
+        return False
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(data,)) as pool:
+        jobs = iter(zip(seeds, sizes))
+        pending = deque()
+        for seed, size in jobs:
+            pending.append(pool.submit(batch_fn, seed, size))
+            if len(pending) >= 2 * n_jobs:
+                break
+        while pending:
+            if consume(pending.popleft().result()):
+                for future in pending:
+                    future.cancel()
+                return True
+            next_job = next(jobs, None)
+            if next_job is not None:
+                pending.append(pool.submit(batch_fn, *next_job))
+    return False
+
+
+def _default_batch_size(n_cells):
+    return int(max(1, min(1000, MAX_BATCH_CELLS // max(n_cells, 1))))
+
+
+def permutation_test(a, b, n_resamples=10000, alternative='two-sided', alpha=0.05,
+                     early_stop=True, batch_size=None, n_jobs=1, random_state=None):
+    """
+    Permutation test for a difference in means between samples a and b.
+
+    Resamples are drawn as batched relabeling matrices and reduced with one
+    matrix-vector product per batch. With early_stop, sampling ends once the
+    p-value is clearly above or below alpha.
+
+    Returns: dict with statistic, p_value, n_resamples and stopped_early.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    pooled = np.concatenate([a, b])
+    observed = a.mean() - b.mean()
+    batch_size = batch_size or _default_batch_size(len(pooled))
+    counts = {'exceed': 0, 'done': 0}
+
+    def consume(diffs):
+        if alternative == 'two-sided':
+            hits = np.abs(diffs) >= abs(observed)
+        elif alternative == 'greater':
+            hits = diffs >= observed
+        elif alternative == 'less':
+            hits = diffs <= observed
+        else:
+            raise ValueError(f"Unknown alternative: {alternative}")
+        counts['exceed'] += int(hits.sum())
+        counts['done'] += len(diffs)
+        return early_stop and _decided(counts['exceed'], counts['done'], alpha)
+
+    stopped = _run_batches(_permutation_batch, {'pooled': pooled, 'n_a': len(a)},
+                           n_resamples, batch_size, n_jobs, random_state, consume)
+    return {
+        'statistic': observed,
+        'p_value': (counts['exceed'] + 1) / (counts['done'] + 1),
+        'n_resamples': counts['done'],
+        'stopped_early': stopped,
+    }
+
+
+def bootstrap_test(a, b, n_resamples=10000, confidence=0.95, alpha=0.05,
+                   early_stop=True, batch_size=None, n_jobs=1, random_state=None):
+    """
+    Bootstrap confidence interval and two-sided p-value for a difference in means.
+
+    The p-value is the share of bootstrap differences on the far side of zero,
+    doubled. With early_stop, sampling ends once that p-value is clearly decided.
+
+    Returns: dict with statistic, p_value, ci_low, ci_high, n_resamples and stopped_early.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    observed = a.mean() - b.mean()
+    batch_size = batch_size or _default_batch_size(len(a) + len(b))
+    diffs = []
+    counts = {'below': 0, 'above': 0, 'done': 0}
+
+    def consume(batch):
+        diffs.append(batch)
+        counts['below'] += int((batch <= 0).sum())
+        counts['above'] += int((batch >= 0).sum())
+        counts['done'] += len(batch)
+        tail = min(counts['below'], counts['above'])
+        return early_stop and _decided(2 * tail, counts['done'], alpha)
+
+    stopped = _run_batches(_bootstrap_batch, {'a': a, 'b': b},
+                           n_resamples, batch_size, n_jobs, random_state, consume)
+    diffs = np.concatenate(diffs)
+    tail = min(counts['below'], counts['above'])
+    q = (1 - confidence) / 2
+    return {
+        'statistic': observed,
+        'p_value': min(1.0, (2 * tail + 1) / (counts['done'] + 1)),
+        'ci_low': np.quantile(diffs, q),
+        'ci_high': np.quantile(diffs, 1 - q),
+        'n_resamples': counts['done'],
+        'stopped_early': stopped,
+    }
+
+
+def resampling_test(df, group_col, group_a, group_b, metric='margin', method='permutation', **kwargs):
+    """
+    Run a permutation or bootstrap test of `metric` between two groups of group_col.
+    """
+    a, b = group_arrays(df, group_col, group_a, group_b, metric)
+    if method == 'permutation':
+        return permutation_test(a, b, **kwargs)
+    if method == 'bootstrap':
+        return bootstrap_test(a, b, **kwargs)
+    raise ValueError(f"Unknown resampling method: {method}")
@@ -0,0 +1,226 @@
+import pandas as pd
+import numpy as np
+import os
+import logging
+from src.instrumentation import instrument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Additive per-cell sums over rows with positive premium (the exposure weight):
+# premium W, claims C, sum of C**2 / W (for the within-cell variance) and rows.
+RISK_STAT_COLUMNS = ['premium', 'claims', 'claims_sq_over_premium', 'policies']
+
+
+def compute_risk_stats(df, province_col='Province', postal_col='PostalCode', premium_col='TotalPremium',
+                       claims_col='TotalClaims'):
+    """
+    Credibility sufficient statistics per (Province, PostalCode) in one groupby pass.
+
+    Rows without positive premium carry no exposure and are skipped. Rows with a
+    missing PostalCode are kept as their own cell so they still count towards the
+    province and portfolio loss ratios.
+
+    Returns:
+        pd.DataFrame: RISK_STAT_COLUMNS indexed by (Province, PostalCode).
+    """
+    premium = df[premium_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    claims = np.nan_to_num(df[claims_col].to_numpy(dtype=np.float64, na_value=np.nan))
+    exposed = premium > 0
+    premium, claims = premium[exposed], claims[exposed]
+    parts = pd.DataFrame({
+        'premium': premium,
+        'claims': claims,
+        'claims_sq_over_premium': claims * claims / premium,
+        'policies': np.ones(len(premium), dtype=np.int64),
+    }, index=df.index[exposed])
+    keys = [df[province_col][exposed], df[postal_col][exposed]]
+    return parts.groupby(keys, observed=True, sort=True, dropna=False).sum()
+
+
+def merge_risk_stats(stats_list):
+    """Merge partial statistics, e.g. from successive chunks, by summation."""
+    stats_list = [stats for stats in stats_list if stats is not None and not stats.empty]
+    if not stats_list:
+        return pd.DataFrame(columns=RISK_STAT_COLUMNS)
+    if len(stats_list) == 1:
+        return stats_list[0]
+    merged = pd.concat(stats_list)
+    return merged.groupby(level=[0, 1], sort=True, dropna=False).sum()
+
+
+def credibility_table(stats):
+    """
+    Buhlmann-Straub credibility loss ratios per PostalCode within Province.
+
+    With premium as the exposure weight and single policy rows as the
+    observations, in closed form over the cell sums:
+
+        EPV  s2 = sum_i (Q_i - C_i**2 / W_i) / sum_i (n_i - 1)
+        VHM  a  = (sum_i W_i (X_i - mu_p)**2 - (I - P) s2) / sum_p (W_p - sum_{i in p} W_i**2 / W_p)
+        Z_i = W_i / (W_i + s2 / a)
+        loss_ratio_i = Z_i X_i + (1 - Z_i) mu_p
+
+    where X_i = C_i / W_i is the cell's loss ratio and mu_p the loss ratio of
+    its province, so sparse postal codes shrink toward their province.
+
+    Returns:
+        tuple: (cell table, province loss ratios, portfolio loss ratio,
+            {'epv', 'vhm', 'k'})
+    """
+    province_level = stats.index.names[0]
+    known = stats[stats.index.get_level_values(1).notna() & stats.index.get_level_values(0).notna()]
+    province = stats.groupby(level=0, sort=True).sum()
+    province_lr = province['claims'] / province['premium']
+    portfolio_lr = stats['claims'].sum() / stats['premium'].sum()
+
+    W, C = known['premium'].to_numpy(), known['claims'].to_numpy()
+    Q, n = known['claims_sq_over_premium'].to_numpy(), known['policies'].to_numpy()
+    X = C / W
+    mu = province_lr.reindex(known.index.get_level_values(0)).to_numpy()
+    W_p = province['premium'].reindex(known.index.get_level_values(0)).to_numpy()
+
+    dof = (n - 1).sum()
+    epv = max((Q - C * C / W).sum(), 0.0) / dof if dof > 0 else 0.0
+    n_provinces = known.index.get_level_values(0).nunique()
+    # Sum over provinces of W_p - sum W_i^2 / W_p, written per cell: W_i - W_i^2 / W_p
+    spread = (W - W * W / W_p).sum()
+    vhm = ((W * (X - mu) ** 2).sum() - (len(known) - n_provinces) * epv) / spread if spread > 0 else 0.0
+    vhm = max(vhm, 0.0)
+    if vhm > 0:
+        k = epv / vhm
+        Z = W / (W + k)
+    else:
+        k = np.inf
+        Z = np.zeros(len(W))
+
+    table = pd.DataFrame({
+        'policies': n,
+        'premium': W,
+        'claims': C,
+        'raw_loss_ratio': X,
+        'credibility': Z,
+        'loss_ratio': Z * X + (1 - Z) * mu,
+    }, index=known.index)
+    table['risk_index'] = table['loss_ratio'] / portfolio_lr
+    province_lr.index.name = province_level
+    return table, province_lr, portfolio_lr, {'epv': epv, 'vhm': vhm, 'k': k}
+
+
+class PostalRiskIndex:
+    """
+    Credibility-weighted PostalCode risk index, usable as one dense feature in
+    place of a high-cardinality PostalCode encoding.
+
+    fit aggregates premium and claims per (Province, PostalCode) in one pass
+    (DataFrame or chunks) and shrinks each postal code's loss ratio toward its
+    province with Buhlmann-Straub credibility (see credibility_table). The
+    index is the credible loss ratio relative to the portfolio, so 1.0 is an
+    average risk. transform looks rows up in the fitted table; unseen postal
+    codes get their province's index, unseen provinces 1.0.
+
+    Usage:
+        index = PostalRiskIndex().fit(train_df)
+        df['PostalRiskIndex'] = index.transform(df)
+        index.table_.sort_values('risk_index')
+    """
+
+    def __init__(self, province_col='Province', postal_col='PostalCode', premium_col='TotalPremium',
+                 claims_col='TotalClaims', feature_name='PostalRiskIndex'):
+        self.province_col = province_col
+        self.postal_col = postal_col
+        self.premium_col = premium_col
+        self.claims_col = claims_col
+        self.feature_name = feature_name
+
+    def fit(self, data):
+        """
+        Fit the index from a DataFrame or an iterable of chunks.
+
+        Returns:
+            PostalRiskIndex: self
+        """
+        columns = (self.province_col, self.postal_col, self.premium_col, self.claims_col)
+        if isinstance(data, pd.DataFrame):
+            stats = compute_risk_stats(data, *columns)
+        else:
+            stats = None
+            for chunk in data:
+                stats = merge_risk_stats([stats, compute_risk_stats(chunk, *columns)])
+            stats = merge_risk_stats([stats])
+        if stats.empty:
+            raise ValueError("No rows with positive premium to fit the risk index")
+        self.table_, self.province_loss_ratio_, self.portfolio_loss_ratio_, self.parameters_ = \
+            credibility_table(stats)
+        logger.info(f"Fitted risk index for {len(self.table_)} postal codes "
+                    f"(credibility constant k={self.parameters_['k']:.4g})")
+        return self
+
+    def transform(self, df):
+        """
+        Risk index per row of df, from its Province and PostalCode.
+
+        Returns:
+            np.ndarray: float64 index, 1.0 for an average risk.
+        """
+        keys = pd.MultiIndex.from_arrays([df[self.province_col], df[self.postal_col]])
+        position = self.table_.index.get_indexer(keys)
+        values = self.table_['risk_index'].to_numpy()[position]
+        province = (self.province_loss_ratio_ / self.portfolio_loss_ratio_) \
+            .reindex(pd.Index(df[self.province_col])).to_numpy(dtype=np.float64)
+        values = np.where(position >= 0, values, province)
+        return np.where(np.isnan(values), 1.0, values)
+
+    def add_feature(self, df, drop=True):
+        """Add the index as a column of df (in place) and drop the PostalCode column."""
+        df[self.feature_name] = self.transform(df)
+        if drop:
+            df.drop(columns=[self.postal_col], inplace=True)
+        return df
+
+    def save(self, path):
+        """Serialize the fitted index with joblib."""
+        import joblib
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        joblib.dump(self, path, compress=3)
+        logger.info(f"Saved risk index to {path}")
+
+    @classmethod
+    def load(cls, path):
+        """Load an index saved with save()."""
+        import joblib
+        index = joblib.load(path)
+        if not isinstance(index, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}")
+        return index
+
+
+@instrument()
+def build_risk_index(data, chunksize=200_000, output_path=None, **kwargs):
+    """
+    Fit a PostalRiskIndex from a DataFrame, chunk iterable or data file path,
+    streaming only the four input columns from a file.
+
+    Args:
+        data: Policies as a DataFrame, iterable of chunks or pipe-delimited file.
+        chunksize (int): Rows per chunk when data is a file path.
+        output_path (str, optional): Save the fitted index here.
+        **kwargs: Column names for PostalRiskIndex.
+
+    Returns:
+        PostalRiskIndex: The fitted index.
+    """
+    try:
+        index = PostalRiskIndex(**kwargs)
+        if isinstance(data, str):
+            from src.data_loader import iter_data
+            columns = [index.province_col, index.postal_col, index.premium_col, index.claims_col]
+            data = iter_data(data, columns=columns, chunksize=chunksize)
+        index.fit(data)
+        if output_path:
+            index.save(output_path)
+        return index
+    except Exception as e:
+        logger.error(f"Error building risk index: {str(e)}")
+        raise
@@ -0,0 +1,259 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+import asyncio
+import argparse
+import logging
+from src.premium import PremiumEngine
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BUNDLE_VERSION = 1
+
+
+def save_bundle(path, frequency_model, frequency_pipeline, severity_model, severity_pipeline,
+                expense_loading=0.15, profit_margin=0.05):
+    """
+    Save a claim-frequency classifier and a severity regressor, each with the
+    PreprocessingPipeline it was trained on, as one scoring bundle.
+
+    Args:
+        path (str): Output file, e.g. 'models/pricing_bundle.joblib'.
+        frequency_model: Fitted classifier with predict_proba (HasClaim target).
+        frequency_pipeline (PreprocessingPipeline): Pipeline fitted for frequency_model.
+        severity_model: Fitted regressor of TotalClaims on claimants.
+        severity_pipeline (PreprocessingPipeline): Pipeline fitted for severity_model.
+        expense_loading (float): Expense loading as a share of the risk premium.
+        profit_margin (float): Profit loading as a share of the risk premium.
+    """
+    import joblib
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        joblib.dump({
+            'version': BUNDLE_VERSION,
+            'frequency': (frequency_pipeline, frequency_model),
+            'severity': (severity_pipeline, severity_model),
+            'expense_loading': expense_loading,
+            'profit_margin': profit_margin,
+        }, path, compress=3)
+        logger.info(f"Saved scoring bundle to {path}")
+    except Exception as e:
+        logger.error(f"Error saving scoring bundle: {str(e)}")
+        raise
+
+
+class ScoringService:
+    """
+    Loads a scoring bundle once and scores policy batches.
+
+    Args:
+        bundle_path (str): File written by save_bundle.
+    """
+
+    def __init__(self, bundle_path):
+        import joblib
+        bundle = joblib.load(bundle_path)
+        if bundle.get('version') != BUNDLE_VERSION:
+            raise ValueError(f"Unsupported scoring bundle version: {bundle.get('version')}")
+        frequency_pipeline, frequency_model = bundle['frequency']
+        severity_pipeline, severity_model = bundle['severity']
+        self.engine = PremiumEngine(frequency_model, severity_model, frequency_pipeline, severity_pipeline,
+                                    expense_loading=bundle['expense_loading'],
+                                    profit_margin=bundle['profit_margin'])
+        # Raw input columns either pipeline reads; requests lacking one are rejected
+        self.required_columns = sorted({col for pipeline in (frequency_pipeline, severity_pipeline)
+                                        for col in getattr(pipeline, 'input_columns_', [])})
+        logger.info(f"Loaded scoring bundle from {bundle_path}")
+
+    def score(self, policies):
+        """
+        Score a batch of policies.
+
+        Args:
+            policies (pd.DataFrame): Raw policy rows with the training input columns.
+
+        Returns:
+            pd.DataFrame: claim_probability, expected_severity, risk_premium and
+                premium per policy.
+        """
+        return pd.DataFrame(self.engine.price(policies), index=policies.index)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests into one model call.
+
+    A request waits at most max_wait_ms for others to join its batch; a batch
+    is flushed early once it holds max_batch_rows policies. Scoring runs in a
+    worker thread so the event loop keeps accepting requests.
+    """
+
+    def __init__(self, service, max_batch_rows=512, max_wait_ms=2.0):
+        self.service = service
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+
+    async def submit(self, records):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((records, future))
+        return await future
+
+    async def run(self):
+        while True:
+            batch = []
+            try:
+                await self._collect(batch)
+                await self._score_batch(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Never let one batch end the loop: later requests would hang forever
+                logger.error(f"Scoring batch of {len(batch)} request(s) failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _collect(self, batch):
+        loop = asyncio.get_running_loop()
+        batch.append(await self.queue.get())
+        rows = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while rows < self.max_batch_rows:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += len(item[0])
+
+    async def _score_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            frame = pd.DataFrame([record for records, _ in batch for record in records])
+            scores = await loop.run_in_executor(None, self.service.score, frame)
+        except Exception as e:
+            if len(batch) == 1:
+                raise
+            # Score each request on its own so only the bad one gets the error
+            logger.warning(f"Batch of {len(batch)} requests failed ({e}); scoring them one by one")
+            for records, future in batch:
+                try:
+                    scores = await loop.run_in_executor(None, self.service.score, pd.DataFrame(records))
+                except Exception as request_error:
+                    if not future.done():
+                        future.set_exception(request_error)
+                    continue
+                if not future.done():
+                    future.set_result(scores.to_dict(orient='records'))
+            return
+        start = 0
+        for records, future in batch:
+            if not future.done():
+                future.set_result(scores.iloc[start:start + len(records)].to_dict(orient='records'))
+            start += len(records)
+
+
+def validate_records(records, required_columns=()):
+    """
+    Check a request's policies before they join a batch.
+
+    Returns:
+        str: What is wrong with the request, or None if it can be scored.
+    """
+    if not isinstance(records, list) or not records:
+        return "'policies' must be a non-empty list of policy objects"
+    if not all(isinstance(record, dict) for record in records):
+        return "every policy must be a JSON object"
+    for i, record in enumerate(records):
+        missing = [col for col in required_columns if col not in record]
+        if missing:
+            return f"policy {i} is missing columns: {missing}"
+    return None
+
+
+def make_app(service, max_batch_rows=512, max_wait_ms=2.0):
+    """
+    Build the aiohttp application: POST /score with {"policies": [...]} and GET /health.
+    """
+    from aiohttp import web
+
+    batcher = MicroBatcher(service, max_batch_rows, max_wait_ms)
+    batcher_task = web.AppKey('batcher_task', asyncio.Task)
+
+    async def score(request):
+        started = time.perf_counter()
+        try:
+            payload = await request.json()
+            records = payload['policies'] if isinstance(payload, dict) else payload
+            if isinstance(records, dict):
+                records = [records]
+        except Exception as e:
+            return web.json_response({'error': f"Invalid request body: {e}"}, status=400)
+        error = validate_records(records, getattr(service, 'required_columns', ()))
+        if error:
+            return web.json_response({'error': f"Invalid request body: {error}"}, status=400)
+        try:
+            predictions = await batcher.submit(records)
+        except Exception as e:
+            logger.error(f"Scoring failed: {e}")
+            return web.json_response({'error': str(e)}, status=500)
+        return web.json_response({'predictions': predictions,
+                                  'latency_ms': (time.perf_counter() - started) * 1000})
+
+    async def health(request):
+        return web.json_response({'status': 'ok'})
+
+    async def start_batcher(app):
+        app[batcher_task] = asyncio.create_task(batcher.run())
+
+    async def stop_batcher(app):
+        app[batcher_task].cancel()
+
+    app = web.Application()
+    app.router.add_post('/score', score)
+    app.router.add_get('/health', health)
+    app.on_startup.append(start_batcher)
+    app.on_cleanup.append(stop_batcher)
+    return app
+
+
+def score_file(service, input_path, output_path, chunksize=100_000):
+    """Score a pipe-delimited policy file in chunks and write the scores as CSV."""
+    return service.engine.price_file(input_path, output_path, chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score policies with a saved pricing bundle.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help="Run the HTTP scoring server on localhost.")
+    serve.add_argument('--bundle', required=True)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080)
+    serve.add_argument('--max-batch-rows', type=int, default=512)
+    serve.add_argument('--max-wait-ms', type=float, default=2.0)
+
+    batch = sub.add_parser('score', help="Score a pipe-delimited policy file.")
+    batch.add_argument('--bundle', required=True)
+    batch.add_argument('--input', required=True)
+    batch.add_argument('--output', required=True)
+    batch.add_argument('--chunksize', type=int, default=100_000)
+
+    args = parser.parse_args(argv)
+    service = ScoringService(args.bundle)
+    if args.command == 'serve':
+        from aiohttp import web
+        web.run_app(make_app(service, args.max_batch_rows, args.max_wait_ms), host=args.host, port=args.port)
+    else:
+        score_file(service, args.input, args.output, args.chunksize)
+
+
+if __name__ == '__main__':
+    main()
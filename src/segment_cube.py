@@ -0,0 +1,179 @@
+import pandas as pd
+import numpy as np
+import os
+import logging
+from src.data_cache import cache_path, read_cache, write_cache, parquet_available
+from src.instrumentation import instrument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CUBE_DIMS = ['Province', 'PostalCode', 'CoverType', 'Make', 'TransactionMonth']
+
+# Additive measures per cell; means and ratios are formed only after roll-up.
+CUBE_MEASURES = ['n', 'premium_sum', 'premium_n', 'claims_sum', 'claims_n']
+
+
+def _column(df, col):
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def compute_cube_cells(df, dims=None, premium_col='TotalPremium', claims_col='TotalClaims'):
+    """
+    Aggregate df into one row per observed combination of dims in a single groupby.
+
+    Missing dimension values are kept as their own cells so that roll-ups over the
+    other dimensions still count those rows.
+
+    Returns:
+        pd.DataFrame: CUBE_MEASURES indexed by dims.
+    """
+    dims = [dim for dim in (dims or CUBE_DIMS) if dim in df.columns]
+    premium = _column(df, premium_col)
+    claims = _column(df, claims_col)
+    parts = pd.DataFrame({
+        'n': np.ones(len(df), dtype=np.int64),
+        'premium_sum': np.nan_to_num(premium),
+        'premium_n': (~np.isnan(premium)).astype(np.int64),
+        'claims_sum': np.nan_to_num(claims),
+        'claims_n': (~np.isnan(claims)).astype(np.int64),
+    }, index=df.index)
+    return parts.groupby([df[dim] for dim in dims], observed=True, dropna=False).sum()
+
+
+def merge_cube_cells(cells_list):
+    """Merge partial cubes, e.g. from successive chunks, by summation."""
+    cells_list = [cells for cells in cells_list if cells is not None and not cells.empty]
+    if not cells_list:
+        return pd.DataFrame(columns=CUBE_MEASURES)
+    if len(cells_list) == 1:
+        return cells_list[0]
+    merged = pd.concat(cells_list)
+    return merged.groupby(level=list(range(merged.index.nlevels)), observed=True, dropna=False).sum()
+
+
+class SegmentCube:
+    """
+    Pre-aggregated premium/claims sums and counts over Province, PostalCode,
+    CoverType, Make and TransactionMonth.
+
+    Built once from the policy rows, then sliced and rolled up to any subset of
+    its dimensions without touching the rows again.
+
+    Usage:
+        cube = SegmentCube.from_data(df)            # or a chunk iterator
+        cube.rollup(['Province', 'CoverType'])       # sums and counts
+        cube.mean('premium', ['Province'])           # average TotalPremium
+        cube.loss_ratio(['Province'])                # total claims / total premium
+        cube.where(PostalCode=cube.top('PostalCode', 5))
+    """
+
+    def __init__(self, cells):
+        self.cells = cells
+        self._rollups = {}
+
+    @property
+    def dims(self):
+        return list(self.cells.index.names)
+
+    @classmethod
+    def from_data(cls, data, dims=None, premium_col='TotalPremium', claims_col='TotalClaims'):
+        """Build the cube from a DataFrame or an iterable of chunks."""
+        if isinstance(data, pd.DataFrame):
+            return cls(compute_cube_cells(data, dims, premium_col, claims_col))
+        cells = None
+        for chunk in data:
+            cells = merge_cube_cells([cells, compute_cube_cells(chunk, dims, premium_col, claims_col)])
+        return cls(merge_cube_cells([cells]))
+
+    def rollup(self, dims):
+        """
+        Sum the measures up to `dims`, dropping cells whose value is missing in
+        any of them.
+
+        Returns:
+            pd.DataFrame: CUBE_MEASURES indexed by dims, sorted. Memoised per
+                cube; treat it as read-only.
+        """
+        dims = [dims] if isinstance(dims, str) else list(dims)
+        missing = [dim for dim in dims if dim not in self.dims]
+        if missing:
+            raise KeyError(f"Dimensions not in cube: {missing}")
+        key = tuple(dims)
+        if key not in self._rollups:
+            self._rollups[key] = self.cells.groupby(level=dims, observed=True).sum()
+        return self._rollups[key]
+
+    def where(self, **filters):
+        """Sub-cube restricted to the given values, e.g. where(Province=['Gauteng'])."""
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, values in filters.items():
+            values = [values] if np.isscalar(values) else list(values)
+            mask &= self.cells.index.get_level_values(dim).isin(values)
+        return SegmentCube(self.cells[mask])
+
+    def top(self, dim, n=5):
+        """The n most frequent values of dim, like df[dim].value_counts().head(n).index."""
+        return self.rollup(dim)['n'].sort_values(ascending=False, kind='stable').head(n).index
+
+    def mean(self, measure, dims):
+        """Average of 'premium' or 'claims' per roll-up cell, over rows where it is present."""
+        if measure not in ('premium', 'claims'):
+            raise ValueError(f"Unknown cube measure: {measure}")
+        rolled = self.rollup(dims)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (rolled[f'{measure}_sum'] / rolled[f'{measure}_n'].where(rolled[f'{measure}_n'] > 0)) \
+                .rename(measure)
+
+    def loss_ratio(self, dims):
+        """
+        Exposure-weighted loss ratio, sum(TotalClaims) / sum(TotalPremium), per
+        roll-up cell; NaN where the premium sums to zero.
+        """
+        rolled = self.rollup(dims)
+        return (rolled['claims_sum'] / rolled['premium_sum'].where(rolled['premium_sum'] != 0)).rename('loss_ratio')
+
+    def save(self, path):
+        """Persist the cube cells to Parquet."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.cells.reset_index().to_parquet(path, index=False)
+        logger.info(f"Saved segment cube with {len(self.cells)} cells to {path}")
+
+    @classmethod
+    def load(cls, path, dims=None):
+        """Load cube cells written by save()."""
+        cells = pd.read_parquet(path)
+        dims = dims or [col for col in cells.columns if col not in CUBE_MEASURES]
+        return cls(cells.set_index(dims))
+
+
+@instrument()
+def build_segment_cube(data, dims=None, chunksize=200_000, cache=True, cache_dir=None):
+    """
+    Build a SegmentCube from a DataFrame, a chunk iterator or a data file path.
+
+    For a file path only the dimension and measure columns are streamed through
+    iter_data, and the cube is cached next to the data keyed by the file's DVC
+    md5, so later calls load it in milliseconds.
+    """
+    dims = list(dims or CUBE_DIMS)
+    if not isinstance(data, str):
+        return SegmentCube.from_data(data, dims)
+
+    from src.data_loader import iter_data, _read_header
+    header = _read_header(data)
+    columns = [col for col in dims + ['TotalPremium', 'TotalClaims'] if col in header]
+    dims = [dim for dim in dims if dim in header]
+    path = cache_path(data, {'segment_cube': dims, 'measures': CUBE_MEASURES}, cache_dir) \
+        if cache and parquet_available() else None
+    if path:
+        cells = read_cache(path)
+        if cells is not None:
+            return SegmentCube(cells.set_index(dims))
+    cube = SegmentCube.from_data(iter_data(data, columns=columns, chunksize=chunksize), dims)
+    if path:
+        write_cache(cube.cells.reset_index(), path)
+    return cube
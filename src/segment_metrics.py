@@ -0,0 +1,156 @@
+import pandas as pd
+import numpy as np
+
+# Per-segment sufficient statistics. Counts and sums are additive, so partial
+# results from separate chunks merge by plain addition. Spread is kept as M2, the
+# sum of squared deviations from the segment's own mean, which merges with the
+# Chan et al. pairwise update (see combine_segment_stats) instead of cancelling
+# catastrophically the way sum(x^2) - n * mean^2 does for large values.
+ADDITIVE_COLUMNS = ['n', 'n_claims', 'premium_sum', 'claims_sum', 'severity_sum', 'margin_n', 'margin_sum']
+# M2 column -> (count column, sum column) it is centred on
+M2_COLUMNS = {'severity_m2': ('n_claims', 'severity_sum'), 'margin_m2': ('margin_n', 'margin_sum')}
+STAT_COLUMNS = ADDITIVE_COLUMNS + list(M2_COLUMNS)
+
+
+def _as_list(group_cols):
+    return [group_cols] if isinstance(group_cols, str) else list(group_cols)
+
+
+def _mean(sums, counts):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts > 0, sums / np.where(counts > 0, counts, 1), 0.0)
+
+
+def compute_segment_stats(df, group_cols, premium_col='TotalPremium', claims_col='TotalClaims', dropna=True):
+    """
+    Compute claim/premium statistics per segment in one groupby pass.
+
+    Returns a frame indexed by group_cols with the STAT_COLUMNS. With
+    dropna=False, rows with a missing segment value form their own segment.
+    """
+    group_cols = _as_list(group_cols)
+    premium = df[premium_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    claims = df[claims_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    has_claim = claims > 0
+    severity = np.where(has_claim, claims, 0.0)
+    margin = premium - claims
+    margin_valid = ~np.isnan(margin)
+    margin = np.where(margin_valid, margin, 0.0)
+
+    parts = pd.DataFrame({
+        'n': np.ones(len(df), dtype=np.int64),
+        'n_claims': has_claim.astype(np.int64),
+        'premium_sum': premium,
+        'claims_sum': claims,
+        'severity_sum': severity,
+        'margin_n': margin_valid.astype(np.int64),
+        'margin_sum': margin,
+    }, index=df.index)
+    grouped = parts.groupby([df[col] for col in group_cols], observed=True, sort=True, dropna=dropna)
+    stats = grouped.sum()
+    # Second, vectorised pass: deviations from each row's segment mean
+    codes = np.nan_to_num(grouped.ngroup().to_numpy(dtype=np.float64), nan=-1).astype(np.int64)
+    in_group = codes >= 0
+    for m2_col, values, valid in (('severity_m2', severity, has_claim), ('margin_m2', margin, margin_valid)):
+        n_col, s_col = M2_COLUMNS[m2_col]
+        means = _mean(stats[s_col].to_numpy(dtype=np.float64), stats[n_col].to_numpy())
+        keep = in_group & valid
+        deviation = values[keep] - means[codes[keep]]
+        stats[m2_col] = np.bincount(codes[keep], weights=deviation * deviation, minlength=len(stats))
+    return stats
+
+
+def combine_segment_stats(stats, level=None, dropna=True):
+    """
+    Combine segment statistics rows that share the index `level`s (all rows when
+    level is None): counts and sums are added, M2 columns are merged with the
+    Chan et al. update M2 = sum(M2_i) + sum(n_i * (mean_i - mean)^2).
+
+    Returns:
+        pd.DataFrame: STAT_COLUMNS indexed by level (one row without level).
+    """
+    stats = stats[STAT_COLUMNS]
+    if level is None:
+        keys = np.zeros(len(stats), dtype=np.int64)
+        grouped = stats.groupby(keys)
+    else:
+        grouped = stats.groupby(level=level, observed=True, sort=True, dropna=dropna)
+    combined = grouped[ADDITIVE_COLUMNS].sum()
+    spread = {}
+    for m2_col, (n_col, s_col) in M2_COLUMNS.items():
+        n = stats[n_col].to_numpy(dtype=np.float64)
+        mean = _mean(stats[s_col].to_numpy(dtype=np.float64), n)
+        total_mean = _mean(grouped[s_col].transform('sum').to_numpy(dtype=np.float64),
+                           grouped[n_col].transform('sum').to_numpy())
+        spread[m2_col] = stats[m2_col].to_numpy(dtype=np.float64) + n * (mean - total_mean) ** 2
+    spread = pd.DataFrame(spread, index=stats.index)
+    m2 = spread.groupby(keys).sum() if level is None else \
+        spread.groupby(level=level, observed=True, sort=True, dropna=dropna).sum()
+    return pd.concat([combined, m2], axis=1)
+
+
+def merge_segment_stats(stats_list, dropna=True):
+    """Merge partial segment statistics, e.g. from successive chunks (see combine_segment_stats)."""
+    stats_list = [stats for stats in stats_list if stats is not None and not stats.empty]
+    if not stats_list:
+        return pd.DataFrame(columns=STAT_COLUMNS)
+    if len(stats_list) == 1:
+        return stats_list[0]
+    merged = pd.concat(stats_list)
+    return combine_segment_stats(merged, level=list(range(merged.index.nlevels)), dropna=dropna)
+
+
+def segment_kpis(stats):
+    """
+    Derive claim frequency, severity, margin and loss ratio from segment statistics.
+
+    Loss ratio is exposure weighted (total claims / total premium) and is NaN for
+    segments without premium.
+    """
+    kpis = stats.copy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kpis['claim_frequency'] = stats['n_claims'] / stats['n']
+        kpis['claim_severity'] = stats['severity_sum'] / stats['n_claims'].where(stats['n_claims'] > 0)
+        kpis['margin'] = stats['margin_sum'] / stats['margin_n'].where(stats['margin_n'] > 0)
+        kpis['loss_ratio'] = stats['claims_sum'] / stats['premium_sum'].where(stats['premium_sum'] != 0)
+    return kpis
+
+
+class SegmentAggregator:
+    """
+    Incremental segment KPI accumulator for chunked input.
+
+    Usage:
+        agg = SegmentAggregator(['Province', 'Gender'])
+        for chunk in iter_data(path, columns=[...]):
+            agg.update(chunk)
+        kpis = agg.result()
+    """
+
+    def __init__(self, group_cols, premium_col='TotalPremium', claims_col='TotalClaims'):
+        self.group_cols = _as_list(group_cols)
+        self.premium_col = premium_col
+        self.claims_col = claims_col
+        self.stats = None
+
+    def update(self, chunk):
+        """Fold one chunk into the running statistics."""
+        partial = compute_segment_stats(chunk, self.group_cols, self.premium_col, self.claims_col)
+        self.stats = merge_segment_stats([self.stats, partial])
+        return self
+
+    def result(self):
+        """Return the KPIs for all segments seen so far."""
+        return segment_kpis(merge_segment_stats([self.stats]))
+
+
+def aggregate_segments(data, group_cols, premium_col='TotalPremium', claims_col='TotalClaims'):
+    """
+    Compute segment KPIs from a DataFrame or an iterable of chunks.
+    """
+    if isinstance(data, pd.DataFrame):
+        return segment_kpis(compute_segment_stats(data, group_cols, premium_col, claims_col))
+    aggregator = SegmentAggregator(group_cols, premium_col, claims_col)
+    for chunk in data:
+        aggregator.update(chunk)
+    return aggregator.result()
@@ -0,0 +1,262 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+import time
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARAM_GRIDS = {
+    'linear': [{}],
+    'random_forest': {'n_estimators': [100, 300], 'max_depth': [None, 12], 'min_samples_leaf': [1, 5]},
+    'xgboost': {'max_depth': [4, 6, 8], 'learning_rate': [0.05, 0.1], 'subsample': [0.8],
+                'n_estimators': [1000]},
+}
+
+# Threads each fit may use; the scheduler keeps the sum over running fits within n_jobs.
+DEFAULT_THREADS = {'linear': 1, 'random_forest': 2, 'xgboost': 2}
+
+
+def _build_model(family, params, regression, n_threads, random_state, early_stopping_rounds=None):
+    if family == 'linear':
+        from sklearn.linear_model import LinearRegression, LogisticRegression
+        return LinearRegression(**params) if regression else LogisticRegression(max_iter=1000, **params)
+    if family == 'random_forest':
+        from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
+        cls = RandomForestRegressor if regression else RandomForestClassifier
+        return cls(random_state=random_state, n_jobs=n_threads, **params)
+    if family == 'xgboost':
+        from xgboost import XGBRegressor, XGBClassifier
+        cls = XGBRegressor if regression else XGBClassifier
+        return cls(random_state=random_state, n_jobs=n_threads, verbosity=0,
+                   early_stopping_rounds=early_stopping_rounds, **params)
+    raise ValueError(f"Unknown model family: {family}")
+
+
+def _score(model, X, y, regression):
+    """RMSE for regression (lower is better), ROC AUC for classification."""
+    if regression:
+        return float(np.sqrt(np.mean((np.asarray(y) - model.predict(X)) ** 2)))
+    from sklearn.metrics import roc_auc_score
+    return float(roc_auc_score(y, model.predict_proba(X)[:, 1]))
+
+
+def _save_matrix(X, work_dir):
+    """
+    Write X for memory-mapping: one float32 .npy for dense input, the data,
+    indices and indptr arrays of a float32 CSR matrix for sparse input.
+
+    Returns:
+        dict: 'X_path' (the .npy file, or the prefix of the three CSR files),
+            'X_format' ('dense' or 'csr') and 'X_shape'.
+    """
+    import scipy.sparse as sp
+    if sp.issparse(X):
+        X = sp.csr_matrix(X, dtype=np.float32)
+        prefix = os.path.join(work_dir, 'X')
+        for part in ('data', 'indices', 'indptr'):
+            np.save(f"{prefix}_{part}.npy", getattr(X, part))
+        return {'X_path': prefix, 'X_format': 'csr', 'X_shape': tuple(X.shape)}
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    path = os.path.join(work_dir, 'X.npy')
+    np.save(path, X)
+    return {'X_path': path, 'X_format': 'dense', 'X_shape': tuple(X.shape)}
+
+
+def _load_matrix(paths):
+    """Memory-map the matrix written by _save_matrix."""
+    if paths['X_format'] == 'dense':
+        return np.load(paths['X_path'], mmap_mode='r')
+    import scipy.sparse as sp
+    data, indices, indptr = (np.load(f"{paths['X_path']}_{part}.npy", mmap_mode='r')
+                             for part in ('data', 'indices', 'indptr'))
+    return sp.csr_matrix((data, indices, indptr), shape=paths['X_shape'], copy=False)
+
+
+def _fit_fold(task):
+    """
+    Fit one (family, params, fold) task on the memory-mapped fold matrices.
+
+    Runs in a worker process; only the file paths and fold number are pickled.
+    """
+    from threadpoolctl import threadpool_limits
+    X = _load_matrix(task)
+    y = np.load(task['y_path'], mmap_mode='r')
+    folds = np.load(task['folds_path'])
+    train_idx, test_idx = folds[f"train_{task['fold']}"], folds[f"test_{task['fold']}"]
+
+    started = time.perf_counter()
+    with threadpool_limits(limits=task['n_threads']):
+        model = _build_model(task['family'], task['params'], task['regression'], task['n_threads'],
+                             task['random_state'], task['early_stopping_rounds'])
+        fit_kwargs = {}
+        if task['family'] == 'xgboost' and task['early_stopping_rounds']:
+            # Hold out the tail of the (already shuffled) training fold for early stopping
+            n_eval = max(1, len(train_idx) // 10)
+            eval_idx, train_idx = train_idx[-n_eval:], train_idx[:-n_eval]
+            fit_kwargs = {'eval_set': [(X[eval_idx], y[eval_idx])], 'verbose': False}
+        model.fit(X[train_idx], y[train_idx], **fit_kwargs)
+        score = _score(model, X[test_idx], y[test_idx], task['regression'])
+
+    return {
+        'family': task['family'],
+        'params': json.dumps(task['params'], sort_keys=True),
+        'fold': task['fold'],
+        'score': score,
+        'best_iteration': getattr(model, 'best_iteration', None) if fit_kwargs else None,
+        'fit_seconds': time.perf_counter() - started,
+    }
+
+
+class TrainingOrchestrator:
+    """
+    Cross-validated hyperparameter search over linear, random forest and XGBoost
+    models.
+
+    The prepared feature matrix, target and fold indices are written once to
+    `work_dir` and memory-mapped by every worker. Fits are scheduled across a
+    process pool so that the threads of concurrently running fits stay within
+    n_jobs. XGBoost fits stop early on a slice of their training fold. Results are
+    written to work_dir/leaderboard.csv.
+
+    Args:
+        regression (bool): Regression (RMSE) or binary classification (ROC AUC).
+        families (tuple): Model families to search.
+        param_grids (dict, optional): Per-family sklearn-style parameter grids.
+        n_folds (int): Number of CV folds.
+        n_jobs (int, optional): CPU threads to use. Defaults to os.cpu_count().
+        threads_per_model (dict, optional): Threads per fit for each family.
+        early_stopping_rounds (int): XGBoost early stopping patience.
+        work_dir (str): Directory for fold matrices and the leaderboard.
+        random_state (int): Seed for folds and models.
+    """
+
+    def __init__(self, regression=True, families=('linear', 'random_forest', 'xgboost'), param_grids=None,
+                 n_folds=5, n_jobs=None, threads_per_model=None, early_stopping_rounds=50,
+                 work_dir=os.path.join('models', 'cv'), random_state=42):
+        self.regression = regression
+        self.families = list(families)
+        self.param_grids = {**DEFAULT_PARAM_GRIDS, **(param_grids or {})}
+        self.n_folds = n_folds
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.threads_per_model = {**DEFAULT_THREADS, **(threads_per_model or {})}
+        self.early_stopping_rounds = early_stopping_rounds
+        self.work_dir = work_dir
+        self.random_state = random_state
+
+    def prepare(self, X, y):
+        """
+        Write X (as float32), y and the fold indices to work_dir for memory-mapping.
+        Sparse X stays sparse: its CSR arrays are mapped instead of a dense copy.
+
+        Args:
+            X (pd.DataFrame, np.ndarray or scipy.sparse matrix): Encoded features,
+                e.g. from PreprocessingPipeline or prepare_data(sparse=True).
+            y (array-like): Target.
+
+        Returns:
+            dict: Paths of the written artifacts.
+        """
+        from sklearn.model_selection import KFold, StratifiedKFold
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.feature_names_ = list(X.columns) if isinstance(X, pd.DataFrame) else None
+        y = np.asarray(y, dtype=np.float64 if self.regression else np.int8)
+
+        splitter_cls = KFold if self.regression else StratifiedKFold
+        splitter = splitter_cls(n_splits=self.n_folds, shuffle=True, random_state=self.random_state)
+        folds = {}
+        for fold, (train_idx, test_idx) in enumerate(splitter.split(np.zeros(len(y)), y)):
+            folds[f"train_{fold}"] = train_idx
+            folds[f"test_{fold}"] = test_idx
+
+        self.paths_ = {
+            **_save_matrix(X, self.work_dir),
+            'y_path': os.path.join(self.work_dir, 'y.npy'),
+            'folds_path': os.path.join(self.work_dir, 'folds.npz'),
+        }
+        np.save(self.paths_['y_path'], y)
+        np.savez(self.paths_['folds_path'], **folds)
+        n_rows, n_features = self.paths_['X_shape']
+        logger.info(f"Prepared {self.n_folds} folds over {n_rows} rows x {n_features} features in {self.work_dir}")
+        return self.paths_
+
+    def _tasks(self):
+        from sklearn.model_selection import ParameterGrid
+        tasks = []
+        for family in self.families:
+            n_threads = min(self.threads_per_model.get(family, 1), self.n_jobs)
+            for params in ParameterGrid(self.param_grids[family]):
+                for fold in range(self.n_folds):
+                    tasks.append({**self.paths_, 'family': family, 'params': params, 'fold': fold,
+                                  'n_threads': n_threads, 'regression': self.regression,
+                                  'random_state': self.random_state,
+                                  'early_stopping_rounds': self.early_stopping_rounds if family == 'xgboost' else None})
+        # Widest fits first so narrow ones can fill the remaining thread budget
+        return deque(sorted(tasks, key=lambda task: -task['n_threads']))
+
+    def _run_tasks(self, tasks):
+        if self.n_jobs == 1:
+            return [_fit_fold(task) for task in tasks]
+        results, running, used = [], {}, 0
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+            while tasks or running:
+                while tasks and used + tasks[0]['n_threads'] <= self.n_jobs:
+                    task = tasks.popleft()
+                    running[pool.submit(_fit_fold, task)] = task
+                    used += task['n_threads']
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    used -= running.pop(future)['n_threads']
+                    results.append(future.result())
+        return results
+
+    def run(self, X=None, y=None):
+        """
+        Run the cross-validated search and write the leaderboard.
+
+        Args:
+            X, y (optional): Data to prepare; omit if prepare() was already called.
+
+        Returns:
+            pd.DataFrame: One row per (family, params), best first.
+        """
+        if X is not None:
+            self.prepare(X, y)
+        tasks = self._tasks()
+        logger.info(f"Running {len(tasks)} CV fits with {self.n_jobs} threads")
+        started = time.perf_counter()
+        self.fold_results_ = pd.DataFrame(self._run_tasks(tasks))
+
+        leaderboard = self.fold_results_.groupby(['family', 'params'], sort=False).agg(
+            score_mean=('score', 'mean'), score_std=('score', 'std'),
+            best_iteration=('best_iteration', 'mean'), fit_seconds=('fit_seconds', 'sum'),
+        ).reset_index()
+        self.leaderboard_ = leaderboard.sort_values('score_mean', ascending=self.regression, ignore_index=True)
+        path = os.path.join(self.work_dir, 'leaderboard.csv')
+        self.leaderboard_.to_csv(path, index=False)
+        logger.info(f"CV search finished in {time.perf_counter() - started:.1f}s; leaderboard written to {path}")
+        return self.leaderboard_
+
+    def refit_best(self, rank=0):
+        """
+        Refit the leaderboard entry at `rank` on all prepared rows.
+
+        XGBoost is refit with the mean early-stopped number of trees and no
+        early stopping.
+        """
+        entry = self.leaderboard_.iloc[rank]
+        params = json.loads(entry['params'])
+        if entry['family'] == 'xgboost' and pd.notna(entry['best_iteration']):
+            params['n_estimators'] = int(entry['best_iteration']) + 1
+        model = _build_model(entry['family'], params, self.regression, self.n_jobs, self.random_state)
+        X = _load_matrix(self.paths_)
+        y = np.load(self.paths_['y_path'], mmap_mode='r')
+        model.fit(X, y)
+        if self.feature_names_ is not None:
+            model.feature_names_ = self.feature_names_
+        return model
@@ -0,0 +1,197 @@
+import pandas as pd
+import numpy as np
+import os
+import logging
+from src.cleaning import parse_dates, DATE_FORMATS
+from src.segment_metrics import (ADDITIVE_COLUMNS, STAT_COLUMNS, combine_segment_stats, compute_segment_stats,
+                                 merge_segment_stats, segment_kpis)
+from src.instrumentation import instrument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TREND_DIMS = ['Province', 'PostalCode', 'CoverType']
+MONTH_COL = 'TransactionMonth'
+
+
+def month_start(series):
+    """TransactionMonth as month-start timestamps; strings are parsed once per distinct value."""
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series, _ = parse_dates(series, DATE_FORMATS[MONTH_COL])
+    values = series.to_numpy()
+    months = values.astype('datetime64[M]').astype(values.dtype)
+    return pd.Series(months, index=series.index, name=MONTH_COL)
+
+
+def compute_monthly_stats(df, dims=None, premium_col='TotalPremium', claims_col='TotalClaims'):
+    """
+    Segment statistics (see segment_metrics.STAT_COLUMNS) per month and
+    segment in one groupby pass. Missing segment values are kept as their own
+    segment so roll-ups over the other dimensions still count those rows.
+
+    Returns:
+        pd.DataFrame: STAT_COLUMNS indexed by dims + [TransactionMonth].
+    """
+    dims = [dim for dim in (dims if dims is not None else TREND_DIMS) if dim in df.columns]
+    keyed = df[dims + [premium_col, claims_col]].assign(**{MONTH_COL: month_start(df[MONTH_COL])})
+    return compute_segment_stats(keyed, dims + [MONTH_COL], premium_col, claims_col, dropna=False)
+
+
+class TrendStore:
+    """
+    Monthly KPI store: mergeable claim/premium statistics per segment and month,
+    built in one scan and extended month by month.
+
+    Loss ratio, frequency, severity and margin for any roll-up of the segment
+    dimensions, including trailing windows, are ratios of sums in the store, so
+    every trend chart is a query rather than another pass over the policies.
+
+    Usage:
+        store = TrendStore.from_data(iter_data(path, columns=[...]))
+        store.append(new_month_df).save('data/trends.parquet')
+        store.kpis('Province')                       # per Province and month
+        store.rolling(3, 'PostalCode')               # trailing 3-month KPIs
+        store.pivot('loss_ratio', 'PostalCode')      # months x postal codes
+    """
+
+    def __init__(self, stats, dims=None):
+        self.stats = stats
+        self.dims = list(dims) if dims is not None else \
+            [name for name in stats.index.names if name != MONTH_COL]
+        self._rollups = {}
+
+    @classmethod
+    def from_data(cls, data, dims=None, premium_col='TotalPremium', claims_col='TotalClaims'):
+        """Build the store from a DataFrame or an iterable of chunks."""
+        return cls(_scan(data, dims, premium_col, claims_col))
+
+    @property
+    def months(self):
+        """Months held by the store, ascending."""
+        return self.stats.index.get_level_values(MONTH_COL).unique().sort_values()
+
+    def append(self, data, premium_col='TotalPremium', claims_col='TotalClaims'):
+        """
+        Add newly arrived policy rows (DataFrame or chunks).
+
+        Months present in data replace the stored statistics for those months, so
+        re-running an append for the same month is idempotent; other months are
+        left as they are.
+
+        Returns:
+            TrendStore: self
+        """
+        new = _scan(data, self.dims, premium_col, claims_col)
+        new_months = new.index.get_level_values(MONTH_COL).unique()
+        kept = self.stats[~self.stats.index.get_level_values(MONTH_COL).isin(new_months)]
+        self.stats = merge_segment_stats([kept, new], dropna=False)
+        self._rollups = {}
+        logger.info(f"Appended {len(new_months)} month(s) to trend store "
+                    f"({len(self.stats)} segment-months)")
+        return self
+
+    def rollup(self, dims=None):
+        """
+        Combine the statistics up to dims and month.
+
+        Returns:
+            pd.DataFrame: STAT_COLUMNS indexed by dims + [TransactionMonth].
+                Memoised; treat it as read-only.
+        """
+        dims = [dims] if isinstance(dims, str) else list(dims or [])
+        missing = [dim for dim in dims if dim not in self.dims]
+        if missing:
+            raise KeyError(f"Dimensions not in trend store: {missing}")
+        key = tuple(dims)
+        if key not in self._rollups:
+            self._rollups[key] = combine_segment_stats(self.stats, level=dims + [MONTH_COL])
+        return self._rollups[key]
+
+    def kpis(self, dims=None):
+        """Exposure-weighted loss ratio, claim frequency, severity and margin per segment and month."""
+        return segment_kpis(self.rollup(dims))
+
+    def rolling(self, window=3, dims=None, min_periods=1):
+        """
+        KPIs over trailing windows of `window` months, per segment.
+
+        Sums are taken over calendar months, so a month without policies in a
+        segment contributes zero exposure rather than shifting the window. The
+        KPIs are ratios of sums, so only the additive columns are windowed.
+        """
+        dims = [dims] if isinstance(dims, str) else list(dims or [])
+        stats = self.rollup(dims)[ADDITIVE_COLUMNS]
+        months = pd.date_range(self.months.min(), self.months.max(), freq='MS', name=MONTH_COL) \
+            .astype(self.months.dtype)
+        wide = stats.unstack(dims, fill_value=0) if dims else stats
+        wide = wide.reindex(months, fill_value=0)
+        summed = wide.rolling(window, min_periods=min_periods).sum()
+        if dims:
+            summed = summed.stack(dims).reorder_levels(dims + [MONTH_COL]).sort_index()
+        summed = summed[summed['n'] > 0].astype(stats.dtypes.to_dict())
+        return segment_kpis(summed)
+
+    def pivot(self, kpi='loss_ratio', dims=None, window=None):
+        """Months x segments table of one KPI, e.g. for a dashboard across all postal codes."""
+        dims = [dims] if isinstance(dims, str) else list(dims or [])
+        kpis = self.rolling(window, dims) if window else self.kpis(dims)
+        return kpis[kpi].unstack(dims) if dims else kpis[kpi]
+
+    def save(self, path):
+        """Write the store to Parquet atomically."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        self.stats.reset_index().to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved trend store with {len(self.stats)} segment-months to {path}")
+        return self
+
+    @classmethod
+    def load(cls, path):
+        """Load a store written by save()."""
+        stats = pd.read_parquet(path)
+        keys = [col for col in stats.columns if col not in STAT_COLUMNS]
+        return cls(stats.set_index(keys))
+
+
+def _scan(data, dims, premium_col, claims_col):
+    if isinstance(data, pd.DataFrame):
+        return compute_monthly_stats(data, dims, premium_col, claims_col)
+    stats = None
+    for chunk in data:
+        stats = merge_segment_stats([stats, compute_monthly_stats(chunk, dims, premium_col, claims_col)],
+                                    dropna=False)
+    return merge_segment_stats([stats], dropna=False)
+
+
+@instrument()
+def update_trend_store(data, path, dims=None, chunksize=200_000):
+    """
+    Create or extend the persisted trend store at path.
+
+    Args:
+        data: Newly arrived policies as a DataFrame, chunk iterable or data file path.
+        path (str): Parquet store, e.g. 'data/trends.parquet'. Created on first use.
+        dims (list, optional): Segment dimensions of a new store. Defaults to TREND_DIMS.
+        chunksize (int): Rows per chunk when data is a file path.
+
+    Returns:
+        TrendStore: The updated store, already saved.
+    """
+    try:
+        store = TrendStore.load(path) if os.path.exists(path) else None
+        dims = store.dims if store is not None else list(dims if dims is not None else TREND_DIMS)
+        if isinstance(data, str):
+            from src.data_loader import iter_data, _read_header
+            header = _read_header(data)
+            columns = [col for col in dims + [MONTH_COL, 'TotalPremium', 'TotalClaims'] if col in header]
+            data = iter_data(data, columns=columns, chunksize=chunksize)
+        if store is None:
+            store = TrendStore.from_data(data, dims)
+        else:
+            store.append(data)
+        return store.save(path)
+    except Exception as e:
+        logger.error(f"Error updating trend store: {str(e)}")
+        raise
@@ -1,56 +1,92 @@
-import seaborn as sns
-import matplotlib.pyplot as plt
+import numpy as np
 import logging
+from src.utils import pyplot, show_plot
+from src.column_stats import summarize_columns
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def univariate_numerical_analysis(df, numerical_cols):
+def draw_histogram(ax, histogram, color='skyblue'):
+    """Draw a pre-binned histogram with its binned KDE overlay."""
+    edges = histogram['edges']
+    ax.bar(edges[:-1], histogram['counts'], width=np.diff(edges), align='edge', color=color, edgecolor='white')
+    if histogram.get('kde') is not None:
+        ax.plot(histogram['kde_x'], histogram['kde'], color='steelblue')
+
+def draw_box(ax, box, color='lightcoral'):
+    """Draw a box plot from Axes.bxp statistics."""
+    ax.bxp([box], showfliers=True, patch_artist=True, boxprops={'facecolor': color}, widths=0.5)
+    ax.set_xticks([])
+
+def draw_counts(ax, counts, palette='viridis'):
+    """Draw a bar chart of pre-computed category counts."""
+    import seaborn as sns
+    labels = counts.index.astype(str)
+    sns.barplot(x=labels, y=counts.to_numpy(), hue=labels, legend=False, palette=palette, ax=ax)
+    ax.tick_params(axis='x', rotation=45)
+
+def univariate_numerical_analysis(df, numerical_cols, stats=None):
     """Perform univariate analysis for numerical columns with histograms and box plots."""
+    plt = pyplot()
+    stats = stats or summarize_columns(df, numerical_cols, [])
     for col in numerical_cols:
+        summary = stats.get(col)
+        if not summary or not summary['count']:
+            continue
         # Histogram with KDE
-        plt.figure()
-        sns.histplot(df[col].dropna(), bins=30, kde=True, color='skyblue')
-        plt.title(f'Distribution of {col}', fontsize=14, pad=20)
-        plt.xlabel(col, fontsize=12)
-        plt.ylabel('Frequency', fontsize=12)
-        plt.show
+        fig, ax = plt.subplots()
+        draw_histogram(ax, summary['histogram'])
+        ax.set_title(f'Distribution of {col}', fontsize=14, pad=20)
+        ax.set_xlabel(col, fontsize=12)
+        ax.set_ylabel('Frequency', fontsize=12)
+        show_plot()
 
         # Box plot for outlier detection
-        plt.figure()
-        sns.boxplot(data=df, y=col, color='lightcoral')
-        plt.title(f'Box Plot of {col} (Outlier Detection)', fontsize=14, pad=20)
-        plt.ylabel(col, fontsize=12)
-        plt.show
+        fig, ax = plt.subplots()
+        draw_box(ax, summary['box'])
+        ax.set_title(f'Box Plot of {col} (Outlier Detection)', fontsize=14, pad=20)
+        ax.set_ylabel(col, fontsize=12)
+        show_plot()
 
-def univariate_categorical_analysis(df, categorical_cols):
+def univariate_categorical_analysis(df, categorical_cols, stats=None):
     """Perform univariate analysis for categorical columns with bar charts."""
+    plt = pyplot()
+    stats = stats or summarize_columns(df, [], categorical_cols)
     for col in categorical_cols:
-        plt.figure()
-        sns.countplot(data=df, x=col, palette='viridis')
-        plt.title(f'Frequency of {col}', fontsize=14, pad=20)
-        plt.xlabel(col, fontsize=12)
-        plt.ylabel('Count', fontsize=12)
-        plt.xticks(rotation=45)
-        plt.show
-
-def run_univariate_analysis(df, numerical_cols, categorical_cols):
-    """Run complete univariate analysis."""
+        summary = stats.get(col)
+        if not summary or summary['counts'] is None:
+            continue
+        fig, ax = plt.subplots()
+        draw_counts(ax, summary['counts'])
+        ax.set_title(f'Frequency of {col}', fontsize=14, pad=20)
+        ax.set_xlabel(col, fontsize=12)
+        ax.set_ylabel('Count', fontsize=12)
+        show_plot()
+
+def run_univariate_analysis(df, numerical_cols, categorical_cols, stats=None):
+    """
+    Run complete univariate analysis.
+
+    `df` may be a DataFrame or an iterable of chunks (e.g. iter_data); the plots
+    are drawn from one streaming statistics pass, or from `stats` if given.
+    """
     print("\nRunning Univariate Analysis...")
-    numerical_cols = [col for col in numerical_cols if col in df.columns]
-    categorical_cols = [col for col in categorical_cols if col in df.columns]
+    if stats is None:
+        stats = summarize_columns(df, numerical_cols, categorical_cols)
+    numerical_cols = [col for col in numerical_cols if stats.get(col, {}).get('count')]
+    categorical_cols = [col for col in categorical_cols if stats.get(col, {}).get('counts') is not None]
     
     if numerical_cols:
-        univariate_numerical_analysis(df, numerical_cols)
+        univariate_numerical_analysis(df, numerical_cols, stats)
     else:
         print("Warning: No numerical columns found for univariate analysis.")
     
     if categorical_cols:
-        univariate_categorical_analysis(df, categorical_cols)
+        univariate_categorical_analysis(df, categorical_cols, stats)
     else:
         print("Warning: No categorical columns found for univariate analysis.")
     
     print("Univariate Analysis Summary:")
     print("Numerical Columns Analyzed:", numerical_cols)
-    print("Categorical Columns Analyzed:", categorical_cols)
\ No newline at end of file
+    print("Categorical Columns Analyzed:", categorical_cols)
@@ -1,79 +1,64 @@
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 import os
 import logging
 
+# Schema-aware loader, re-exported for existing callers of utils.load_data
+from src.data_loader import load_data, iter_data
+from src.cleaning import clean_columns, DATE_FORMATS
+from src.instrumentation import instrument
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
-# Set Seaborn style
 
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (10, 6)
+# Applied by pyplot() on first use instead of at import, so data-only jobs never
+# load matplotlib/seaborn or touch global rcParams
+PLOT_STYLE = 'whitegrid'
+PLOT_FIGSIZE = (10, 6)
+_plot_style_applied = False
+
+
+def pyplot():
+    """matplotlib.pyplot with the project plot style (seaborn whitegrid, 10x6 figures) applied once."""
+    global _plot_style_applied
+    import matplotlib.pyplot as plt
+    if not _plot_style_applied:
+        import seaborn as sns
+        sns.set_style(PLOT_STYLE)
+        plt.rcParams['figure.figsize'] = PLOT_FIGSIZE
+        _plot_style_applied = True
+    return plt
 
-def load_data(file_path: str) -> pd.DataFrame:
-         """
-         Load CSV data from the specified file path.
-         
-         Args:
-             file_path (str): Path to the CSV file.
-             
-         Returns:
-             pd.DataFrame: Loaded DataFrame.
-             
-         Raises:
-             FileNotFoundError: If the file does not exist.
-             pd.errors.EmptyDataError: If the file is empty.
-         """
-         try:
-             if not os.path.exists(file_path):
-                 raise FileNotFoundError(f"File not found: {file_path}")
-             
-             df = pd.read_csv(file_path, delimiter='|', encoding='utf-8')
-             logger.info(f"Successfully loaded data from {file_path} with {len(df)} rows")
-             
-             # Basic validation
-             if df.empty:
-                 raise pd.errors.EmptyDataError("The CSV file is empty")
-             
-             print("Available Columns:")
-             print(df.columns.tolist())
-             print("\nData Types:")
-             print(df.dtypes)
-             return df
-         except Exception as e:
-             logger.error(f"Error loading data: {e}")
-             raise
 
-def clean_numerical_columns(df, numerical_cols):
+@instrument()
+def clean_numerical_columns(df, numerical_cols, n_jobs=None):
     """Clean numerical columns by handling comma-separated formats."""
-    for col in numerical_cols:
-        if col in df.columns and df[col].dtype == 'object':
-            try:
-                df[col] = df[col].str.replace(',', '.', regex=False)
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                print(f"Converted {col} to numeric.")
-            except Exception as e:
-                print(f"Error converting {col} to numeric: {e}")
+    df, report = clean_columns(df, numeric_cols=numerical_cols, n_jobs=n_jobs)
+    for row in report.itertuples():
+        print(f"Converted {row.column} to numeric." + (f" ({row.failed} unparseable values set to NaN)" if row.failed else ""))
     return df
 
-def convert_datetime(df, date_col='TransactionMonth'):
-    """Convert date column to datetime."""
+def convert_datetime(df, date_col='TransactionMonth', fmt=None):
+    """Convert date column to datetime using its known fixed format."""
     if date_col in df.columns:
-        try:
-            df[date_col] = pd.to_datetime(df[date_col])
-            print(f"\n{date_col} converted to datetime.")
-        except Exception as e:
-            print(f"Error converting {date_col} to datetime: {e}")
+        df, report = clean_columns(df, date_cols={date_col: fmt or DATE_FORMATS.get(date_col)})
+        failed = int(report['failed'].sum())
+        print(f"\n{date_col} converted to datetime." + (f" ({failed} unparseable values set to NaT)" if failed else ""))
     return df
 
 def save_plot(filename, output_dir='visualizations'):
     """Save plot to PNG in output directory."""
+    plt = pyplot()
     os.makedirs(output_dir, exist_ok=True)
     plt.savefig(os.path.join(output_dir, filename), bbox_inches='tight')
     plt.close()
 
+def show_plot():
+    """Display the current figure (inline in notebooks) and close it."""
+    plt = pyplot()
+    plt.show()
+    plt.close()
+
 def filter_columns(df, possible_cols):
     """Filter columns that exist in the dataframe."""
     return [col for col in possible_cols if col in df.columns]
@@ -0,0 +1,284 @@
+"""
+Benchmark suite for the data and modeling pipeline on synthetic data.
+
+Each case is timed (wall and CPU) and memory-profiled (tracemalloc peak of the
+allocations it makes, plus process RSS when psutil is installed) at every
+requested row count. Results are written as JSON and compared against a
+stored baseline; a case slower than baseline by more than --tolerance is
+reported as a regression and makes the run exit with status 1.
+
+Usage:
+    python -m test.benchmark --rows 100000 1000000
+    python -m test.benchmark --rows 100000 --save-baseline
+    python -m test.benchmark --rows 100000 1000000 10000000 --max-train-rows 1000000
+"""
+import pandas as pd
+import numpy as np
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import subprocess
+import logging
+from datetime import datetime, timezone
+from test.synthetic_data import write_synthetic_file
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROWS = (100_000, 1_000_000, 10_000_000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+DEFAULT_DATA_DIR = os.path.join('data', 'synthetic')
+# Same drop list as notebook/modeling.ipynb
+MODEL_DROP_COLS = ['UnderwrittenCoverID', 'PolicyID', 'TransactionMonth', 'TotalPremium',
+                   'CalculatedPremiumPerTerm']
+MODEL_COLUMNS = ['Province', 'PostalCode', 'VehicleType', 'RegistrationYear', 'make', 'Cylinders',
+                 'cubiccapacity', 'kilowatts', 'bodytype', 'NumberOfDoors', 'AlarmImmobiliser',
+                 'TrackingDevice', 'SumInsured', 'CoverType', 'Gender', 'TransactionMonth', 'TotalClaims']
+# Case names in pipeline order, as returned by _cases
+CASE_NAMES = ('load_data', 'clean_numerical_columns', 'hypothesis_metrics', 'batch_segment_tests', 'prepare_data',
+              'train_linear_regression', 'train_random_forest', 'train_xgboost')
+
+
+def _rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        return None
+
+
+def measure(func, *args, trace_memory=True, **kwargs):
+    """
+    Run func once and measure it.
+
+    Returns:
+        tuple: (result, {'wall_s', 'cpu_s', 'peak_mb', 'rss_mb'})
+    """
+    if trace_memory:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        peak = tracemalloc.get_traced_memory()[1] / 1e6 if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+    return result, {'wall_s': wall, 'cpu_s': cpu, 'peak_mb': peak, 'rss_mb': _rss_mb()}
+
+
+def synthetic_file(n_rows, data_dir=DEFAULT_DATA_DIR, seed=42):
+    """Path of the synthetic file with n_rows rows, generated on first use."""
+    path = os.path.join(data_dir, f'synthetic_{n_rows}_{seed}.txt')
+    if not os.path.exists(path):
+        write_synthetic_file(path, n_rows, seed)
+    return path
+
+
+def _cases(path, max_train_rows, seed):
+    """
+    (name, thunk) pairs in pipeline order; later cases use earlier results
+    through `state`.
+    """
+    from src.data_loader import load_data
+    from src.utils import clean_numerical_columns
+    from src import hypothesis_util, modeling_util
+
+    state = {}
+
+    def load():
+        state['df'] = load_data(path, verbose=False, cache=False)
+        return len(state['df'])
+
+    def clean():
+        state['df'] = clean_numerical_columns(state['df'], ['CapitalOutstanding'])
+        return len(state['df'])
+
+    def metrics():
+        df = state['df']
+        for group_col in ('Province', 'Gender'):
+            hypothesis_util.claim_frequency(df, group_col)
+            hypothesis_util.claim_severity(df, group_col)
+            hypothesis_util.margin(df, group_col)
+        return len(df)
+
+    def segment_tests():
+        hypothesis_util.batch_segment_tests(state['df'], 'Province')
+        return len(state['df'])
+
+    def prepare():
+        df = state['df']
+        claims = df.loc[df['TotalClaims'] > 0, MODEL_COLUMNS]
+        frame = df[MODEL_COLUMNS] if len(claims) < 1000 else claims
+        # Regression on claim rows as in the modeling notebook, on all rows if too few claims
+        state['split'] = modeling_util.prepare_data(frame, 'TotalClaims', drop_cols=MODEL_DROP_COLS)
+        return len(frame)
+
+    def train_subset():
+        X_train, _, y_train, _ = state['split']
+        if max_train_rows and X_train.shape[0] > max_train_rows:
+            rows = np.random.default_rng(seed).choice(X_train.shape[0], max_train_rows, replace=False)
+            return X_train.iloc[rows], y_train.iloc[rows]
+        return X_train, y_train
+
+    def train(func, **kwargs):
+        def run():
+            X_train, y_train = train_subset()
+            func(X_train, y_train, **kwargs)
+            return X_train.shape[0]
+        return run
+
+    return list(zip(CASE_NAMES, [
+        load,
+        clean,
+        metrics,
+        segment_tests,
+        prepare,
+        train(modeling_util.train_linear_regression),
+        train(modeling_util.train_random_forest, n_jobs=-1),
+        train(modeling_util.train_xgboost),
+    ]))
+
+
+def run_benchmarks(rows=DEFAULT_ROWS, data_dir=DEFAULT_DATA_DIR, seed=42, max_train_rows=None,
+                   trace_memory=True, cases=None):
+    """
+    Run every case at every row count.
+
+    Args:
+        rows (iterable): Synthetic file sizes.
+        data_dir (str): Where synthetic files are generated and reused.
+        seed (int): Generator seed.
+        max_train_rows (int, optional): Subsample training rows for the train_* cases.
+        trace_memory (bool): Track peak allocations with tracemalloc (slows
+            Python-heavy code somewhat).
+        cases (list, optional): Only record these case names (see CASE_NAMES).
+
+    Returns:
+        dict: {'meta': {...}, 'results': {rows: {case: measurements}}}
+    """
+    unknown = [name for name in cases or [] if name not in CASE_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark case(s): {', '.join(unknown)}; choose from {', '.join(CASE_NAMES)}")
+    results = {}
+    for n_rows in rows:
+        path = synthetic_file(n_rows, data_dir, seed)
+        results[str(n_rows)] = {}
+        plan = _cases(path, max_train_rows, seed)
+        if cases:
+            # Earlier cases produce the inputs of later ones: run them unrecorded
+            last = max(i for i, (name, _) in enumerate(plan) if name in cases)
+            plan = plan[:last + 1]
+        for name, case in plan:
+            if cases and name not in cases:
+                case()
+                continue
+            processed, stats = measure(case, trace_memory=trace_memory)
+            stats['rows'] = processed
+            results[str(n_rows)][name] = stats
+            logger.info(f"{n_rows:>10} rows  {name:<26} {stats['wall_s']:8.2f}s wall  {stats['cpu_s']:8.2f}s cpu"
+                        + (f"  {stats['peak_mb']:8.1f} MB peak" if stats['peak_mb'] is not None else ""))
+    return {'meta': _metadata(seed, max_train_rows), 'results': results}
+
+
+def _metadata(seed, max_train_rows):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=False).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'run_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'max_train_rows': max_train_rows,
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance=0.25, min_seconds=0.1):
+    """
+    Compare wall times against a baseline report.
+
+    Returns:
+        pd.DataFrame: One row per (rows, case) present in both, with the ratio
+            current / baseline and a regression flag when it exceeds 1 + tolerance
+            and the slowdown is at least min_seconds (sub-second cases are noisy).
+    """
+    records = []
+    for n_rows, cases in report['results'].items():
+        for name, stats in cases.items():
+            base = baseline.get('results', {}).get(n_rows, {}).get(name)
+            if not base:
+                continue
+            ratio = stats['wall_s'] / base['wall_s'] if base['wall_s'] else np.nan
+            records.append({
+                'rows': int(n_rows), 'case': name,
+                'baseline_s': base['wall_s'], 'current_s': stats['wall_s'], 'ratio': ratio,
+                'baseline_peak_mb': base.get('peak_mb'), 'current_peak_mb': stats.get('peak_mb'),
+                'regression': bool(ratio > 1 + tolerance and stats['wall_s'] - base['wall_s'] >= min_seconds),
+            })
+    return pd.DataFrame(records)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on synthetic data.")
+    parser.add_argument('--rows', type=int, nargs='+', default=list(DEFAULT_ROWS))
+    parser.add_argument('--cases', nargs='+', metavar='CASE', help=f"Only run these cases: {', '.join(CASE_NAMES)}")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-train-rows', type=int, default=None,
+                        help="Subsample training rows for the train_* cases")
+    parser.add_argument('--no-trace-memory', action='store_true')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown over baseline before a case counts as a regression")
+    parser.add_argument('--min-seconds', type=float, default=0.1,
+                        help="Ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.cases or [] if name not in CASE_NAMES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)} (choose from {', '.join(CASE_NAMES)})")
+
+    report = run_benchmarks(args.rows, args.data_dir, args.seed, args.max_train_rows,
+                            not args.no_trace_memory, args.cases)
+    with open(args.output, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2)
+    logger.info(f"Wrote benchmark results to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+        logger.info(f"Saved baseline to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        logger.warning(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as fh:
+        comparison = compare_to_baseline(report, json.load(fh), args.tolerance, args.min_seconds)
+    if comparison.empty:
+        logger.warning("No cases in common with the baseline")
+        return 0
+    print(comparison.to_string(index=False, float_format=lambda v: f'{v:.3f}'))
+    regressions = comparison[comparison['regression']]
+    if not regressions.empty:
+        logger.error(f"{len(regressions)} case(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Synthetic MachineLearningRating_v3.txt files for benchmarks and CI, where the
+DVC-tracked data is not available.
+
+Rows follow the real file's 52 columns, formats and missingness: pipe-delimited,
+'%Y-%m-%d %H:%M:%S' transaction months from Feb 2014 to Aug 2015, '%m/%Y'
+vehicle intro dates, comma-decimal CapitalOutstanding, ~900 postal codes nested
+in the 9 provinces with Zipf-like volumes, and mostly-zero, heavy-tailed claims.
+Policy-level attributes (owner, location, vehicle) are drawn once per policy,
+so a policy's rows agree with each other as in the source data.
+
+Usage:
+    python -m test.synthetic_data data/synthetic_1m.txt --rows 1000000
+"""
+import pandas as pd
+import numpy as np
+import os
+import argparse
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+COLUMNS = [
+    'UnderwrittenCoverID', 'PolicyID', 'TransactionMonth', 'IsVATRegistered', 'Citizenship', 'LegalType',
+    'Title', 'Language', 'Bank', 'AccountType', 'MaritalStatus', 'Gender', 'Country', 'Province',
+    'PostalCode', 'MainCrestaZone', 'SubCrestaZone', 'ItemType', 'mmcode', 'VehicleType',
+    'RegistrationYear', 'make', 'Model', 'Cylinders', 'cubiccapacity', 'kilowatts', 'bodytype',
+    'NumberOfDoors', 'VehicleIntroDate', 'CustomValueEstimate', 'AlarmImmobiliser', 'TrackingDevice',
+    'CapitalOutstanding', 'NewVehicle', 'WrittenOff', 'Rebuilt', 'Converted', 'CrossBorder',
+    'NumberOfVehiclesInFleet', 'SumInsured', 'TermFrequency', 'CalculatedPremiumPerTerm',
+    'ExcessSelected', 'CoverCategory', 'CoverType', 'CoverGroup', 'Section', 'Product', 'StatutoryClass',
+    'StatutoryRiskType', 'TotalPremium', 'TotalClaims',
+]
+
+# Share of the 1,000,098 source rows per province
+PROVINCES = {
+    'Gauteng': 0.393, 'Western Cape': 0.171, 'KwaZulu-Natal': 0.170, 'North West': 0.143,
+    'Mpumalanga': 0.052, 'Eastern Cape': 0.031, 'Limpopo': 0.025, 'Free State': 0.008,
+    'Northern Cape': 0.007,
+}
+MAKES = ['TOYOTA', 'MERCEDES-BENZ', 'VOLKSWAGEN', 'NISSAN/DATSUN', 'FORD', 'ISUZU', 'HYUNDAI', 'AUDI',
+         'BMW', 'MAHINDRA', 'CHEVROLET', 'RENAULT', 'HONDA', 'MAZDA', 'KIA', 'IVECO', 'FIAT', 'SUZUKI']
+VEHICLE_TYPES = ['Passenger Vehicle', 'Medium Commercial', 'Heavy Commercial', 'Light Commercial', 'Bus']
+BODY_TYPES = ['B/S', 'S/D', 'H/B', 'D/S', 'C/C', 'S/C', 'P/V', 'MPV', 'STATION WAGON']
+# (CoverCategory, CoverType, CoverGroup, Section, share, mean premium)
+COVERS = [
+    ('Own damage', 'Own Damage', 'Comprehensive - Taxi', 'Motor Comprehensive', 0.10, 350.0),
+    ('Windscreen', 'Windscreen', 'Comprehensive - Taxi', 'Motor Comprehensive', 0.21, 8.0),
+    ('Third Party', 'Third Party', 'Comprehensive - Taxi', 'Motor Comprehensive', 0.08, 40.0),
+    ('Passenger Liability', 'Passenger Liability', 'Comprehensive - Taxi', 'Motor Comprehensive', 0.04, 30.0),
+    ('Signage and Vehicle Wraps', 'Signage and Vehicle Wraps', 'Comprehensive - Taxi',
+     'Optional Extended Covers', 0.18, 2.0),
+    ('Keys and Alarms', 'Keys and Alarms', 'Comprehensive - Taxi', 'Optional Extended Covers', 0.10, 1.5),
+    ('Cash Takeover', 'Cash Takeover', 'Comprehensive - Taxi', 'Optional Extended Covers', 0.10, 2.5),
+    ('Emergency Charges', 'Emergency Charges', 'Comprehensive - Taxi', 'Optional Extended Covers', 0.10, 1.5),
+    ('Basic Excess Waiver', 'Basic Excess Waiver', 'Comprehensive - Taxi', 'Optional Extended Covers', 0.05, 15.0),
+    ('Income Protector', 'Income Protector', 'Income Protector', 'Optional Extended Covers', 0.02, 10.0),
+    ('Accidental Death', 'Accidental Death', 'Comprehensive - Taxi', 'Optional Extended Covers', 0.02, 5.0),
+]
+EXCESS_OPTIONS = ['Mobility - Windscreen', 'No excess', 'Mobility - Metered Taxis - R2000',
+                  'Mobility - Taxi with value more than R100 000', 'Mobility - Metered Taxis - R5000']
+
+
+def _choice(rng, values, size, p=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=p)]
+
+
+def _with_missing(rng, values, rate):
+    values = values.astype(object) if values.dtype != object else values
+    values[rng.random(len(values)) < rate] = None
+    return values
+
+
+def _catalogs(seed):
+    """Postal codes and vehicle models, shared by every chunk of a file."""
+    rng = np.random.default_rng(seed)
+    names = list(PROVINCES)
+    n_codes = 888
+    postal = pd.DataFrame({
+        'PostalCode': np.sort(rng.choice(np.arange(1, 9871), n_codes, replace=False)),
+        'Province': _choice(rng, names, n_codes, p=np.array(list(PROVINCES.values())) / sum(PROVINCES.values())),
+    })
+    postal['MainCrestaZone'] = postal['Province'] + ' ' + (postal['PostalCode'] // 1000 + 1).astype(str)
+    postal['SubCrestaZone'] = postal['Province'] + ' ' + (postal['PostalCode'] // 250).astype(str)
+    weights = 1.0 / np.arange(1, n_codes + 1) ** 1.1
+    postal['weight'] = rng.permutation(weights / weights.sum())
+    postal['risk'] = rng.gamma(4.0, 0.25, n_codes)
+
+    n_models = 410
+    makes = _choice(rng, MAKES, n_models, p=np.r_[0.6, np.full(len(MAKES) - 1, 0.4 / (len(MAKES) - 1))])
+    intro_year = rng.integers(1985, 2015, n_models)
+    models = pd.DataFrame({
+        'make': makes,
+        'Model': [f'{make.split("/")[0]} MODEL {i:03d}' for i, make in enumerate(makes)],
+        'mmcode': rng.choice([4041200, 44069150, 60056925, 60058418, 64056010], n_models).astype(float)
+        + rng.integers(0, 2000, n_models),
+        'VehicleType': _choice(rng, VEHICLE_TYPES, n_models, p=[0.94, 0.04, 0.01, 0.008, 0.002]),
+        'Cylinders': rng.choice([4.0, 6.0, 8.0, 0.0, 10.0], n_models, p=[0.95, 0.03, 0.01, 0.005, 0.005]),
+        'cubiccapacity': rng.choice([2694.0, 2237.0, 2494.0, 1598.0, 4200.0], n_models),
+        'kilowatts': rng.choice([111.0, 75.0, 80.0, 130.0, 309.0], n_models),
+        'bodytype': _choice(rng, BODY_TYPES, n_models),
+        'NumberOfDoors': rng.choice([4.0, 2.0, 5.0, 3.0, 0.0], n_models, p=[0.94, 0.03, 0.02, 0.005, 0.005]),
+        'VehicleIntroDate': [f'{month}/{year}' for month, year in zip(rng.integers(1, 13, n_models), intro_year)],
+        'intro_year': intro_year,
+    })
+    models['weight'] = np.where(models['make'] == 'TOYOTA', 5.0, 1.0) * rng.pareto(1.5, n_models)
+    models['weight'] /= models['weight'].sum()
+    return postal, models
+
+
+def generate_policies(n_rows, seed=42, start_row=0, catalogs=None):
+    """
+    Generate n_rows synthetic rows as the raw strings and numbers of the source file.
+
+    Args:
+        n_rows (int): Rows to generate.
+        seed (int): Seed; files generated with the same seed and row count are identical.
+        start_row (int): Offset of the first row, for generating a file in chunks.
+        catalogs (tuple, optional): Postal code and model catalogs from _catalogs(seed).
+
+    Returns:
+        pd.DataFrame: Frame with COLUMNS, ready for to_csv(sep='|').
+    """
+    postal, models = catalogs or _catalogs(seed)
+    rng = np.random.default_rng([seed, start_row])
+    # ~23k policies with ~43 rows each in the source; ids grow with the file
+    policy = (start_row + np.arange(n_rows)) // 43 + 14
+    n_policies = policy[-1] - policy[0] + 1
+    first = policy - policy[0]
+
+    owner_rng = np.random.default_rng([seed, 1, int(policy[0])])
+    place = owner_rng.choice(len(postal), n_policies, p=postal['weight'].to_numpy())[first]
+    model = owner_rng.choice(len(models), n_policies, p=models['weight'].to_numpy())[first]
+    legal = _choice(owner_rng, ['Individual', 'Close Corporation', 'Private company', 'Partnership',
+                                'Public company', 'Trust'], n_policies,
+                    p=[0.90, 0.07, 0.015, 0.006, 0.005, 0.004])[first]
+    gender = _choice(owner_rng, ['Not specified', 'Male', 'Female'], n_policies, p=[0.94, 0.05, 0.01])[first]
+    marital = _choice(owner_rng, ['Not specified', 'Single', 'Married'], n_policies, p=[0.99, 0.007, 0.003])[first]
+    bank = _choice(owner_rng, ['First National Bank', 'Standard Bank', 'ABSA Bank', 'Nedbank', 'Capitec Bank',
+                               'African Bank'], n_policies, p=[0.36, 0.25, 0.19, 0.12, 0.05, 0.03])[first]
+    account = _choice(owner_rng, ['Current account', 'Savings account', 'Transmission account'], n_policies,
+                      p=[0.6, 0.38, 0.02])[first]
+    registration = np.minimum(models['intro_year'].to_numpy()[model]
+                              + owner_rng.integers(0, 8, n_policies)[first], 2015)
+    vat = owner_rng.random(n_policies)[first] < 0.0065
+
+    cover = rng.choice(len(COVERS), n_rows, p=[c[4] for c in COVERS])
+    cover_mean = np.array([c[5] for c in COVERS])[cover]
+    locations = postal.iloc[place]
+    vehicles = models.iloc[model]
+    months = pd.date_range('2014-02-01', '2015-08-01', freq='MS').strftime('%Y-%m-%d %H:%M:%S')
+    month_weights = np.linspace(0.3, 1.0, len(months))
+
+    # Premiums: a third of rows unbilled, a few refunds, log-normal otherwise
+    premium = cover_mean * rng.lognormal(-0.5, 1.0, n_rows)
+    premium[rng.random(n_rows) < 0.33] = 0.0
+    refunds = rng.random(n_rows) < 0.001
+    premium[refunds] = -premium[refunds]
+    # Claims: ~0.3% of rows, log-normal/Pareto tail, scaled by postal-code risk
+    risk = locations['risk'].to_numpy()
+    has_claim = rng.random(n_rows) < 0.0028 * risk
+    claims = np.zeros(n_rows)
+    claims[has_claim] = rng.lognormal(9.0, 1.3, has_claim.sum()) * (1 + rng.pareto(2.5, has_claim.sum()))
+    recovered = has_claim & (rng.random(n_rows) < 0.01)
+    claims[recovered] = -claims[recovered] * 0.1
+
+    sum_insured = rng.choice([0.01, 5000.0, 7500.0, 250000.0, 500000.0], n_rows, p=[0.1, 0.3, 0.25, 0.2, 0.15])
+    sum_insured = np.where(sum_insured >= 250000, sum_insured * rng.lognormal(0, 0.6, n_rows), sum_insured)
+    capital = np.round(rng.lognormal(11.5, 1.0, n_rows), 2)
+    capital_text = np.where(rng.random(n_rows) < 0.5, np.char.replace(capital.astype(str), '.', ','),
+                            np.round(capital).astype(np.int64).astype(str)).astype(object)
+    capital_text[rng.random(n_rows) < 2e-6] = None
+    custom_value = np.round(rng.lognormal(12.2, 0.6, n_rows), -3)
+
+    df = pd.DataFrame({
+        'UnderwrittenCoverID': policy * 13 + cover,
+        'PolicyID': policy,
+        'TransactionMonth': _choice(rng, months, n_rows, p=month_weights / month_weights.sum()),
+        'IsVATRegistered': vat,
+        'Citizenship': _choice(rng, ['  ', 'ZA', 'AF'], n_rows, p=[0.89, 0.105, 0.005]),
+        'LegalType': legal,
+        'Title': np.where(gender == 'Female', 'Mrs', np.where(rng.random(n_rows) < 0.98, 'Mr', 'Dr')),
+        'Language': 'English',
+        'Bank': _with_missing(rng, bank, 0.146),
+        'AccountType': _with_missing(rng, account, 0.040),
+        'MaritalStatus': _with_missing(rng, marital, 0.008),
+        'Gender': _with_missing(rng, gender, 0.0095),
+        'Country': 'South Africa',
+        'Province': locations['Province'].to_numpy(),
+        'PostalCode': locations['PostalCode'].to_numpy(),
+        'MainCrestaZone': locations['MainCrestaZone'].to_numpy(),
+        'SubCrestaZone': locations['SubCrestaZone'].to_numpy(),
+        'ItemType': 'Mobility - Motor',
+        **{col: vehicles[col].to_numpy() for col in ['mmcode', 'VehicleType']},
+        'RegistrationYear': registration,
+        **{col: vehicles[col].to_numpy() for col in ['make', 'Model', 'Cylinders', 'cubiccapacity',
+                                                    'kilowatts', 'bodytype', 'NumberOfDoors',
+                                                    'VehicleIntroDate']},
+        'CustomValueEstimate': np.where(rng.random(n_rows) < 0.78, np.nan, custom_value),
+        'AlarmImmobiliser': np.where(rng.random(n_rows) < 0.9, 'Yes', 'No'),
+        'TrackingDevice': np.where(rng.random(n_rows) < 0.7, 'No', 'Yes'),
+        'CapitalOutstanding': capital_text,
+        'NewVehicle': _with_missing(rng, _choice(rng, ['More than 6 months', 'Less than 6 months'], n_rows,
+                                                 p=[0.99, 0.01]), 0.153),
+        'WrittenOff': _with_missing(rng, np.where(rng.random(n_rows) < 0.99, 'No', 'Yes'), 0.642),
+        'Rebuilt': _with_missing(rng, np.where(rng.random(n_rows) < 0.995, 'No', 'Yes'), 0.642),
+        'Converted': _with_missing(rng, np.where(rng.random(n_rows) < 0.995, 'No', 'Yes'), 0.642),
+        'CrossBorder': _with_missing(rng, np.full(n_rows, 'No', dtype=object), 0.9993),
+        'NumberOfVehiclesInFleet': np.nan,
+        'SumInsured': np.round(sum_insured, 2),
+        'TermFrequency': np.where(rng.random(n_rows) < 0.99, 'Monthly', 'Annual'),
+        'CalculatedPremiumPerTerm': np.round(np.abs(premium) * rng.uniform(1.0, 1.6, n_rows), 4),
+        'ExcessSelected': _choice(rng, EXCESS_OPTIONS, n_rows, p=[0.52, 0.3, 0.12, 0.04, 0.02]),
+        'CoverCategory': np.array([c[0] for c in COVERS], dtype=object)[cover],
+        'CoverType': np.array([c[1] for c in COVERS], dtype=object)[cover],
+        'CoverGroup': np.array([c[2] for c in COVERS], dtype=object)[cover],
+        'Section': np.array([c[3] for c in COVERS], dtype=object)[cover],
+        'Product': np.where(rng.random(n_rows) < 0.7, 'Mobility Metered Taxis: Monthly',
+                            'Mobility Commercial Cover: Monthly'),
+        'StatutoryClass': 'Commercial',
+        'StatutoryRiskType': 'IFRS Constant',
+        'TotalPremium': premium,
+        'TotalClaims': claims,
+    }, columns=COLUMNS)
+    # ~0.06% of rows have no vehicle record
+    no_vehicle = rng.random(n_rows) < 0.00055
+    for col in ['mmcode', 'VehicleType', 'make', 'Model', 'Cylinders', 'cubiccapacity', 'kilowatts',
+                'bodytype', 'NumberOfDoors', 'VehicleIntroDate']:
+        df.loc[no_vehicle, col] = None if df[col].dtype == object else np.nan
+    return df
+
+
+def write_synthetic_file(path, n_rows, seed=42, chunksize=250_000):
+    """
+    Write a pipe-delimited synthetic data file of n_rows rows chunk by chunk, so
+    10M-row files are generated in bounded memory.
+
+    Returns:
+        str: path
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    catalogs = _catalogs(seed)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as fh:
+        for start in range(0, n_rows, chunksize):
+            chunk = generate_policies(min(chunksize, n_rows - start), seed, start, catalogs)
+            chunk.to_csv(fh, sep='|', index=False, header=start == 0)
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote {n_rows} synthetic rows to {path} ({os.path.getsize(path) / 1e6:.0f} MB)")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic MachineLearningRating file.")
+    parser.add_argument('path', help="Output .txt file")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+    write_synthetic_file(args.path, args.rows, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.cleaning import REPORT_COLUMNS, clean_columns, parse_decimal
+
+
+def _raw():
+    return pd.DataFrame({
+        'CapitalOutstanding': ['1,5', '200', ' 3,25 ', None, 'n/a', '1,5', 'n/a'],
+        'TotalPremium': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0],
+        'TransactionMonth': ['2015-03-01 00:00:00', '2015-04-01 00:00:00', 'garbage', None,
+                             '2015-03-01 00:00:00', '2015-05-01 00:00:00', '2015-06-01 00:00:00'],
+        'VehicleIntroDate': ['6/2002', '12/2010', '6/2002', '13/2010', None, '1/1999', '6/2002'],
+    })
+
+
+@pytest.mark.parametrize('n_jobs, backend', [(1, 'thread'), (2, 'thread'), (2, 'process')])
+def test_comma_decimals_and_fixed_format_dates(n_jobs, backend):
+    out, report = clean_columns(_raw(), numeric_cols=['CapitalOutstanding', 'TotalPremium'],
+                                date_cols=['TransactionMonth', 'VehicleIntroDate'],
+                                n_jobs=n_jobs, backend=backend, inplace=False)
+    np.testing.assert_array_equal(out['CapitalOutstanding'], [1.5, 200.0, 3.25, np.nan, np.nan, 1.5, np.nan])
+    assert out['TotalPremium'].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+    assert pd.api.types.is_datetime64_any_dtype(out['TransactionMonth'])
+    assert out['TransactionMonth'].iloc[0] == pd.Timestamp('2015-03-01')
+    assert out['TransactionMonth'].iloc[2:4].isna().all()
+    assert out['VehicleIntroDate'].iloc[1] == pd.Timestamp('2010-12-01')
+    assert out['VehicleIntroDate'].iloc[3:5].isna().all()
+    # TotalPremium is already numeric and is not parsed
+    assert list(report.columns) == REPORT_COLUMNS
+    assert report['column'].tolist() == ['CapitalOutstanding', 'TransactionMonth', 'VehicleIntroDate']
+
+
+def test_parse_failure_report_counts_and_examples():
+    _, report = clean_columns(_raw(), numeric_cols=['CapitalOutstanding'],
+                              date_cols=['TransactionMonth', 'VehicleIntroDate'], n_jobs=1, inplace=False)
+    report = report.set_index('column')
+    assert report.loc['CapitalOutstanding', ['kind', 'rows', 'converted', 'failed']].tolist() == ['numeric', 7, 4, 2]
+    assert report.loc['CapitalOutstanding', 'examples'] == ['n/a']
+    assert report.loc['TransactionMonth', ['kind', 'converted', 'failed']].tolist() == ['date', 5, 1]
+    assert report.loc['TransactionMonth', 'examples'] == ['garbage']
+    assert report.loc['VehicleIntroDate', ['converted', 'failed']].tolist() == [5, 1]
+    assert report.loc['VehicleIntroDate', 'examples'] == ['13/2010']
+
+
+def test_inplace_and_categorical_input():
+    df = _raw()
+    df['CapitalOutstanding'] = df['CapitalOutstanding'].astype('category')
+    out, _ = clean_columns(df, numeric_cols=['CapitalOutstanding'], n_jobs=1)
+    assert out is df
+    assert df['CapitalOutstanding'].dtype == np.float64
+    values, report = parse_decimal(pd.Series(['2,5', '2,5'], name='x'))
+    assert values.tolist() == [2.5, 2.5] and report['failed'] == 0
+
+
+def test_unmatched_format_falls_back_to_inference():
+    df = pd.DataFrame({'Start': ['2015-03-01', '2016-01-31']})
+    out, report = clean_columns(df, date_cols={'Start': '%d/%m/%Y'}, n_jobs=1, inplace=False)
+    assert out['Start'].tolist() == [pd.Timestamp('2015-03-01'), pd.Timestamp('2016-01-31')]
+    assert report.loc[0, 'failed'] == 0
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import gaussian_kde
+from src.column_stats import NumericSketch, summarize_columns
+
+
+def _chunks(values, size):
+    return [pd.DataFrame({'x': values[i:i + size]}) for i in range(0, len(values), size)]
+
+
+@pytest.mark.parametrize('values', [
+    np.random.default_rng(0).normal(size=2),
+    np.random.default_rng(1).normal(size=5),
+    np.random.default_rng(2).normal(size=10),
+    np.array([0, 0, 0, 1000.]),
+])
+def test_summary_of_small_or_concentrated_columns(values):
+    summary = summarize_columns(pd.DataFrame({'x': values}), ['x'], [])['x']
+    histogram = summary['histogram']
+    assert summary['count'] == len(values)
+    assert len(histogram['kde_x']) == len(histogram['kde'])
+    assert np.all(np.isfinite(histogram['kde'])) and np.all(histogram['kde'] >= 0)
+
+
+def test_moments_histogram_and_quantiles_match_numpy_across_chunks():
+    values = np.random.default_rng(3).lognormal(3, 1, size=50_000)
+    values[::7] = 0.0
+    summary = summarize_columns(_chunks(values, 6_000), ['x'], [])['x']
+    assert summary['mean'] == pytest.approx(values.mean(), rel=1e-9)
+    assert summary['std'] == pytest.approx(values.std(ddof=1), rel=1e-6)
+    assert (summary['min'], summary['max']) == (values.min(), values.max())
+
+    counts, edges = summary['histogram']['counts'], summary['histogram']['edges']
+    expected, _ = np.histogram(values, bins=edges)
+    # Fine-bin interpolation may move a value across a display bin edge
+    assert counts.sum() == len(values)
+    assert np.abs(counts - expected).max() <= 0.01 * len(values)
+
+    sketch = NumericSketch()
+    for chunk in _chunks(values, 6_000):
+        sketch.update(chunk['x'].to_numpy())
+    qs = [0.1, 0.5, 0.9, 0.99]
+    np.testing.assert_allclose(sketch.quantiles(qs), np.quantile(values, qs), atol=2 * sketch.width)
+
+
+def test_kde_matches_scipy():
+    values = np.random.default_rng(4).normal(10, 2, size=20_000)
+    sketch = NumericSketch()
+    sketch.update(values)
+    x, density = sketch.kde()
+    reference = gaussian_kde(values)(x)
+    assert np.abs(density - reference).max() < 0.01 * reference.max()
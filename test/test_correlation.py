@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.correlation import CorrelationAccumulator, streaming_corr
+
+
+@pytest.fixture(scope='module')
+def frame():
+    rng = np.random.default_rng(5)
+    n = 20_000
+    premium = rng.gamma(3.0, 400, n)
+    df = pd.DataFrame({
+        'TotalPremium': premium,
+        'TotalClaims': np.where(rng.random(n) < 0.1, premium * rng.gamma(2.0, 5, n), 0.0),
+        # Large offset: naive sum-of-squares formulas lose every significant digit here
+        'SumInsured': 1e9 + premium * 3 + rng.normal(0, 50, n),
+    })
+    df.loc[rng.random(n) < 0.2, 'TotalClaims'] = np.nan
+    df.loc[rng.random(n) < 0.1, 'SumInsured'] = np.nan
+    return df
+
+
+def test_chunked_pearson_matches_pandas(frame):
+    result = streaming_corr(frame, list(frame.columns), chunksize=3_001)
+    pd.testing.assert_frame_equal(result, frame.corr(), rtol=1e-9, atol=1e-12)
+
+
+def test_merged_accumulators_match_one_pass(frame):
+    columns = list(frame.columns)
+    left, right = CorrelationAccumulator(columns), CorrelationAccumulator(columns)
+    left.update(frame.iloc[:7_000])
+    right.update(frame.iloc[7_000:])
+    single = CorrelationAccumulator(columns).update(frame)
+    np.testing.assert_allclose(left.merge(right).covariance(), single.covariance(), rtol=1e-9)
+    pd.testing.assert_frame_equal(single.covariance(), frame.cov(), rtol=1e-9)
+
+
+def test_spearman_is_close_to_exact_ranks(frame):
+    result = streaming_corr(frame, list(frame.columns), method='spearman', chunksize=5_000)
+    np.testing.assert_allclose(result, frame.corr(method='spearman'), atol=0.02)
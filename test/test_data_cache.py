@@ -0,0 +1,82 @@
+import os
+import pandas as pd
+import pytest
+from src.data_cache import cache_path, dvc_md5, read_cache, source_fingerprint, write_cache
+from src.data_loader import DTYPES, load_data
+from test.synthetic_data import write_synthetic_file
+
+pytest.importorskip('pyarrow')
+
+MD5_A = '0123456789abcdef0123456789abcdef'
+MD5_B = 'fedcba9876543210fedcba9876543210'
+OPTIONS = {'dtypes': DTYPES}
+
+
+def _write_pointer(file_path, md5):
+    with open(f"{file_path}.dvc", 'w', encoding='utf-8') as fh:
+        fh.write(f"outs:\n- md5: {md5}\n  size: 123\n  path: {os.path.basename(file_path)}\n")
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'MachineLearningRating_v3.txt')
+    write_synthetic_file(path, 500, seed=3)
+    return path
+
+
+def test_dvc_md5_change_invalidates_the_cache(source):
+    _write_pointer(source, MD5_A)
+    assert dvc_md5(source) == MD5_A == source_fingerprint(source)
+    first = cache_path(source, OPTIONS)
+    write_cache(pd.DataFrame({'a': [1, 2]}), first)
+    assert read_cache(first) is not None
+
+    _write_pointer(source, MD5_B)
+    second = cache_path(source, OPTIONS)
+    assert second != first
+    assert read_cache(second) is None
+    assert cache_path(source, {'dtypes': {**DTYPES, 'PolicyID': 'int64'}}) != second
+
+
+def test_write_cache_removes_stale_caches_of_the_same_source(source, tmp_path):
+    _write_pointer(source, MD5_A)
+    stale = cache_path(source, OPTIONS)
+    other_options = cache_path(source, {'dtypes': {}})
+    write_cache(pd.DataFrame({'a': [1]}), stale)
+    write_cache(pd.DataFrame({'a': [1]}), other_options)
+    unrelated = str(tmp_path / '.cache' / 'other.txt-0123456789ab-00000000.parquet')
+    write_cache(pd.DataFrame({'a': [1]}), unrelated)
+
+    _write_pointer(source, MD5_B)
+    fresh = cache_path(source, OPTIONS)
+    write_cache(pd.DataFrame({'a': [2]}), fresh)
+    assert os.path.exists(fresh) and os.path.exists(unrelated)
+    assert not os.path.exists(stale) and not os.path.exists(other_options)
+    assert not any(name.endswith('.tmp') for name in os.listdir(os.path.dirname(fresh)))
+
+
+def test_unreadable_cache_is_a_miss(tmp_path):
+    path = str(tmp_path / 'broken.parquet')
+    with open(path, 'wb') as fh:
+        fh.write(b'not parquet')
+    assert read_cache(path) is None
+
+
+def test_read_cache_round_trips_the_declared_dtypes(source, tmp_path):
+    _write_pointer(source, MD5_A)
+    cache_dir = str(tmp_path / 'cache')
+    parsed = load_data(source, verbose=False, cache_dir=cache_dir)
+    path = cache_path(source, OPTIONS, cache_dir)
+    assert os.path.exists(path)
+
+    cached = read_cache(path, dtypes=DTYPES)
+    pd.testing.assert_frame_equal(cached, parsed)
+    assert cached['CapitalOutstanding'].dtype == object
+    for col, dtype in DTYPES.items():
+        if col in cached.columns:
+            assert cached[col].dtype == pd.api.types.pandas_dtype(dtype) or \
+                (dtype == 'category' and isinstance(cached[col].dtype, pd.CategoricalDtype)), col
+
+    projected = load_data(source, columns=['Province', 'TotalPremium'], verbose=False, cache_dir=cache_dir)
+    assert list(projected.columns) == ['Province', 'TotalPremium']
+    assert isinstance(projected['Province'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.encoding import CategoricalEncoder
+
+
+@pytest.fixture(scope='module')
+def train():
+    rng = np.random.default_rng(8)
+    n = 2_000
+    return pd.DataFrame({
+        'SumInsured': rng.gamma(2.0, 1e5, n),
+        'CoverType': rng.choice(['Own Damage', 'Windscreen', 'Theft', 'Tiny'], n, p=[0.5, 0.3, 0.198, 0.002]),
+        'PostalCode': rng.integers(0, 300, n).astype(str),
+        'TotalClaims': rng.gamma(2.0, 100, n),
+    })
+
+
+def test_frozen_vocabulary_and_rare_bucket(train):
+    encoder = CategoricalEncoder(max_onehot_levels=10, min_frequency=10).fit(train.drop(columns='TotalClaims'))
+    assert list(encoder.onehot_['CoverType']) == ['Own Damage', 'Windscreen', 'Theft']
+    batch = pd.DataFrame({'SumInsured': [1.0, np.nan, 3.0], 'CoverType': ['Theft', 'Tiny', 'Never seen'],
+                          'PostalCode': ['5', '299', 'nowhere']})
+    encoded = encoder.transform(batch, sparse=False)
+    assert list(encoded.columns) == encoder.feature_names_
+    onehot = encoded[[name for name in encoded.columns if name.startswith('CoverType_')]]
+    assert onehot.sum(axis=1).tolist() == [1.0, 1.0, 1.0]
+    assert onehot['CoverType_Theft'].tolist() == [1.0, 0.0, 0.0]
+    assert onehot['CoverType___rare__'].tolist() == [0.0, 1.0, 1.0]
+    assert encoded['SumInsured'].tolist() == [1.0, 0.0, 3.0]
+    # Frequency encoding: training share, 0 for unseen levels
+    share = (train['PostalCode'] == '5').mean()
+    assert encoded['PostalCode'].iloc[0] == pytest.approx(share) and encoded['PostalCode'].iloc[2] == 0.0
+
+
+def test_sparse_and_dense_output_agree(train):
+    encoder = CategoricalEncoder(max_onehot_levels=10).fit(train.drop(columns='TotalClaims'))
+    X = train.drop(columns='TotalClaims').iloc[:300]
+    sparse, dense = encoder.transform(X, sparse=True), encoder.transform(X, sparse=False)
+    assert sparse.shape == dense.shape
+    np.testing.assert_array_equal(sparse.toarray(), dense.to_numpy())
+
+
+def test_target_encoding_is_out_of_fold_on_training_rows(train):
+    X, y = train.drop(columns='TotalClaims'), train['TotalClaims']
+    encoder = CategoricalEncoder(max_onehot_levels=10, high_cardinality='target', smoothing=5.0, n_folds=4)
+    encoded = encoder.fit_transform(X, y, sparse=False)['PostalCode'].to_numpy()
+
+    fold = np.random.default_rng(encoder.random_state).permutation(len(X)) % 4
+    levels, target = X['PostalCode'].to_numpy(), y.to_numpy()
+    expected = np.empty(len(X))
+    for i in range(len(X)):
+        other = fold != fold[i]
+        same = other & (levels == levels[i])
+        prior = target[other].mean()
+        expected[i] = (target[same].sum() + 5.0 * prior) / (same.sum() + 5.0)
+    np.testing.assert_allclose(encoded, expected, rtol=1e-5)
+
+    # New rows use the means of the full training set
+    full = (y.groupby(X['PostalCode']).sum() + 5.0 * y.mean()) / (y.groupby(X['PostalCode']).count() + 5.0)
+    np.testing.assert_allclose(encoder.transform(X.iloc[:5], sparse=False)['PostalCode'],
+                               full[X['PostalCode'].iloc[:5]].to_numpy(), rtol=1e-5)
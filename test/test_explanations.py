@@ -0,0 +1,58 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.explanations import ShapExplanationService, stratified_sample
+
+pytest.importorskip('shap')
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    from sklearn.ensemble import RandomForestRegressor
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'a': rng.normal(size=3_000), 'b': rng.integers(0, 5, 3_000)})
+    y = 2 * X['a'] + X['b'] + rng.normal(scale=0.1, size=len(X))
+    model = RandomForestRegressor(n_estimators=5, max_depth=4, random_state=0).fit(X.astype('float32'), y)
+    return model, X, y
+
+
+def test_only_sampled_rows_are_coerced(fitted, tmp_path):
+    model, X, y = fitted
+    service = ShapExplanationService(model, X, y, sample_size=300, background_size=50, cache_dir=str(tmp_path))
+    assert (service.sample.dtypes == np.float32).all()
+    assert service.sample.index.equals(stratified_sample(X, y, 300).index)
+    assert len(service.background) == 50
+
+
+def test_values_add_up_and_scoring_batches_are_not_cached(fitted, tmp_path):
+    model, X, y = fitted
+    service = ShapExplanationService(model, X, y, sample_size=300, cache_dir=str(tmp_path))
+    values = service.shap_values()
+    base = service._explainer.expected_value
+    np.testing.assert_allclose(values.sum(axis=1) + base, model.predict(service.sample), rtol=1e-4, atol=1e-4)
+    assert len(os.listdir(tmp_path)) == 1
+    pd.testing.assert_frame_equal(service.shap_values(), values)
+
+    top = service.explain_policies(X.head(4), top_n=1)
+    assert len(top) == 4 and set(top['feature']) <= {'a', 'b'}
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_stratified_sample_never_exceeds_n_and_keeps_every_stratum():
+    from src.explanations import _allocate
+    # Ten rare classes: np.round(share * n) with a floor of one used to give n + 10 rows
+    y = np.r_[np.zeros(9_990), np.arange(1, 11)]
+    X = pd.DataFrame({'a': np.arange(len(y))})
+    sample = stratified_sample(X, y, n=100, n_strata=11)
+    assert len(sample) == 100 and sample.index.is_unique
+    assert set(y[sample.index]) == set(range(11))
+
+    for counts, n in [([50, 30, 20], 10), ([95, 3, 2], 50), ([5, 5, 5, 5], 3), ([40, 1, 1], 41)]:
+        sizes = _allocate(np.array(counts), n)
+        assert sizes.sum() == n and (sizes <= counts).all()
+        assert (sizes >= 1).all() or n < len(counts)
+    np.testing.assert_array_equal(_allocate(np.array([50, 30, 20]), 10), [5, 3, 2])
+    np.testing.assert_array_equal(_allocate(np.array([95, 3, 2]), 50), [46, 2, 2])
+    # Small strata fill up and the clipped rows go to the large one
+    np.testing.assert_array_equal(_allocate(np.array([95, 3, 2]), 99), [94, 3, 2])
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency, ttest_ind
+from src.hypothesis_util import batch_segment_tests
+
+
+@pytest.fixture(scope='module')
+def policies():
+    rng = np.random.default_rng(11)
+    n = 6_000
+    province = rng.choice(['Gauteng', 'Limpopo', 'Western Cape'], n, p=[0.5, 0.3, 0.2])
+    has_claim = rng.random(n) < np.where(province == 'Gauteng', 0.12, 0.08)
+    claims = np.where(has_claim, rng.gamma(2.0, 5_000, n), 0.0)
+    return pd.DataFrame({'Province': province, 'TotalPremium': rng.gamma(3.0, 400, n), 'TotalClaims': claims})
+
+
+def _row(results, metric, test, a, b):
+    match = results[(results['metric'] == metric) & (results['test'] == test)
+                    & (results['group_a'] == a) & (results['group_b'] == b)]
+    assert len(match) == 1
+    return match.iloc[0]
+
+
+def test_pairwise_tests_match_scipy(policies):
+    results = batch_segment_tests(policies, 'Province', p_adjust=None)
+    a, b = policies[policies['Province'] == 'Gauteng'], policies[policies['Province'] == 'Limpopo']
+
+    margin = _row(results, 'margin', 'welch_t', 'Gauteng', 'Limpopo')
+    ref = ttest_ind(a['TotalPremium'] - a['TotalClaims'], b['TotalPremium'] - b['TotalClaims'], equal_var=False)
+    assert margin['statistic'] == pytest.approx(ref.statistic, rel=1e-9)
+    assert margin['p_value'] == pytest.approx(ref.pvalue, rel=1e-6)
+
+    severity = _row(results, 'claim_severity', 'welch_t', 'Gauteng', 'Limpopo')
+    ref = ttest_ind(a.loc[a['TotalClaims'] > 0, 'TotalClaims'], b.loc[b['TotalClaims'] > 0, 'TotalClaims'],
+                    equal_var=False)
+    assert severity['statistic'] == pytest.approx(ref.statistic, rel=1e-9)
+
+    frequency = _row(results, 'claim_frequency', 'chi2', 'Gauteng', 'Limpopo')
+    pair = pd.concat([a, b])
+    chi2, p_value, _, _ = chi2_contingency(pd.crosstab(pair['Province'], pair['TotalClaims'] > 0), correction=False)
+    assert frequency['statistic'] == pytest.approx(chi2, rel=1e-9)
+    assert frequency['p_value'] == pytest.approx(p_value, rel=1e-6)
+
+
+def test_one_vs_rest_matches_scipy(policies):
+    results = batch_segment_tests(policies, 'Province', mode='one_vs_rest', p_adjust=None)
+    inside = policies['Province'] == 'Limpopo'
+    margin = policies['TotalPremium'] - policies['TotalClaims']
+    ref = ttest_ind(margin[inside], margin[~inside], equal_var=False)
+    assert _row(results, 'margin', 'welch_t', 'Limpopo', 'rest')['statistic'] == pytest.approx(ref.statistic, rel=1e-9)
+
+
+def test_group_labels_share_one_type():
+    df = pd.DataFrame({'Code': [1, 1, 2, 2, 3, 3], 'TotalPremium': [5.0, 6, 7, 8, 9, 10],
+                       'TotalClaims': [0.0, 1, 0, 2, 0, 3]})
+    for mode in ('pairwise', 'one_vs_rest'):
+        results = batch_segment_tests(df, 'Code', mode=mode)
+        assert results['group_a'].dtype == results['group_b'].dtype
+        assert set(results['group_a']) <= {'1', '2', '3'}
+
+
+def test_variance_survives_large_offsets(policies):
+    shifted = policies.assign(TotalPremium=policies['TotalPremium'] + 1e9)
+    a, b = (shifted[shifted['Province'] == name] for name in ('Gauteng', 'Limpopo'))
+    ref = ttest_ind(a['TotalPremium'] - a['TotalClaims'], b['TotalPremium'] - b['TotalClaims'], equal_var=False)
+    results = batch_segment_tests(shifted, 'Province', metrics=['margin'], p_adjust=None)
+    assert _row(results, 'margin', 'welch_t', 'Gauteng', 'Limpopo')['statistic'] == pytest.approx(ref.statistic,
+                                                                                                  rel=1e-6)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from src.imputation import GroupImputer
+
+
+def _policies():
+    # Gauteng: 6 rows, Limpopo: 2 rows (below min_group_size=3)
+    return pd.DataFrame({
+        'Province': ['Gauteng'] * 6 + ['Limpopo'] * 2,
+        'SumInsured': [10.0, 20.0, 30.0, 40.0, np.nan, np.nan, 1000.0, np.nan],
+        'VehicleType': ['Sedan', 'SUV', 'SUV', 'SUV', None, 'Sedan', 'Bus', None],
+        'Cover': pd.Categorical(['A', 'B', 'B', None, 'B', 'A', 'C', None]),
+    })
+
+
+def test_segment_median_and_mode_with_global_fallback():
+    df = _policies()
+    imputer = GroupImputer(strategy='median', by='Province', min_group_size=3).fit(df)
+    assert imputer.fill_values_['SumInsured'] == 30.0
+    assert imputer.fill_values_['VehicleType'] == 'SUV'
+    assert imputer.group_fill_values_.loc['Gauteng', 'SumInsured'] == 25.0
+    assert pd.isna(imputer.group_fill_values_.loc['Limpopo', 'SumInsured'])
+
+    out = imputer.transform(df, inplace=False)
+    assert df['SumInsured'].isna().sum() == 3
+    assert out['SumInsured'].tolist() == [10.0, 20.0, 30.0, 40.0, 25.0, 25.0, 1000.0, 30.0]
+    assert out['VehicleType'].tolist() == ['Sedan', 'SUV', 'SUV', 'SUV', 'SUV', 'Sedan', 'Bus', 'SUV']
+
+
+def test_mean_strategy_per_segment():
+    df = _policies()
+    out = GroupImputer(strategy='mean', by='Province', min_group_size=3).fit_transform(df, inplace=False)
+    assert out.loc[4, 'SumInsured'] == 25.0
+    assert out.loc[7, 'SumInsured'] == np.mean([10.0, 20.0, 30.0, 40.0, 1000.0])
+
+
+def test_categorical_modes_keep_the_dtype():
+    df = _policies()
+    out = GroupImputer(by='Province', min_group_size=3).fit_transform(df, inplace=False)
+    assert isinstance(out['Cover'].dtype, pd.CategoricalDtype)
+    # Gauteng mode is B; Limpopo is too small and gets the global mode, also B
+    assert out['Cover'].tolist() == ['A', 'B', 'B', 'B', 'B', 'A', 'C', 'B']
+
+
+def test_categorical_with_no_observed_value_uses_the_fill_label():
+    df = pd.DataFrame({'Make': pd.Series([None, None], dtype=object), 'Age': [1.0, np.nan]})
+    out = GroupImputer().fit_transform(df, inplace=False)
+    assert out['Make'].tolist() == ['missing', 'missing']
+    assert out['Age'].tolist() == [1.0, 1.0]
+
+
+def test_unseen_segments_fall_back_to_global_statistics():
+    imputer = GroupImputer(by='Province', min_group_size=3).fit(_policies())
+    scoring = pd.DataFrame({
+        'Province': ['Gauteng', 'Free State', None],
+        'SumInsured': [np.nan, np.nan, np.nan],
+        'VehicleType': [None, None, None],
+        'Cover': pd.Categorical([None, None, None], categories=['A', 'B', 'C']),
+    })
+    out = imputer.transform(scoring)
+    assert out['SumInsured'].tolist() == [25.0, 30.0, 30.0]
+    assert out['VehicleType'].tolist() == ['SUV', 'SUV', 'SUV']
+    assert out['Cover'].tolist() == ['B', 'B', 'B']
+
+
+def test_multi_column_segments():
+    df = _policies()
+    df['Fuel'] = ['Petrol', 'Petrol', 'Petrol', 'Diesel', 'Petrol', 'Diesel', 'Diesel', 'Diesel']
+    imputer = GroupImputer(by=['Province', 'Fuel'], columns=['SumInsured'], min_group_size=2).fit(df)
+    out = imputer.transform(df, inplace=False)
+    # (Gauteng, Petrol) has 3 values, median 20; (Gauteng, Diesel) only 1, global median 30
+    assert out['SumInsured'].tolist() == [10.0, 20.0, 30.0, 40.0, 20.0, 30.0, 1000.0, 30.0]
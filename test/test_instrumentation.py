@@ -0,0 +1,64 @@
+import logging
+import pandas as pd
+import pytest
+from src import instrumentation
+from src.instrumentation import instrument, records, reset, set_profile_mode
+
+
+@pytest.fixture(autouse=True)
+def no_profile():
+    set_profile_mode(None)
+    reset()
+    yield
+    set_profile_mode(None)
+
+
+@instrument(level=logging.DEBUG)
+def per_batch(df):
+    return df
+
+
+@instrument()
+def batch_job(df):
+    return per_batch(df)
+
+
+def _stage_lines(caplog, level):
+    return [r for r in caplog.records if r.name == instrumentation.__name__
+            and r.levelno == level and r.getMessage().startswith('Stage ')]
+
+
+def test_hot_path_stage_is_recorded_but_not_logged_at_info(caplog):
+    caplog.set_level(logging.DEBUG, logger=instrumentation.__name__)
+    per_batch(pd.DataFrame({'a': range(3)}))
+    assert [record['rows_out'] for record in records('per_batch')] == [3]
+    assert _stage_lines(caplog, logging.INFO) == [] and len(_stage_lines(caplog, logging.DEBUG)) == 1
+
+
+def test_profile_mode_and_top_level_stages_log_at_info(caplog, tmp_path):
+    caplog.set_level(logging.DEBUG, logger=instrumentation.__name__)
+    batch_job(pd.DataFrame({'a': range(3)}))
+    assert [r.getMessage().split(':')[0] for r in _stage_lines(caplog, logging.INFO)] == ['Stage batch_job']
+    caplog.clear()
+    set_profile_mode('tracemalloc')
+    per_batch(pd.DataFrame({'a': range(3)}))
+    assert len(_stage_lines(caplog, logging.INFO)) == 1
+
+
+def test_disabling_profile_mode_stops_only_tracemalloc_it_started():
+    import tracemalloc
+    assert not tracemalloc.is_tracing()
+    set_profile_mode('tracemalloc')
+    per_batch(pd.DataFrame({'a': range(3)}))
+    assert tracemalloc.is_tracing() and records('per_batch')[-1]['traced_peak_bytes'] > 0
+    set_profile_mode(None)
+    assert not tracemalloc.is_tracing()
+
+    tracemalloc.start()
+    try:
+        set_profile_mode('tracemalloc')
+        per_batch(pd.DataFrame({'a': range(3)}))
+        set_profile_mode(None)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
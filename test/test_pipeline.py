@@ -0,0 +1,65 @@
+import os
+import shutil
+import pandas as pd
+import pytest
+from src import pipeline as pipeline_module
+from src.pipeline import Pipeline, Stage, build_eda_pipeline, code_fingerprint, hypothesis_stage
+from src.hypothesis_util import batch_segment_tests
+from test.synthetic_data import write_synthetic_file
+
+
+@pytest.fixture(scope='module')
+def data_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('data') / 'policies.txt')
+    write_synthetic_file(path, 5_000, seed=7)
+    return path
+
+
+def test_code_fingerprint_follows_imported_modules(tmp_path, monkeypatch):
+    copy = tmp_path / 'hypothesis_util.py'
+    shutil.copy(os.path.join(os.path.dirname(pipeline_module.__file__), 'hypothesis_util.py'), copy)
+    module_file = pipeline_module._module_file
+    monkeypatch.setattr(pipeline_module, '_module_file',
+                        lambda name: str(copy) if name == 'src.hypothesis_util' else module_file(name))
+    before = code_fingerprint(hypothesis_stage)
+    copy.write_text(copy.read_text() + '\n# tweaked\n')
+    assert code_fingerprint(hypothesis_stage) != before
+
+
+def test_rerun_only_executes_changed_stages(data_path, tmp_path):
+    targets = ['hypothesis_Province', 'hypothesis_Gender']
+
+    def run(config=None):
+        pipeline = build_eda_pipeline(data_path, cache_dir=str(tmp_path / 'cache'), config=config)
+        return pipeline, pipeline.run(targets=targets, n_jobs=1)
+
+    pipeline, report = run()
+    assert set(report['status']) == {'ran'}
+    _, report = run()
+    assert set(report['status']) == {'cached'}
+    _, report = run({'hypothesis_Gender': {'alpha': 0.01}})
+    assert report['status'].to_dict() == {'hypothesis_Province': 'cached', 'hypothesis_Gender': 'ran'}
+
+    # The cached table is what the function returns on the same input
+    impute = pipeline.output('impute')
+    expected = batch_segment_tests(impute, 'Province')
+    pd.testing.assert_frame_equal(pipeline.output('hypothesis_Province').reset_index(drop=True),
+                                  expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_parallel_run_matches_serial(data_path, tmp_path):
+    serial = build_eda_pipeline(data_path, cache_dir=str(tmp_path / 'serial'))
+    parallel = build_eda_pipeline(data_path, cache_dir=str(tmp_path / 'parallel'))
+    targets = ['hypothesis_Province', 'hypothesis_PostalCode', 'hypothesis_Gender']
+    serial.run(targets=targets, n_jobs=1)
+    parallel.run(targets=targets, n_jobs=3)
+    for name in targets:
+        pd.testing.assert_frame_equal(serial.output(name), parallel.output(name))
+
+
+def test_unknown_stage_is_rejected(tmp_path):
+    pipeline = Pipeline([Stage('a', hypothesis_stage)], cache_dir=str(tmp_path))
+    with pytest.raises(KeyError):
+        pipeline.run(targets=['b'])
+    with pytest.raises(ValueError):
+        pipeline.add(Stage('c', hypothesis_stage, ['missing']))
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from src.premium import PremiumEngine, gross_premium
+
+
+class Frequency:
+    def predict_proba(self, X):
+        p = 1 / (1 + np.exp(-np.asarray(X)[:, 0]))
+        return np.column_stack([1 - p, p])
+
+
+class Severity:
+    def predict(self, X):
+        return np.asarray(X)[:, 1] * 100.0
+
+
+def _policies(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'x': rng.normal(size=n), 'y': rng.normal(size=n)})
+
+
+def test_price_matches_direct_computation_for_any_chunksize():
+    policies = _policies()
+    engine = PremiumEngine(Frequency(), Severity(), chunksize=97)
+    p = Frequency().predict_proba(policies)[:, 1]
+    severity = np.maximum(Severity().predict(policies), 0.0)
+    for chunksize in (None, 1, 333, 5000):
+        prices = engine.price(policies, chunksize)
+        np.testing.assert_allclose(prices['claim_probability'], p)
+        np.testing.assert_allclose(prices['expected_severity'], severity)
+        np.testing.assert_allclose(prices['premium'], gross_premium(p * severity))
+
+
+def test_chunksize_argument_does_not_change_the_engine():
+    engine = PremiumEngine(Frequency(), Severity(), chunksize=97)
+    list(engine.price_chunks([_policies(10)], chunksize=3))
+    assert engine.chunksize == 97
+
+
+class _Pipeline:
+    feature_names_ = ['x', 'y']
+
+    def transform(self, policies, sparse=False):
+        import scipy.sparse as sp
+        assert sparse
+        return sp.csr_matrix(policies[self.feature_names_].to_numpy(dtype=np.float32))
+
+
+def test_dense_models_get_arrays_and_frames_only_when_names_are_needed():
+    import warnings
+    import scipy.sparse as sp
+    from sklearn.linear_model import LinearRegression, LogisticRegression
+    from src.premium import _features
+    policies = _policies(200)
+    y = policies['x'] * 2 - policies['y']
+    pipeline = _Pipeline()
+
+    planned = LinearRegression().fit(policies.to_numpy(), y)
+    planned.numeric_plan_ = {'x': 'keep', 'y': 'keep'}
+    assert isinstance(_features(pipeline, planned, policies), np.ndarray)
+    reordered = LinearRegression().fit(policies[['y', 'x']].to_numpy(), y)
+    reordered.numeric_plan_ = {'y': 'keep', 'x': 'keep'}
+    assert list(_features(pipeline, reordered, policies).columns) == ['y', 'x']
+    assert sp.issparse(_features(pipeline, LinearRegression().fit(policies.to_numpy(), y), policies))
+
+    frequency = LogisticRegression().fit(policies, y > 0)
+    severity = LinearRegression().fit(policies, y)
+    engine = PremiumEngine(frequency, severity, pipeline, pipeline, chunksize=64)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        prices = engine.price(policies)
+    np.testing.assert_allclose(prices['expected_severity'], np.maximum(severity.predict(policies), 0.0), rtol=1e-5)
+    np.testing.assert_allclose(prices['claim_probability'], frequency.predict_proba(policies)[:, 1], rtol=1e-5)
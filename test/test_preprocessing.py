@@ -0,0 +1,30 @@
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+from src.preprocessing import PreprocessingPipeline
+
+
+def _policies():
+    return pd.DataFrame({
+        'TransactionMonth': ['2014-03-01 00:00:00'] * 2 + ['2015-03-01 00:00:00'] * 3 + ['2014-04-01 00:00:00'],
+        'RegistrationYear': [2010.0, 2012.0, np.nan, 2008.0, 2010.0, np.nan],
+        'Province': ['Gauteng', 'Gauteng', 'Limpopo', None, 'Limpopo', 'Gauteng'],
+        'TotalClaims': [0.0, 10.0, 0.0, 5.0, 0.0, 1.0],
+    })
+
+
+def test_features_are_derived_from_imputed_inputs():
+    df = _policies()
+    pipeline = PreprocessingPipeline('TotalClaims', drop_cols=['TransactionMonth']).fit(df)
+    X = pipeline.transform(df)
+    fill = df['RegistrationYear'].mean()
+    # Imputing after deriving would fill the missing ages with their mean, 4.5
+    expected = np.array([4, 2, 2015 - fill, 7, 5, 2014 - fill])
+    np.testing.assert_allclose(X['VehicleAge'].to_numpy(), expected, rtol=1e-6)
+    assert df['RegistrationYear'].isna().sum() == 2
+
+
+def test_preprocessing_does_not_import_modeling_util():
+    code = "import sys, src.preprocessing; sys.exit('src.modeling_util' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', code]).returncode == 0
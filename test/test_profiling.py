@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.profiling import HyperLogLog, _hash_values, profile_data
+
+
+@pytest.mark.parametrize('n_distinct', [50, 5_000, 200_000])
+def test_hll_estimate_is_within_its_error_bound(n_distinct):
+    rng = np.random.default_rng(n_distinct)
+    values = pd.Series(rng.integers(0, n_distinct, 4 * n_distinct))
+    exact = values.nunique()
+    estimate = HyperLogLog().add_hashes(_hash_values(values)).estimate()
+    # 1.04 / sqrt(2**14) is 0.8%; allow four standard errors
+    assert abs(estimate - exact) / exact < 0.033
+
+
+def test_merged_sketches_match_one_sketch():
+    values = pd.Series(np.arange(100_000) % 30_011).astype(str)
+    whole = HyperLogLog().add_hashes(_hash_values(values))
+    left = HyperLogLog().add_hashes(_hash_values(values.iloc[:40_000]))
+    right = HyperLogLog().add_hashes(_hash_values(values.iloc[40_000:]))
+    np.testing.assert_array_equal(left.merge(right).registers, whole.registers)
+
+
+def test_profile_matches_pandas():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'PostalCode': rng.integers(0, 3_000, 50_000).astype(str),
+                       'TotalPremium': rng.gamma(2.0, 300, 50_000)})
+    df.loc[::7, 'TotalPremium'] = np.nan
+    profile = profile_data(df, chunksize=8_000)['columns']
+    postal, premium = profile['PostalCode'], profile['TotalPremium']
+    assert abs(postal['distinct'] - df['PostalCode'].nunique()) <= 0.033 * df['PostalCode'].nunique()
+    assert premium['missing'] == df['TotalPremium'].isna().sum()
+    assert premium['mean'] == pytest.approx(df['TotalPremium'].mean(), rel=1e-12)
+    assert premium['std'] == pytest.approx(df['TotalPremium'].std(), rel=1e-9)
+    assert premium['min'] == df['TotalPremium'].min() and premium['max'] == df['TotalPremium'].max()
+
+
+def _chunks_with_late_hitter():
+    # Nine chunks of 5,000 fresh singletons plus a steady value, then a late chunk
+    # that is mostly one value: far more distinct values than the top-k counters
+    chunks = []
+    for i in range(10):
+        filler = [f'v{i}_{j}' for j in range(2_000 if i == 9 else 4_960)]
+        values = filler + ['steady'] * 40 + (['late'] * 2_960 if i == 9 else [])
+        chunks.append(pd.DataFrame({'Model': values}))
+    return chunks
+
+
+def test_late_heavy_hitter_is_kept_with_bounded_error():
+    chunks = _chunks_with_late_hitter()
+    exact = pd.concat(chunks)['Model'].value_counts()
+    profile = profile_data(chunks, top_k=2)['columns']['Model']
+    assert not profile['top_values_exact']
+    error = profile['top_values_max_error']
+    assert 0 < error <= exact.sum() / 1_001
+    top = dict(profile['top_values'])
+    assert list(top) == ['late', 'steady']
+    for value, count in top.items():
+        assert exact[value] - error <= count <= exact[value]
+
+
+def test_top_values_are_exact_below_capacity():
+    df = pd.DataFrame({'CoverType': np.repeat(['a', 'b', 'c'], [50, 30, 20])})
+    profile = profile_data([df.iloc[:40], df.iloc[40:]], top_k=2)['columns']['CoverType']
+    assert profile['top_values'] == [['a', 50], ['b', 30]]
+    assert profile['top_values_exact'] and profile['top_values_max_error'] == 0 and profile['distinct'] == 3
@@ -0,0 +1,27 @@
+import os
+import numpy as np
+import pandas as pd
+from src import report
+
+
+def _charts():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.normal(size=500), 'b': rng.choice(list('xyz'), 500)})
+    return report.build_univariate_charts(df, ['a'], ['b'])
+
+
+def test_in_process_render_leaves_pyplot_alone(tmp_path, monkeypatch):
+    import matplotlib
+    import matplotlib.pyplot as plt
+    switched = []
+    monkeypatch.setattr(matplotlib, 'use', lambda *args, **kwargs: switched.append(args))
+    result = report.render_report(_charts(), output_dir=str(tmp_path), n_jobs=1)
+    assert sorted(result['rendered']) == ['boxplot_a.png', 'countplot_b.png', 'histogram_a.png']
+    assert all(os.path.getsize(tmp_path / name) > 0 for name in result['rendered'])
+    assert switched == [] and plt.get_fignums() == []
+
+
+def test_unchanged_charts_are_skipped(tmp_path):
+    report.render_report(_charts(), output_dir=str(tmp_path), n_jobs=1)
+    result = report.render_report(_charts(), output_dir=str(tmp_path), n_jobs=1)
+    assert result['rendered'] == [] and len(result['skipped']) == 3
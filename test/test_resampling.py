@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from scipy import stats
+from src.resampling import bootstrap_test, permutation_test
+
+
+@pytest.fixture(scope='module')
+def samples():
+    rng = np.random.default_rng(3)
+    return rng.exponential(100, 400), rng.exponential(115, 300)
+
+
+def test_permutation_p_value_matches_scipy(samples):
+    a, b = samples
+    ours = permutation_test(a, b, n_resamples=20_000, early_stop=False, random_state=0)
+    ref = stats.permutation_test((a, b), lambda x, y: x.mean() - y.mean(), n_resamples=20_000,
+                                 vectorized=False, random_state=0)
+    assert ours['statistic'] == pytest.approx(ref.statistic)
+    assert ours['p_value'] == pytest.approx(ref.pvalue, abs=0.01)
+
+
+def test_bootstrap_interval_matches_scipy(samples):
+    a, b = samples
+    ours = bootstrap_test(a, b, n_resamples=5_000, early_stop=False, random_state=0)
+    ref = stats.bootstrap((a, b), lambda x, y, axis: x.mean(axis=axis) - y.mean(axis=axis),
+                          n_resamples=5_000, method='percentile', random_state=0).confidence_interval
+    assert ours['ci_low'] == pytest.approx(ref.low, abs=2.0)
+    assert ours['ci_high'] == pytest.approx(ref.high, abs=2.0)
+
+
+@pytest.mark.parametrize('n_jobs', [None, -1, 2])
+def test_results_do_not_depend_on_n_jobs(samples, n_jobs):
+    a, b = samples
+    serial = permutation_test(a, b, n_resamples=3_000, batch_size=500, n_jobs=1, random_state=1)
+    parallel = permutation_test(a, b, n_resamples=3_000, batch_size=500, n_jobs=n_jobs, random_state=1)
+    assert parallel == serial
+
+
+def test_invalid_n_jobs_is_rejected(samples):
+    with pytest.raises(ValueError):
+        permutation_test(*samples, n_resamples=100, n_jobs=0)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.risk_index import PostalRiskIndex, compute_risk_stats, credibility_table, merge_risk_stats
+
+
+@pytest.fixture(scope='module')
+def policies():
+    rng = np.random.default_rng(9)
+    n = 30_000
+    province = rng.choice(['Gauteng', 'Limpopo', 'Western Cape'], n)
+    postal = np.char.add(province.astype(str).astype('U2'), rng.integers(0, 40, n).astype(str))
+    premium = rng.gamma(2.0, 300, n)
+    cell_risk = rng.gamma(5.0, 0.04, 150)[pd.factorize(postal)[0] % 150]
+    claims = np.where(rng.random(n) < 0.1, premium * rng.gamma(2.0, 5 * cell_risk, n), 0.0)
+    return pd.DataFrame({'Province': province, 'PostalCode': postal, 'TotalPremium': premium, 'TotalClaims': claims})
+
+
+def _brute_force(df):
+    """Buhlmann-Straub estimators computed row by row from the loss ratios."""
+    df = df[df['TotalPremium'] > 0].assign(X=lambda d: d['TotalClaims'] / d['TotalPremium'])
+    cells = df.groupby(['Province', 'PostalCode'])
+    cell_x = cells['TotalClaims'].transform('sum') / cells['TotalPremium'].transform('sum')
+    epv = (df['TotalPremium'] * (df['X'] - cell_x) ** 2).sum() / (cells.size() - 1).sum()
+
+    cell = cells[['TotalClaims', 'TotalPremium']].sum()
+    cell['X'] = cell['TotalClaims'] / cell['TotalPremium']
+    province = cell.groupby(level=0)[['TotalClaims', 'TotalPremium']].sum()
+    mu = (province['TotalClaims'] / province['TotalPremium']).reindex(cell.index.get_level_values(0)).to_numpy()
+    w_p = province['TotalPremium'].reindex(cell.index.get_level_values(0)).to_numpy()
+    w = cell['TotalPremium'].to_numpy()
+    vhm = ((w * (cell['X'].to_numpy() - mu) ** 2).sum() - (len(cell) - len(province)) * epv) \
+        / (w - w * w / w_p).sum()
+    z = w / (w + epv / vhm)
+    return epv, vhm, pd.Series(z * cell['X'].to_numpy() + (1 - z) * mu, index=cell.index)
+
+
+def test_credibility_matches_row_level_estimators(policies):
+    table, _, _, params = credibility_table(compute_risk_stats(policies))
+    epv, vhm, loss_ratio = _brute_force(policies)
+    assert params['epv'] == pytest.approx(epv, rel=1e-9)
+    assert params['vhm'] == pytest.approx(vhm, rel=1e-9)
+    np.testing.assert_allclose(table['loss_ratio'].to_numpy(), loss_ratio.reindex(table.index).to_numpy(),
+                               rtol=1e-9)
+
+
+def test_chunked_fit_matches_single_pass(policies):
+    chunks = [policies.iloc[i:i + 4_000] for i in range(0, len(policies), 4_000)]
+    merged = merge_risk_stats([compute_risk_stats(chunk) for chunk in chunks])
+    pd.testing.assert_frame_equal(merged, compute_risk_stats(policies), check_dtype=False, rtol=1e-9)
+    index = PostalRiskIndex().fit(chunks)
+    unseen = pd.DataFrame({'Province': ['Gauteng', 'Mars'], 'PostalCode': ['nowhere', 'nowhere']})
+    values = index.transform(unseen)
+    assert values[1] == 1.0 and np.isfinite(values[0])
@@ -0,0 +1,56 @@
+import asyncio
+import pandas as pd
+import pytest
+
+pytest.importorskip('aiohttp')
+from aiohttp.test_utils import TestClient, TestServer
+from src.scoring_service import make_app, validate_records
+
+
+class FakeService:
+    """Scores premium = 2 * SumInsured; a non-numeric SumInsured fails the whole frame."""
+    required_columns = ['SumInsured']
+
+    def score(self, policies):
+        return pd.DataFrame({'premium': pd.to_numeric(policies['SumInsured'], errors='raise') * 2.0},
+                            index=policies.index)
+
+
+async def _post_all(payloads, max_wait_ms=50.0):
+    async with TestClient(TestServer(make_app(FakeService(), max_wait_ms=max_wait_ms))) as client:
+        async def post(payload):
+            response = await client.post('/score', json=payload)
+            return response.status, await response.json()
+        results = await asyncio.gather(*(post(payload) for payload in payloads))
+        # The batcher must survive whatever came before
+        after = await post({'policies': [{'SumInsured': 1.0}]})
+        return results, after
+
+
+@pytest.mark.parametrize('records, ok', [
+    ([{'SumInsured': 1}], True),
+    (5, False),
+    ([], False),
+    (['x'], False),
+    ([{'Province': 'Gauteng'}], False),
+])
+def test_validate_records(records, ok):
+    assert (validate_records(records, ['SumInsured']) is None) == ok
+
+
+def test_malformed_request_is_rejected_and_server_keeps_scoring():
+    results, after = asyncio.run(_post_all([{'policies': 5}, {'policies': [{'Province': 'Gauteng'}]}]))
+    assert [status for status, _ in results] == [400, 400]
+    assert after == (200, after[1]) and after[1]['predictions'] == [{'premium': 2.0}]
+
+
+def test_bad_request_in_batch_fails_alone():
+    payloads = [{'policies': [{'SumInsured': 1.0}, {'SumInsured': 2.0}]},
+                {'policies': [{'SumInsured': 'not a number'}]},
+                {'policies': [{'SumInsured': 3.0}]}]
+    results, after = asyncio.run(_post_all(payloads))
+    statuses = [status for status, _ in results]
+    assert statuses == [200, 500, 200]
+    assert results[0][1]['predictions'] == [{'premium': 2.0}, {'premium': 4.0}]
+    assert results[2][1]['predictions'] == [{'premium': 6.0}]
+    assert after[0] == 200
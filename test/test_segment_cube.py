@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.segment_cube import SegmentCube
+
+
+@pytest.fixture(scope='module')
+def policies():
+    rng = np.random.default_rng(6)
+    n = 10_000
+    df = pd.DataFrame({
+        'Province': rng.choice(['Gauteng', 'Limpopo', 'Western Cape', None], n, p=[0.5, 0.3, 0.15, 0.05]),
+        'PostalCode': rng.integers(1, 60, n).astype(str),
+        'CoverType': rng.choice(['Own Damage', 'Windscreen'], n),
+        'Make': rng.choice(['TOYOTA', 'VW', 'FORD', 'BMW', 'AUDI', 'KIA'], n),
+        'TotalPremium': rng.gamma(2.0, 300, n),
+        'TotalClaims': np.where(rng.random(n) < 0.1, rng.gamma(2.0, 3_000, n), 0.0),
+    })
+    df.loc[rng.random(n) < 0.05, 'TotalPremium'] = np.nan
+    return df
+
+
+@pytest.fixture(scope='module')
+def cube(policies):
+    return SegmentCube.from_data(policies.iloc[i:i + 3_000] for i in range(0, len(policies), 3_000))
+
+
+def test_rollup_matches_groupby(policies, cube):
+    dims = ['Province', 'CoverType']
+    rolled = cube.rollup(dims)
+    grouped = policies.groupby(dims)
+    np.testing.assert_array_equal(rolled['n'], grouped.size())
+    np.testing.assert_allclose(rolled['premium_sum'], grouped['TotalPremium'].sum(), rtol=1e-9)
+    np.testing.assert_array_equal(rolled['premium_n'], grouped['TotalPremium'].count())
+    pd.testing.assert_series_equal(cube.mean('premium', dims), grouped['TotalPremium'].mean().rename('premium'),
+                                   check_index_type=False, rtol=1e-9)
+    sums = grouped[['TotalClaims', 'TotalPremium']].sum()
+    pd.testing.assert_series_equal(cube.loss_ratio(dims), (sums['TotalClaims'] / sums['TotalPremium'])
+                                   .rename('loss_ratio'), check_index_type=False, rtol=1e-9)
+
+
+def test_top_and_where_match_value_counts(policies, cube):
+    top = cube.top('PostalCode', 5)
+    counts = policies['PostalCode'].value_counts()
+    # Ties may be ordered differently, so compare the counts of the chosen values
+    assert counts[top].tolist() == counts.head(5).tolist()
+    subset = cube.where(PostalCode=top, CoverType='Windscreen').rollup('Make')
+    rows = policies[policies['PostalCode'].isin(top) & (policies['CoverType'] == 'Windscreen')]
+    pd.testing.assert_series_equal(subset['claims_sum'], rows.groupby('Make')['TotalClaims'].sum()
+                                   .rename('claims_sum'), check_index_type=False, rtol=1e-9)
+
+
+def test_unknown_measure_is_rejected(cube):
+    with pytest.raises(ValueError):
+        cube.mean('loss_ratio', 'Province')
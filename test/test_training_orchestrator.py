@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from src.training_orchestrator import TrainingOrchestrator
+
+GRIDS = {'linear': [{}], 'random_forest': {'n_estimators': [20], 'max_depth': [3, None]},
+         'xgboost': {'n_estimators': [50], 'max_depth': [3], 'learning_rate': [0.1]}}
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = np.where(rng.random((400, 12)) < 0.7, 0.0, rng.normal(size=(400, 12)))
+    y = X[:, 0] * 3 + X[:, 1] - X[:, 2] + rng.normal(scale=0.1, size=400)
+    return pd.DataFrame(X, columns=[f'f{i}' for i in range(12)]), y
+
+
+def _fold_scores(tmp_path, name, X, y, n_jobs):
+    orchestrator = TrainingOrchestrator(param_grids=GRIDS, n_folds=3, n_jobs=n_jobs, early_stopping_rounds=5,
+                                        work_dir=str(tmp_path / name))
+    orchestrator.run(X, y)
+    return orchestrator, orchestrator.fold_results_.sort_values(['family', 'params', 'fold'], ignore_index=True)
+
+
+def test_serial_and_pool_fold_scores_match(data, tmp_path):
+    X, y = data
+    _, serial = _fold_scores(tmp_path, 'serial', X, y, n_jobs=1)
+    _, pooled = _fold_scores(tmp_path, 'pooled', X, y, n_jobs=3)
+    assert len(serial) == 3 * 4
+    pd.testing.assert_frame_equal(serial[['family', 'params', 'fold', 'score', 'best_iteration']],
+                                  pooled[['family', 'params', 'fold', 'score', 'best_iteration']], rtol=1e-9)
+
+
+def test_sparse_input_is_mapped_and_matches_dense(data, tmp_path):
+    X, y = data
+    orchestrator, dense = _fold_scores(tmp_path, 'dense', X, y, n_jobs=1)
+    sparse_orchestrator, sparse = _fold_scores(tmp_path, 'sparse', sp.csr_matrix(X.to_numpy()), y, n_jobs=2)
+    assert sparse_orchestrator.paths_['X_format'] == 'csr'
+    linear = dense['family'] == 'linear'
+    np.testing.assert_allclose(sparse.loc[linear, 'score'], dense.loc[linear, 'score'], rtol=1e-5)
+    model = sparse_orchestrator.refit_best()
+    assert model.predict(sp.csr_matrix(X.to_numpy()[:5])).shape == (5,)
+    assert orchestrator.refit_best().feature_names_ == list(X.columns)
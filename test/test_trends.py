@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.segment_metrics import aggregate_segments
+from src.trends import MONTH_COL, TrendStore
+
+
+@pytest.fixture(scope='module')
+def policies():
+    rng = np.random.default_rng(4)
+    n = 24_000
+    months = pd.date_range('2014-01-01', periods=6, freq='MS')
+    return pd.DataFrame({
+        'Province': rng.choice(['Gauteng', 'Limpopo', None], n, p=[0.6, 0.35, 0.05]),
+        'CoverType': rng.choice(['Own Damage', 'Windscreen'], n),
+        MONTH_COL: rng.choice(months, n).astype('datetime64[ns]'),
+        'TotalPremium': rng.gamma(2.0, 300, n),
+        'TotalClaims': np.where(rng.random(n) < 0.1, rng.gamma(2.0, 3_000, n), 0.0),
+    })
+
+
+KPIS = ['n', 'n_claims', 'claim_frequency', 'claim_severity', 'margin', 'loss_ratio']
+
+
+def test_rollups_match_direct_aggregation(policies):
+    store = TrendStore.from_data([policies.iloc[i:i + 5_000] for i in range(0, len(policies), 5_000)],
+                                 dims=['Province', 'CoverType'])
+    expected = aggregate_segments(policies, ['Province', MONTH_COL])
+    result = store.kpis('Province')
+    pd.testing.assert_frame_equal(result[KPIS], expected[KPIS], check_dtype=False, check_index_type=False,
+                                  rtol=1e-9)
+    variance = expected['margin_m2'] / (expected['margin_n'] - 1)
+    np.testing.assert_allclose(result['margin_m2'] / (result['margin_n'] - 1), variance, rtol=1e-9)
+
+
+def test_rolling_window_matches_pandas(policies):
+    store = TrendStore.from_data(policies, dims=['Province', 'CoverType'])
+    rolled = store.rolling(3)
+    monthly = policies.groupby(MONTH_COL)[['TotalClaims', 'TotalPremium']].sum()
+    expected = monthly.rolling(3, min_periods=1).sum()
+    np.testing.assert_allclose(rolled['loss_ratio'].to_numpy(),
+                               (expected['TotalClaims'] / expected['TotalPremium']).to_numpy(), rtol=1e-9)
+
+
+def test_append_replaces_months_and_round_trips(policies, tmp_path):
+    first = policies[policies[MONTH_COL] < '2014-04-01']
+    store = TrendStore.from_data(first, dims=['Province'])
+    store.append(policies[policies[MONTH_COL] >= '2014-03-01'])
+    path = str(tmp_path / 'trends.parquet')
+    store.save(path)
+    loaded = TrendStore.load(path)
+    expected = TrendStore.from_data(policies, dims=['Province'])
+    pd.testing.assert_frame_equal(loaded.kpis()[KPIS], expected.kpis()[KPIS], check_dtype=False, rtol=1e-9)